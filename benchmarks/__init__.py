@@ -0,0 +1 @@
+# Benchmarks for CRM Chat Assistant 
\ No newline at end of file
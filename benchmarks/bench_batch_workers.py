@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch mode with 1 to N worker processes.
+
+Generates (or reuses) a large synthetic dataset, loads it and the intent
+model once, then answers the same JSONL question file with run_batch at
+each worker count. The workers are forked from the loaded process, so the
+tables, indexes and model are shared copy-on-write rather than copied.
+Reports throughput, speedup over one worker and scaling efficiency
+(speedup divided by workers).
+
+Usage:
+    python -m benchmarks.bench_batch_workers --rows 1000000 --questions 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.bench_intent_cascade import build_questions
+from benchmarks.bench_query_engine import git_commit, peak_rss_mb
+from benchmarks.synthetic_data import dataset_paths, generate_dataset
+from engine.data_loader import load_data
+from engine.metrics import METRICS
+from llm_engine.intent_parser import IntentParser
+from ui.batch_runner import can_fork, run_batch
+from ui.query_pipeline import QueryPipeline
+
+DEFAULT_DATA_DIR = os.path.join(PROJECT_DIR, '.cache', 'synthetic')
+
+
+def default_workers():
+    """
+    Powers of two up to the CPU count, and the CPU count itself.
+    """
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def write_questions(path, companies_df, count):
+    """
+    Write count questions filled in with company names from the dataset, as JSONL.
+    """
+    names = companies_df['Name'].sample(max(1, count // 100), random_state=0).tolist()
+    questions = build_questions(names)
+    with open(path, 'w') as f:
+        for i in range(count):
+            question, _, _ = questions[i % len(questions)]
+            f.write(json.dumps({"id": i, "query": question}) + "\n")
+
+
+def children_peak_rss_mb():
+    """
+    Largest peak resident set size of any finished worker process, in MB.
+
+    Pages shared with the parent count in full, so this overstates what a
+    worker adds.
+    """
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure batch throughput and scaling efficiency by worker count")
+    arg_parser.add_argument('--rows', type=int, default=1_000_000, help="Rows per table")
+    arg_parser.add_argument('--questions', type=int, default=20_000, help="Questions in the batch")
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=default_workers(), help="Worker counts to try")
+    arg_parser.add_argument('--chunk-size', type=int, default=256, help="Questions per chunk")
+    arg_parser.add_argument('--repeats', type=int, default=1, help="Runs per worker count, the best is kept")
+    arg_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where synthetic datasets are kept")
+    arg_parser.add_argument('--out', default='bench_batch_workers.json', help="JSON results file")
+    args = arg_parser.parse_args()
+
+    if not can_fork():
+        arg_parser.error("worker processes need fork, which this platform lacks")
+
+    dataset_dir = os.path.join(args.data_dir, str(args.rows))
+    paths = dataset_paths(dataset_dir)
+    if paths is None:
+        print(f"🧪 Generating {args.rows:,} rows per table in {dataset_dir}...")
+        paths = generate_dataset(dataset_dir, args.rows)
+
+    print(f"📊 Loading {args.rows:,} rows per table and the intent model...")
+    companies_df, contacts_df, opportunities_df = load_data(skip_unused=True, use_cache=False, paths=paths)
+    parser = IntentParser()
+    pipeline = QueryPipeline(companies_df, contacts_df, opportunities_df, parser)
+    parser.load()
+    pipeline.warm_up()
+    # Per-stage timings are already collected by run_batch
+    METRICS.enabled = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        in_path = os.path.join(tmp_dir, 'questions.jsonl')
+        write_questions(in_path, companies_df, args.questions)
+        print(f"⏱️  Answering {args.questions:,} questions ({os.cpu_count()} CPUs)...")
+        for workers in args.workers:
+            best = None
+            for _ in range(args.repeats):
+                # Every run starts cold, and forked workers must not inherit answers from an earlier run
+                pipeline.cache.invalidate()
+                stats = run_batch(pipeline, in_path, os.devnull, args.chunk_size, workers=workers)
+                if best is None or stats["wall_s"] < best["wall_s"]:
+                    best = stats
+            results.append({"workers": workers, "seconds": best["wall_s"],
+                            "questions_per_s": best["questions"] / best["wall_s"], "stages": best["stages"]})
+
+    baseline = next((result["seconds"] for result in results if result["workers"] == 1), results[0]["seconds"])
+    for result in results:
+        result["speedup"] = baseline / result["seconds"]
+        result["efficiency"] = result["speedup"] / result["workers"]
+        print(f"   x{result['workers']:<3} {result['seconds']:8.2f}s  {result['questions_per_s']:9.1f} q/s  "
+              f"{result['speedup']:5.2f}x  efficiency {result['efficiency']:6.1%}")
+
+    report = {
+        "benchmark": "batch_workers",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "rows": args.rows,
+        "questions": args.questions,
+        "chunk_size": args.chunk_size,
+        "parent_peak_rss_mb": peak_rss_mb(),
+        "worker_peak_rss_mb": children_peak_rss_mb(),
+        "results": results,
+    }
+    print(f"   peak RSS: parent {report['parent_peak_rss_mb']:.0f} MB, "
+          f"largest worker {report['worker_peak_rss_mb']:.0f} MB (shared pages included)")
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Compare the text encoder backends on intent accuracy, latency and memory.
+
+Each backend is measured in a fresh subprocess, so its imports and model
+weights are all that its RSS readings add. For each backend this reports:
+  - load time, and RSS before and after loading plus peak RSS
+  - leave-one-out accuracy on TEMPLATES: every template, filled in with
+    company names, is matched against all the other templates
+  - accuracy on paraphrases that are not templates
+  - p50/p99 latency of encoding one question, and batched throughput
+
+Backends whose dependencies are not installed are reported as skipped.
+The lexical classifier is left out, so only the encoders are compared.
+
+Usage:
+    python -m benchmarks.bench_encoders --backends sentence-transformers onnx hashing --out bench_encoders.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.bench_intent_cascade import PARAPHRASES, fill
+from benchmarks.bench_query_engine import git_commit, latency_summary, peak_rss_mb
+from engine.data_loader import DATA_DIR, TABLE_FILES
+from llm_engine.encoders import ENCODERS
+
+
+def current_rss_mb():
+    """
+    Resident set size of this process right now, in MB, or None where /proc is missing.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return None
+
+
+def leave_one_out_accuracy(parser, names):
+    """
+    Share of filled-in templates matched to their intent when their own template is left out.
+    """
+    questions = [(k, fill(template, name)) for k, template in enumerate(parser.templates) for name in names]
+    similarities = parser.score_embeddings(parser.model.encode([question for _, question in questions]))
+    own = np.array([k for k, _ in questions])
+    similarities[np.arange(len(questions)), own] = -np.inf
+    best = similarities.argmax(axis=1)
+    return float(np.mean(parser._template_intent_ids[best] == parser._template_intent_ids[own]))
+
+
+def paraphrase_accuracy(parser, names):
+    """
+    Share of filled-in paraphrases, worded unlike any template, matched to their intent.
+    """
+    questions = [(fill(text, name), intent) for text, intent in PARAPHRASES for name in names]
+    similarities = parser.score_embeddings(parser.model.encode([question for question, _ in questions]))
+    best = similarities.argmax(axis=1)
+    return float(np.mean([parser.template_intents[k] == intent for k, (_, intent) in zip(best, questions)]))
+
+
+def measure(backend, names, queries):
+    """
+    Load one backend and measure it. Run in a fresh interpreter.
+    """
+    rss_before = current_rss_mb()
+    from llm_engine.intent_parser import IntentParser
+    parser = IntentParser(encoder=backend, use_cache=False, lexical=False)
+    start = time.perf_counter()
+    try:
+        parser.load()
+    except ImportError as e:
+        return {"skipped": f"missing dependency: {e.name or e}"}
+    load_seconds = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    questions = [fill(template, names[i % len(names)]) for i, template in
+                 enumerate(parser.templates * (queries // len(parser.templates) + 1))][:queries]
+    parser.model.encode(questions[:1])
+    seconds = []
+    for question in questions:
+        start = time.perf_counter()
+        parser.model.encode([question])
+        seconds.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    parser.model.encode(questions, batch_size=64)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "encoder": parser.model_name,
+        "load_seconds": load_seconds,
+        "rss_before_mb": rss_before,
+        "rss_loaded_mb": rss_loaded,
+        "peak_rss_mb": peak_rss_mb(),
+        "template_leave_one_out_accuracy": leave_one_out_accuracy(parser, names),
+        "paraphrase_accuracy": paraphrase_accuracy(parser, names),
+        "latency": latency_summary(seconds),
+        "batch_questions_per_s": len(questions) / batch_seconds,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare encoder backends on intent accuracy, latency and RSS")
+    arg_parser.add_argument('--backends', nargs='+', choices=list(ENCODERS), default=list(ENCODERS),
+                            help="Encoder backends to measure")
+    arg_parser.add_argument('--names', type=int, default=5, help="Company names filled into each template")
+    arg_parser.add_argument('--queries', type=int, default=300, help="Questions encoded one at a time for latency")
+    arg_parser.add_argument('--out', default='bench_encoders.json', help="JSON results file")
+    arg_parser.add_argument('--measure', metavar='BACKEND', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    companies_df = pd.read_csv(os.path.join(DATA_DIR, TABLE_FILES['companies']), usecols=['Name'])
+    names = companies_df['Name'].sample(args.names, random_state=0).tolist()
+
+    if args.measure:
+        # Child process: measure one backend and print the result as JSON
+        print(json.dumps(measure(args.measure, names, args.queries)))
+        return
+
+    results = {}
+    for backend in args.backends:
+        print(f"⏱️  Measuring the {backend} encoder...")
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_encoders', '--measure', backend,
+             '--names', str(args.names), '--queries', str(args.queries)],
+            cwd=PROJECT_DIR, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            results[backend] = {"skipped": completed.stderr.strip().splitlines()[-1]}
+        else:
+            results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+        result = results[backend]
+        if "skipped" in result:
+            print(f"   skipped: {result['skipped']}")
+            continue
+        rss_added = (result["rss_loaded_mb"] - result["rss_before_mb"]) if result["rss_before_mb"] is not None else None
+        print(f"   accuracy: templates (leave-one-out) {result['template_leave_one_out_accuracy']:6.1%}, "
+              f"paraphrases {result['paraphrase_accuracy']:6.1%}")
+        print(f"   encode one: p50 {result['latency']['p50_ms']:8.3f} ms   p99 {result['latency']['p99_ms']:8.3f} ms   "
+              f"batched {result['batch_questions_per_s']:9.1f} q/s")
+        print(f"   load {result['load_seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB"
+              + (f", {rss_added:.0f} MB added by loading" if rss_added is not None else ""))
+
+    report = {
+        "benchmark": "encoders",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "names": args.names,
+        "results": results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
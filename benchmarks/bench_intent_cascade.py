@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lexical-then-transformer intent cascade against the transformer alone.
+
+Builds a question set from every intent template filled in with company
+names from the companies CSV, plus paraphrases that are not templates,
+then parses each question with the cascade and with the sentence
+transformer only (the behavior before the cascade). Reports:
+  - how often the lexical classifier answered
+  - agreement of the cascade with the transformer-only intents
+  - accuracy of both against the intent each question was written for
+  - per-question latency of both
+  - leave-one-out accuracy of the lexical classifier on the templates
+
+Usage:
+    python -m benchmarks.bench_intent_cascade --names 20 --out bench_intent_cascade.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.bench_query_engine import git_commit, latency_summary
+from engine.company_index import CompanyNameIndex
+from engine.data_loader import DATA_DIR, TABLE_FILES
+from engine.metrics import METRICS
+from llm_engine.intent_parser import IntentParser
+from llm_engine.lexical_classifier import LexicalIntentClassifier
+from llm_engine.template_mapper import get_all_templates, get_template_intents
+
+# Questions worded unlike any template, with the intent they ask for
+PARAPHRASES = [
+    ("Did [company] close a round recently?", "last_funding"),
+    ("How much did [company] raise last time?", "last_funding"),
+    ("Latest investment in [company]", "last_funding"),
+    ("[company] funding", "last_funding"),
+    ("What series is [company] on?", "last_funding"),
+    ("Any recent meetings with [company]?", "last_contact"),
+    ("Who did we meet at [company]?", "last_contact"),
+    ("When did we last see [company]?", "last_contact"),
+    ("Has anyone spoken to [company] lately?", "last_contact"),
+    ("[company] last contact", "last_contact"),
+    ("Is [company] still in the accelerator?", "check_status"),
+    ("What cohort is [company] part of?", "check_status"),
+    ("Give me the stage for [company]", "check_status"),
+    ("[company] status", "check_status"),
+]
+
+
+def fill(text, name):
+    """
+    Fill a template's placeholders: the company name, and fixed contact and opportunity IDs.
+    """
+    return text.replace('[company]', name).replace('[contact]', 'P0042').replace('[opportunity]', 'O0042')
+
+
+def build_questions(names):
+    """
+    Fill every template and paraphrase with each company name.
+
+    Returns:
+        list: (question, intent, source) tuples, source 'template' or 'paraphrase'
+    """
+    sources = [(template, intent, 'template')
+               for template, intent in zip(get_all_templates(), get_template_intents())]
+    sources += [(text, intent, 'paraphrase') for text, intent in PARAPHRASES]
+    return [(fill(text, name), intent, source)
+            for text, intent, source in sources for name in names]
+
+
+def parse_all(parser, questions):
+    """
+    Parse questions one at a time, as the chat does.
+
+    Returns:
+        tuple: (intents, per-question seconds)
+    """
+    intents, seconds = [], []
+    for question, _, _ in questions:
+        start = time.perf_counter()
+        intents.append(parser.parse_intent(question)["intent"])
+        seconds.append(time.perf_counter() - start)
+    return intents, seconds
+
+
+def leave_one_out_accuracy(names):
+    """
+    Lexical accuracy on each template when the classifier is built without it.
+
+    Returns:
+        dict: Share of questions answered lexically and accuracy of those answers
+    """
+    templates, template_intents = get_all_templates(), get_template_intents()
+    answered = correct = total = 0
+    for k in range(len(templates)):
+        classifier = LexicalIntentClassifier(templates[:k] + templates[k + 1:],
+                                             template_intents[:k] + template_intents[k + 1:])
+        for name in names:
+            _, similarity, intent, margin = classifier.classify(fill(templates[k], name), name)
+            total += 1
+            if classifier.is_confident(similarity, margin):
+                answered += 1
+                correct += intent == template_intents[k]
+    return {"questions": total, "lexical_share": answered / total,
+            "lexical_accuracy": correct / answered if answered else None}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare the lexical intent cascade with the transformer alone")
+    arg_parser.add_argument('--names', type=int, default=20, help="Company names filled into each template")
+    arg_parser.add_argument('--out', default='bench_intent_cascade.json', help="JSON results file")
+    args = arg_parser.parse_args()
+
+    companies_df = pd.read_csv(os.path.join(DATA_DIR, TABLE_FILES['companies']))
+    names = companies_df['Name'].sample(args.names, random_state=0).tolist()
+    questions = build_questions(names)
+    name_index = CompanyNameIndex(companies_df)
+
+    transformer = IntentParser(lexical=False, company_index=name_index)
+    cascade = IntentParser(lexical=True, company_index=name_index)
+    transformer.load()
+    cascade.load()
+
+    print(f"⏱️  Parsing {len(questions):,} questions with the transformer only...")
+    reference, transformer_seconds = parse_all(transformer, questions)
+    METRICS.reset()
+    print(f"⏱️  Parsing {len(questions):,} questions with the lexical cascade...")
+    predicted, cascade_seconds = parse_all(cascade, questions)
+    counters = METRICS.snapshot()["counters"]
+
+    results = {}
+    for source in ('template', 'paraphrase', 'all'):
+        rows = [i for i, (_, _, question_source) in enumerate(questions) if source in ('all', question_source)]
+        results[source] = {
+            "questions": len(rows),
+            "agreement_with_transformer": sum(predicted[i] == reference[i] for i in rows) / len(rows),
+            "cascade_accuracy": sum(predicted[i] == questions[i][1] for i in rows) / len(rows),
+            "transformer_accuracy": sum(reference[i] == questions[i][1] for i in rows) / len(rows),
+        }
+    lexical = counters.get("intent_stage.lexical", 0)
+    report = {
+        "benchmark": "intent_cascade",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lexical_share": lexical / len(questions),
+        "stages": {name: value for name, value in counters.items() if name.startswith("intent_stage.")},
+        "results": results,
+        "latency": {"transformer": latency_summary(transformer_seconds),
+                    "cascade": latency_summary(cascade_seconds)},
+        "leave_one_out": leave_one_out_accuracy(names[:5]),
+    }
+
+    print(f"   lexical stage answered {lexical:,} of {len(questions):,} questions ({report['lexical_share']:.0%})")
+    for source, result in results.items():
+        print(f"   {source:<11} agreement {result['agreement_with_transformer']:6.1%}   "
+              f"accuracy cascade {result['cascade_accuracy']:6.1%}, transformer {result['transformer_accuracy']:6.1%}")
+    for mode, summary in report["latency"].items():
+        print(f"   {mode:<11} p50 {summary['p50_ms']:8.3f} ms   p99 {summary['p99_ms']:8.3f} ms")
+    loo = report["leave_one_out"]
+    print(f"   leave-one-out: lexical answered {loo['lexical_share']:.0%}, {loo['lexical_accuracy']:.1%} correct")
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
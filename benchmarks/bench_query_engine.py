@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the data loader and query engine.
+
+For each dataset size this generates (or reuses) a synthetic dataset, then
+measures in a fresh subprocess:
+  - load_data time and peak RSS
+  - index build time (CompanyNameIndex and CrmIndex)
+  - p50/p99 latency of get_best_company_match, check_status,
+    last_funding_event and last_contact, with the prebuilt indexes and
+    with the original full-table scans
+
+Results are written as JSON so runs can be diffed between commits.
+
+Usage:
+    python -m benchmarks.bench_query_engine --sizes 10000 100000 --out bench_query_engine.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.synthetic_data import SIZES, dataset_paths, generate_dataset
+
+DEFAULT_DATA_DIR = os.path.join(PROJECT_DIR, '.cache', 'synthetic')
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def sample_queries(names, count, seed=0):
+    """
+    Pick company names to query, with some typed sloppily to exercise fuzzy matching.
+
+    Every third name is lowercased and every fifth loses a character.
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i, position in enumerate(rng.integers(0, len(names), count)):
+        name = names[position]
+        if i % 3 == 0:
+            name = name.lower()
+        if i % 5 == 0 and len(name) > 4:
+            cut = int(rng.integers(1, len(name) - 1))
+            name = name[:cut] + name[cut + 1:]
+        queries.append(name)
+    return queries
+
+
+def latency_summary(seconds):
+    """
+    Summarize per-call timings in milliseconds.
+    """
+    ms = np.asarray(seconds) * 1000
+    return {
+        "calls": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def time_calls(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    return latency_summary(timings)
+
+
+def measure(data_dir, query_count, scan_query_count):
+    """
+    Measure one dataset in the current process.
+
+    Args:
+        data_dir (str): Directory written by generate_dataset
+        query_count (int): Queries per function with prebuilt indexes
+        scan_query_count (int): Queries per function with full-table scans, 0 to skip
+
+    Returns:
+        dict: Load, index build and latency measurements
+    """
+    from engine.data_loader import load_data
+    from engine.company_index import CompanyNameIndex
+    from engine.crm_index import CrmIndex
+    from engine.query_engine import get_best_company_match, check_status, last_funding_event, last_contact
+
+    start = time.perf_counter()
+    companies_df, contacts_df, opportunities_df = load_data(use_cache=False, skip_unused=True,
+                                                            paths=dataset_paths(data_dir))
+    load_seconds = time.perf_counter() - start
+    load_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    name_index = CompanyNameIndex(companies_df)
+    name_index_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    crm_index = CrmIndex(contacts_df, opportunities_df)
+    crm_index_seconds = time.perf_counter() - start
+
+    queries = sample_queries(companies_df['Name'].tolist(), query_count)
+    functions = {
+        "get_best_company_match": lambda q, **kw: get_best_company_match(q, companies_df, **kw),
+        "check_status": lambda q, **kw: check_status(companies_df, q, **kw),
+        "last_funding_event": lambda q, **kw: last_funding_event(opportunities_df, companies_df, q, **kw),
+        "last_contact": lambda q, **kw: last_contact(contacts_df, q, companies_df, **kw),
+    }
+    indexed_kwargs = {
+        "get_best_company_match": {"name_index": name_index},
+        "check_status": {"name_index": name_index},
+        "last_funding_event": {"name_index": name_index, "crm_index": crm_index},
+        "last_contact": {"name_index": name_index, "crm_index": crm_index},
+    }
+
+    latency = {"indexed": {}, "scan": {}}
+    for name, fn in functions.items():
+        latency["indexed"][name] = time_calls(lambda q: fn(q, **indexed_kwargs[name]), queries)
+        if scan_query_count:
+            latency["scan"][name] = time_calls(fn, queries[:scan_query_count])
+
+    return {
+        "rows": {"companies": len(companies_df), "contacts": len(contacts_df),
+                 "opportunities": len(opportunities_df)},
+        "load_seconds": load_seconds,
+        "load_peak_rss_mb": load_rss,
+        "name_index_build_seconds": name_index_seconds,
+        "crm_index_build_seconds": crm_index_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "latency": latency,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark load time, memory and query latency by dataset size")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES[:3], help="Rows per table")
+    arg_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where synthetic datasets are kept")
+    arg_parser.add_argument('--queries', type=int, default=200, help="Queries per function with indexes")
+    arg_parser.add_argument('--scan-queries', type=int, default=20,
+                            help="Queries per function with full-table scans, 0 to skip")
+    arg_parser.add_argument('--out', default='bench_query_engine.json', help="JSON results file")
+    arg_parser.add_argument('--measure', metavar='DATASET_DIR', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.measure:
+        # Child process: measure one dataset and print the result as JSON
+        print(json.dumps(measure(args.measure, args.queries, args.scan_queries)))
+        return
+
+    results = []
+    for size in args.sizes:
+        dataset_dir = os.path.join(args.data_dir, str(size))
+        if dataset_paths(dataset_dir) is None:
+            print(f"🧪 Generating {size:,} rows per table in {dataset_dir}...")
+            generate_dataset(dataset_dir, size)
+
+        print(f"⏱️  Measuring {size:,} rows...")
+        # A fresh interpreter per size keeps peak RSS readings independent
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_query_engine', '--measure', dataset_dir,
+             '--queries', str(args.queries), '--scan-queries', str(args.scan_queries)],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        result = {"size": size, **json.loads(completed.stdout.strip().splitlines()[-1])}
+        results.append(result)
+
+        print(f"   load {result['load_seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB, "
+              f"index build {result['name_index_build_seconds'] + result['crm_index_build_seconds']:.2f}s")
+        for mode, functions in result["latency"].items():
+            for name, summary in functions.items():
+                print(f"   {mode:<7} {name:<24} p50 {summary['p50_ms']:9.3f} ms   p99 {summary['p99_ms']:9.3f} ms")
+
+    report = {
+        "benchmark": "query_engine",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
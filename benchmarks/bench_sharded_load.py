@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel loading of sharded CSV exports.
+
+Generates (or reuses) a synthetic dataset split into dated shard files per
+table, then times load_data parsing the shards one at a time against
+parsing them on a thread pool and on a process pool.
+
+Usage:
+    python -m benchmarks.bench_sharded_load --rows 1000000 --shards 16 --workers 4 8
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.bench_query_engine import git_commit
+from benchmarks.synthetic_data import dataset_paths, generate_dataset
+from engine.data_loader import load_data
+
+DEFAULT_DATA_DIR = os.path.join(PROJECT_DIR, '.cache', 'synthetic')
+
+
+def time_load(paths, repeats, **options):
+    """
+    Best-of-repeats wall time of load_data, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_data(use_cache=False, skip_unused=True, paths=paths, **options)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare sequential and parallel loading of sharded CSVs")
+    arg_parser.add_argument('--rows', type=int, default=1_000_000, help="Rows per table")
+    arg_parser.add_argument('--shards', type=int, default=16, help="Shard files per table")
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8], help="Pool sizes to try")
+    arg_parser.add_argument('--repeats', type=int, default=3, help="Runs per configuration, the best is kept")
+    arg_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where synthetic datasets are kept")
+    arg_parser.add_argument('--out', default='bench_sharded_load.json', help="JSON results file")
+    args = arg_parser.parse_args()
+
+    dataset_dir = os.path.join(args.data_dir, f"{args.rows}-shards{args.shards}")
+    paths = dataset_paths(dataset_dir, sharded=True)
+    if paths is None:
+        print(f"🧪 Generating {args.rows:,} rows per table in {args.shards} shards under {dataset_dir}...")
+        paths = generate_dataset(dataset_dir, args.rows, shards=args.shards)
+
+    print(f"⏱️  Loading {args.rows:,} rows per table from {args.shards} shards ({os.cpu_count()} CPUs)...")
+    sequential = time_load(paths, args.repeats, workers=1)
+    print(f"   sequential           {sequential:7.2f}s")
+    results = [{"pool": "sequential", "workers": 1, "seconds": sequential, "speedup": 1.0}]
+    for pool in ('thread', 'process'):
+        for workers in args.workers:
+            seconds = time_load(paths, args.repeats, workers=workers, pool=pool)
+            results.append({"pool": pool, "workers": workers, "seconds": seconds, "speedup": sequential / seconds})
+            print(f"   {pool:<7} x{workers:<3}        {seconds:7.2f}s   {sequential / seconds:5.2f}x")
+
+    report = {
+        "benchmark": "sharded_load",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "rows": args.rows,
+        "shards": args.shards,
+        "results": results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
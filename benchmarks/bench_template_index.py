@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the template index as the intent catalog grows.
+
+For each catalog size this builds synthetic template embeddings, grouped
+around one direction per intent as real phrasings of an intent are, and
+queries that are noisy copies of random templates. It then compares the
+exact search (one matrix product over every template) with the IVF
+search, reporting:
+  - index build time
+  - p50/p99 latency of matching one query, for both searches
+  - recall@1 of the IVF search against the exact one, and how often both
+    pick the same intent
+
+No model is loaded, so catalogs far larger than TEMPLATES can be tried.
+
+Usage:
+    python -m benchmarks.bench_template_index --sizes 1000 10000 100000 --out bench_template_index.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+from benchmarks.bench_query_engine import git_commit, latency_summary
+from llm_engine.template_index import PROBES, TemplateIndex
+
+
+def _unit(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def synthetic_catalog(size, dimensions, templates_per_intent, seed=0):
+    """
+    Template embeddings scattered around one random direction per intent.
+
+    Returns:
+        tuple: (embeddings, intent name per template)
+    """
+    rng = np.random.default_rng(seed)
+    intent_count = max(1, size // templates_per_intent)
+    centers = _unit(rng.standard_normal((intent_count, dimensions)))
+    intent_ids = rng.integers(0, intent_count, size)
+    noise = rng.standard_normal((size, dimensions)) / np.sqrt(dimensions)
+    return _unit(centers[intent_ids] + noise), [f"intent_{i}" for i in intent_ids]
+
+
+def time_queries(index, queries):
+    """
+    Search one query at a time, as the chat does.
+
+    Returns:
+        tuple: (best template per query, per-query seconds)
+    """
+    best, seconds = [], []
+    for query in queries:
+        start = time.perf_counter()
+        positions, _ = index.search(query[None, :])
+        seconds.append(time.perf_counter() - start)
+        best.append(positions[0, 0])
+    return np.array(best), seconds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare exact and IVF template search by catalog size")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="Templates per catalog")
+    arg_parser.add_argument('--dimensions', type=int, default=384, help="Embedding size")
+    arg_parser.add_argument('--templates-per-intent', type=int, default=100, help="Phrasings per intent")
+    arg_parser.add_argument('--queries', type=int, default=500, help="Queries per catalog")
+    arg_parser.add_argument('--probes', type=int, default=PROBES, help="Inverted lists scanned per query")
+    arg_parser.add_argument('--out', default='bench_template_index.json', help="JSON results file")
+    args = arg_parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        print(f"⏱️  Catalog of {size:,} templates...")
+        embeddings, template_intents = synthetic_catalog(size, args.dimensions, args.templates_per_intent)
+        templates = [f"template {i}" for i in range(size)]
+        rng = np.random.default_rng(1)
+        picked = rng.integers(0, size, args.queries)
+        queries = _unit(embeddings[picked] + rng.standard_normal((args.queries, args.dimensions))
+                        * 0.5 / np.sqrt(args.dimensions))
+
+        exact = TemplateIndex(templates, template_intents, min_ivf_templates=size + 1)
+        exact.build(embeddings)
+        ivf = TemplateIndex(templates, template_intents, probes=args.probes, min_ivf_templates=0)
+        start = time.perf_counter()
+        ivf.build(embeddings)
+        build_seconds = time.perf_counter() - start
+
+        exact_best, exact_seconds = time_queries(exact, queries)
+        ivf_best, ivf_seconds = time_queries(ivf, queries)
+        result = {
+            "templates": size,
+            "intents": len(exact.intents),
+            "lists": len(ivf.centroids),
+            "probes": args.probes,
+            "build_seconds": build_seconds,
+            "latency": {"exact": latency_summary(exact_seconds), "ivf": latency_summary(ivf_seconds)},
+            "recall_at_1": float(np.mean(ivf_best == exact_best)),
+            "intent_agreement": float(np.mean(exact.intent_ids[ivf_best] == exact.intent_ids[exact_best])),
+        }
+        results.append(result)
+        print(f"   {result['intents']} intents, {result['lists']} lists, built in {build_seconds:.2f}s")
+        for mode, summary in result["latency"].items():
+            print(f"   {mode:<6} p50 {summary['p50_ms']:8.3f} ms   p99 {summary['p99_ms']:8.3f} ms")
+        print(f"   recall@1 {result['recall_at_1']:6.1%}, same intent {result['intent_agreement']:6.1%}")
+
+    report = {
+        "benchmark": "template_index",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dimensions": args.dimensions,
+        "results": results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import-time report for the CRM Chat Assistant.
+
+Runs a fresh interpreter with `-X importtime` for each entry-point module
+and reports the slowest imports, so startup regressions show up before
+they reach users.
+
+Usage:
+    python -m benchmarks.import_times
+    python -m benchmarks.import_times --top 30 --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES = ['main', 'ui.chat_cli', 'llm_engine.intent_parser', 'engine.query_engine']
+
+
+def measure_imports(module):
+    """
+    Measure per-module import times for importing one module in a fresh interpreter.
+
+    Args:
+        module (str): Module to import
+
+    Returns:
+        list: Dicts with module, self_us and cumulative_us, in import order
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Report import times of the assistant's entry points")
+    arg_parser.add_argument('modules', nargs='*', default=ENTRY_MODULES, help="Modules to import")
+    arg_parser.add_argument('--top', type=int, default=15, help="Slowest imports to list per module")
+    arg_parser.add_argument('--json', dest='json_path', help="Also write the full report to this file")
+    args = arg_parser.parse_args()
+
+    report = {}
+    for module in args.modules:
+        timings = measure_imports(module)
+        report[module] = timings
+        total_us = next((t['cumulative_us'] for t in reversed(timings) if t['module'] == module), 0)
+
+        print(f"\n📦 import {module}: {total_us / 1000:.1f} ms total, {len(timings)} modules")
+        for timing in sorted(timings, key=lambda t: t['cumulative_us'], reverse=True)[:args.top]:
+            print(f"   {timing['cumulative_us'] / 1000:9.1f} ms  {timing['self_us'] / 1000:8.1f} ms self  {timing['module']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Wrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
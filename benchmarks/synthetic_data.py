@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic CRM data generator.
+
+Writes companies, contacts and opportunities CSVs with the same columns and
+value formats as the files in data/, at any size. The same size and seed
+always produce byte-identical files, so benchmark runs are comparable
+across commits.
+
+Usage:
+    python -m benchmarks.synthetic_data --rows 100000 --out .cache/synthetic/100000
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+CHUNK_ROWS = 250_000
+
+SURNAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+    "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell", "Carter", "Roberts",
+    "Bowman", "Spears", "Madden", "Bryant", "Evans", "Guzman", "Schmidt", "Stanley", "Frost", "Huff",
+    "Leon", "Johnston", "Fisher", "Weaver", "Holt", "Barker", "Cross", "Pratt", "Duran", "Vance",
+])
+FIRST_NAMES = np.array([
+    "William", "Maria", "James", "Linda", "Robert", "Patricia", "Michael", "Jennifer", "David", "Elizabeth",
+    "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy",
+    "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Sandra", "Steven", "Ashley", "Paul", "Emily",
+])
+NAME_PATTERNS = ["{a}-{b}", "{a} and Sons", "{a} LLC", "{a}, {b} and {c}", "{a} Group", "{a} PLC", "{a} Inc",
+                 "{a} Ltd", "{a} and {b}"]
+CITIES = np.array(["Smithburgh", "Wilsonside", "Lake Jessica", "North Mark", "Port Daniel", "East Linda",
+                   "New Karen", "South Paul", "West Nancy", "Fort Emily"])
+STATES = np.array(["NY", "AR", "CA", "TX", "WA", "MA", "IL", "CO", "GA", "FL", "OR", "NC"])
+DOMAINS = np.array(["gmail.com", "yahoo.com", "hotmail.com", "example.org", "example.net"])
+
+INDUSTRIES = ["AI", "AgTech", "Biotech", "CleanTech", "EdTech", "FinTech", "HealthTech", "Robotics", "SaaS"]
+COMPANY_STAGES = ["Discovery", "Exited", "Funded", "MVP", "Scaling"]
+PROGRAMS = ["Bootcamp Cohort 1", "Bootcamp Cohort 2", "Concept to Customer", "Pre-Seed Lab", "Venture Studio"]
+ROLES = ["CEO", "CTO", "COO", "Founder"]
+OPP_STAGES = ["Closed Won", "Lost", "Open"]
+OPP_TYPES = ["Pre-Seed", "Seed", "Series A", "Series B"]
+
+FIRST_DATE = np.datetime64("2024-01-01")
+DATE_SPAN_DAYS = 580
+
+
+def _ids(prefix, start, count, width):
+    return np.char.add(prefix, np.char.zfill(np.arange(start + 1, start + count + 1).astype(str), width))
+
+
+def _dates(rng, count):
+    return (FIRST_DATE + rng.integers(0, DATE_SPAN_DAYS, count).astype("timedelta64[D]")).astype(str)
+
+
+def _company_names(rng, count):
+    parts = [SURNAMES[rng.integers(0, len(SURNAMES), count)] for _ in range(3)]
+    pattern_ids = rng.integers(0, len(NAME_PATTERNS), count)
+    names = np.empty(count, dtype=object)
+    for pattern_id, pattern in enumerate(NAME_PATTERNS):
+        rows = np.flatnonzero(pattern_ids == pattern_id)
+        names[rows] = [pattern.format(a=a, b=b, c=c)
+                       for a, b, c in zip(parts[0][rows], parts[1][rows], parts[2][rows])]
+    return names
+
+
+def companies_chunk(rng, start, count, width):
+    """
+    Generate one chunk of the companies table.
+    """
+    return pd.DataFrame({
+        "Company_ID": _ids("C", start, count, width),
+        "Name": _company_names(rng, count),
+        "Industry": rng.choice(INDUSTRIES, count),
+        "Stage": rng.choice(COMPANY_STAGES, count),
+        "Last_Contacted": _dates(rng, count),
+        "Program": rng.choice(PROGRAMS, count),
+        "Total_Funding": rng.integers(50_000, 10_000_000, count),
+        "Location": np.char.add(np.char.add(rng.choice(CITIES, count), ", "), rng.choice(STATES, count)),
+    })
+
+
+def contacts_chunk(rng, start, count, width, company_count):
+    """
+    Generate one chunk of the contacts table.
+    """
+    first = rng.choice(FIRST_NAMES, count)
+    last = rng.choice(SURNAMES, count)
+    emails = np.char.add(np.char.add(np.char.lower(first), np.char.lower(last)),
+                         rng.integers(1, 1000, count).astype(str))
+    return pd.DataFrame({
+        "Contact_ID": _ids("P", start, count, width),
+        "Name": np.char.add(np.char.add(first, " "), last),
+        "Role": rng.choice(ROLES, count),
+        "Email": np.char.add(np.char.add(emails, "@"), rng.choice(DOMAINS, count)),
+        "Company_ID": np.char.add("C", np.char.zfill(rng.integers(1, company_count + 1, count).astype(str), width)),
+        "Last_Meeting": _dates(rng, count),
+    })
+
+
+def opportunities_chunk(rng, start, count, width, company_count):
+    """
+    Generate one chunk of the opportunities table. Open rounds have no close date.
+    """
+    stages = rng.choice(OPP_STAGES, count)
+    closed = _dates(rng, count).astype(object)
+    closed[stages == "Open"] = ""
+    return pd.DataFrame({
+        "Opp_ID": _ids("O", start, count, width),
+        "Company_ID": np.char.add("C", np.char.zfill(rng.integers(1, company_count + 1, count).astype(str), width)),
+        "Stage": stages,
+        "Type": rng.choice(OPP_TYPES, count),
+        "Amount": rng.integers(100_000, 10_000_000, count),
+        "Date_Closed": closed,
+    })
+
+
+def generate_dataset(out_dir, rows, seed=0, chunk_rows=CHUNK_ROWS, shards=1):
+    """
+    Write a synthetic dataset with `rows` rows in each table.
+
+    Tables are generated and written chunk by chunk, so memory use stays
+    flat however large `rows` is. With shards > 1 each table is split
+    into a directory of dated shard files, like a sharded CRM export; the
+    rows are the same as with one file when chunk_rows divides the shard size.
+
+    Args:
+        out_dir (str): Directory for companies.csv, contacts.csv and opportunities.csv
+        rows (int): Rows per table
+        seed (int): Random seed
+        chunk_rows (int): Rows generated per chunk
+        shards (int): Files per table
+
+    Returns:
+        dict: Table name to CSV path or shard directory, as accepted by load_data(paths=...)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    width = max(4, len(str(rows)))
+    builders = {
+        "companies": lambda rng, start, count: companies_chunk(rng, start, count, width),
+        "contacts": lambda rng, start, count: contacts_chunk(rng, start, count, width, rows),
+        "opportunities": lambda rng, start, count: opportunities_chunk(rng, start, count, width, rows),
+    }
+
+    shard_rows = -(-rows // shards)
+    paths = {}
+    for table_number, (table, build) in enumerate(builders.items()):
+        if shards == 1:
+            shard_paths = [os.path.join(out_dir, f"{table}.csv")]
+            paths[table] = shard_paths[0]
+        else:
+            paths[table] = os.path.join(out_dir, table)
+            os.makedirs(paths[table], exist_ok=True)
+            shard_paths = [os.path.join(paths[table], f"{table}-{day:%Y-%m-%d}.csv")
+                           for day in pd.date_range("2025-01-01", periods=shards)]
+
+        chunk_number = 0
+        for shard_number, path in enumerate(shard_paths):
+            shard_start = shard_number * shard_rows
+            shard_end = min(rows, shard_start + shard_rows)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", newline="") as f:
+                for start in range(shard_start, shard_end, chunk_rows):
+                    rng = np.random.default_rng([seed, table_number, chunk_number])
+                    chunk = build(rng, start, min(chunk_rows, shard_end - start))
+                    chunk.to_csv(f, index=False, header=(start == shard_start))
+                    chunk_number += 1
+            os.replace(tmp_path, path)
+    return paths
+
+
+def dataset_paths(out_dir, sharded=False):
+    """
+    Get the table paths of a dataset written by generate_dataset, or None if it is incomplete.
+    """
+    paths = {table: os.path.join(out_dir, table if sharded else f"{table}.csv")
+             for table in ("companies", "contacts", "opportunities")}
+    return paths if all(os.path.exists(path) for path in paths.values()) else None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate synthetic CRM CSVs")
+    arg_parser.add_argument("--rows", type=int, required=True, help="Rows per table")
+    arg_parser.add_argument("--out", required=True, help="Output directory")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    arg_parser.add_argument("--shards", type=int, default=1, help="Files per table")
+    args = arg_parser.parse_args()
+
+    paths = generate_dataset(args.out, args.rows, args.seed, shards=args.shards)
+    for table, path in paths.items():
+        print(f"💾 {table}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import re
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+CompanyMatch = namedtuple("CompanyMatch", ["company_id", "name", "score", "position"])
+
+_NON_ALNUM = re.compile(r"[^0-9a-z&]+")
+
+
+def normalize_name(name):
+    """
+    Normalize a company name for matching.
+
+    Lowercases the name and collapses punctuation and whitespace runs into
+    single spaces, so "Bowman-Campbell" and "bowman campbell" compare equal.
+
+    Args:
+        name (str): Raw company name
+
+    Returns:
+        str: Normalized name
+    """
+    return _NON_ALNUM.sub(" ", str(name).lower()).strip()
+
+
+def name_ngrams(normalized, n=3):
+    """
+    Get the set of character n-grams of a normalized name.
+
+    Args:
+        normalized (str): Name already passed through normalize_name
+        n (int): N-gram length
+
+    Returns:
+        set: Character n-grams, padded so short names still produce grams
+    """
+    padded = f" {normalized} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class CompanyNameIndex:
+    def __init__(self, companies_df=None, ngram=3, max_candidates=64, score_cutoff=70):
+        """
+        Build a fuzzy company-name index.
+
+        Names are normalized once up front and indexed by character n-gram.
+        A query only runs the fuzzy scorer against the companies sharing the
+        most n-grams with it, instead of the whole companies table.
+
+        Args:
+            companies_df (pd.DataFrame): Companies dataframe to index
+            ngram (int): Character n-gram length used for blocking
+            max_candidates (int): Number of candidates passed to the fuzzy scorer
+            score_cutoff (int): Matches must score above this to be returned
+        """
+        self.ngram = ngram
+        self.max_candidates = max_candidates
+        self.score_cutoff = score_cutoff
+        self.company_ids = []
+        self.names = []
+        self.normalized = []
+        self._exact = {}
+        self._max_tokens = 0
+        self._postings = defaultdict(list)
+        self._posting_arrays = {}
+        if companies_df is not None:
+            self.add_many(companies_df['Company_ID'].tolist(), companies_df['Name'].tolist())
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def max_tokens(self):
+        """
+        Most tokens in any normalized name, the longest span find_mention tries.
+        """
+        return self._max_tokens
+
+    def add(self, company_id, name):
+        """
+        Add a single company to the index.
+
+        Args:
+            company_id: Company_ID of the company
+            name (str): Company name
+        """
+        position = len(self.names)
+        normalized = normalize_name(name)
+        self.company_ids.append(company_id)
+        self.names.append(name)
+        self.normalized.append(normalized)
+        # Keep the first company for duplicate names, like a DataFrame lookup would
+        self._exact.setdefault(normalized, position)
+        self._max_tokens = max(self._max_tokens, normalized.count(" ") + 1)
+        for gram in name_ngrams(normalized, self.ngram):
+            postings = self._postings[gram]
+            if not isinstance(postings, list):
+                # Postings restored from a state snapshot are read-only arrays
+                postings = self._postings[gram] = postings.tolist()
+            postings.append(position)
+            self._posting_arrays.pop(gram, None)
+
+    def add_many(self, company_ids, names):
+        """
+        Add several companies to the index.
+
+        Args:
+            company_ids (list): Company_ID values
+            names (list): Company names, aligned with company_ids
+        """
+        for company_id, name in zip(company_ids, names):
+            self.add(company_id, name)
+
+    def posting_arrays(self):
+        """
+        Get the n-gram postings as flat arrays, as saved in a state snapshot.
+
+        Returns:
+            tuple: (grams, offsets, positions), where the positions of grams[i]
+                are positions[offsets[i]:offsets[i + 1]]
+        """
+        grams = list(self._postings)
+        lengths = [len(self._postings[gram]) for gram in grams]
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = (np.concatenate([self._posting_array(gram) for gram in grams]) if grams
+                     else np.empty(0, dtype=np.int64))
+        return grams, offsets, positions
+
+    @classmethod
+    def from_arrays(cls, company_ids, names, normalized, grams, offsets, positions, ngram=3,
+                    max_candidates=64, score_cutoff=70, max_tokens=None):
+        """
+        Restore an index from saved names and postings, without re-normalizing or re-tokenizing.
+
+        The posting arrays are used as they are, so arrays memory-mapped from
+        a state snapshot stay shared with other processes mapping the same file.
+
+        Args:
+            company_ids (list): Company_ID values
+            names (list): Company names, aligned with company_ids
+            normalized (list): Names passed through normalize_name
+            grams (list): N-grams, see posting_arrays
+            offsets (np.ndarray): Start of each gram's positions, see posting_arrays
+            positions (np.ndarray): Concatenated posting lists
+            ngram (int): N-gram length the postings were built with
+            max_candidates (int): Number of candidates passed to the fuzzy scorer
+            score_cutoff (int): Matches must score above this to be returned
+            max_tokens (int): Most tokens in a normalized name, counted if None
+
+        Returns:
+            CompanyNameIndex: Restored index
+        """
+        index = cls(None, ngram, max_candidates, score_cutoff)
+        index.company_ids, index.names, index.normalized = (
+            values if isinstance(values, list) else list(values) for values in (company_ids, names, normalized))
+        count = len(index.normalized)
+        # Inserting in reverse keeps the first company for duplicate names
+        index._exact = dict(zip(reversed(index.normalized), range(count - 1, -1, -1)))
+        if max_tokens is None:
+            max_tokens = max((name.count(" ") + 1 for name in index._exact), default=0)
+        index._max_tokens = max_tokens
+        for i, gram in enumerate(grams):
+            index._postings[gram] = index._posting_arrays[gram] = positions[offsets[i]:offsets[i + 1]]
+        return index
+
+    def _posting_array(self, gram):
+        array = self._posting_arrays.get(gram)
+        if array is None:
+            array = np.asarray(self._postings[gram], dtype=np.int64)
+            self._posting_arrays[gram] = array
+        return array
+
+    def candidates(self, normalized_query):
+        """
+        Get the positions of the companies sharing the most n-grams with a query.
+
+        Args:
+            normalized_query (str): Query already passed through normalize_name
+
+        Returns:
+            np.ndarray: Candidate positions in ascending order
+        """
+        if len(self.names) <= self.max_candidates:
+            return np.arange(len(self.names))
+
+        postings = [self._posting_array(gram) for gram in name_ngrams(normalized_query, self.ngram)
+                    if gram in self._postings]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+
+        overlap = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        hits = np.flatnonzero(overlap)
+        if len(hits) > self.max_candidates:
+            # Stable sort so ties keep the earliest rows, matching a full scan
+            top = np.argsort(-overlap[hits], kind="stable")[:self.max_candidates]
+            hits = np.sort(hits[top])
+        return hits
+
+    def find_mention(self, text, ignore=frozenset()):
+        """
+        Find the longest known company name mentioned in free text.
+
+        The normalized names double as a token trie flattened into a hash
+        table: one left-to-right pass over the text's tokens tries each
+        start position against the names of every length up to the longest
+        name, so the cost depends on the text length, not the table size.
+
+        Args:
+            text (str): Free text such as a user question
+            ignore (frozenset): Normalized tokens that cannot form a mention on their own
+
+        Returns:
+            CompanyMatch: Longest mention (earliest on ties) with score 100, or None
+        """
+        tokens = normalize_name(text).split()
+        best, best_length = None, 0
+        for start in range(len(tokens)):
+            for length in range(min(self._max_tokens, len(tokens) - start), best_length, -1):
+                span = tokens[start:start + length]
+                position = self._exact.get(" ".join(span))
+                if position is not None and not all(token in ignore for token in span):
+                    best, best_length = position, length
+                    break
+        if best is None:
+            return None
+        return CompanyMatch(self.company_ids[best], self.names[best], 100.0, best)
+
+    def match(self, company_name):
+        """
+        Resolve a company name to the best matching company.
+
+        Args:
+            company_name (str): Company name to search for
+
+        Returns:
+            CompanyMatch: Matched company_id, name, score and position, or None
+        """
+        normalized_query = normalize_name(company_name)
+        if not normalized_query:
+            return None
+
+        position = self._exact.get(normalized_query)
+        if position is not None:
+            return CompanyMatch(self.company_ids[position], self.names[position], 100.0, position)
+
+        positions = self.candidates(normalized_query)
+        if len(positions) == 0:
+            return None
+
+        # Scored on the original names, as a full scan does: WRatio's token
+        # matching would treat the words of a hyphenated name as separate tokens
+        choices = [self.names[position] for position in positions]
+        best = process.extractOne(company_name, choices, scorer=fuzz.WRatio,
+                                  score_cutoff=self.score_cutoff)
+        if best is None or best[1] <= self.score_cutoff:
+            return None
+
+        position = int(positions[best[2]])
+        return CompanyMatch(self.company_ids[position], self.names[position], best[1], position)
@@ -0,0 +1,251 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+# Entry fields per lookup table, in the column order of to_frames()
+CONTACT_FIELDS = ["last_meeting", "contact_name", "contact_role", "count"]
+FUNDING_FIELDS = ["date_closed", "funding_type", "amount", "count"]
+
+
+def _is_later(new_date, old_date):
+    """
+    Check whether new_date should replace old_date as the latest date.
+
+    Missing dates sort last, and ties keep the row that was seen first.
+    """
+    if pd.isna(new_date):
+        return False
+    return pd.isna(old_date) or new_date > old_date
+
+
+def _latest_per_company(df, date_column):
+    """
+    Reduce a table to its most recent row per company.
+
+    Args:
+        df (pd.DataFrame): Table with Company_ID and a date column
+        date_column (str): Column to order rows by
+
+    Returns:
+        tuple: (latest rows as a DataFrame, list of row counts aligned with them)
+    """
+    dates = pd.to_datetime(df[date_column])
+    latest = (df.assign(**{date_column: dates})
+                .sort_values(date_column, ascending=False, kind='stable', na_position='last')
+                .drop_duplicates('Company_ID', keep='first'))
+    counts = latest['Company_ID'].map(df['Company_ID'].value_counts(sort=False))
+    return latest, counts.tolist()
+
+
+class FrameLookup(MutableMapping):
+    def __init__(self, frame):
+        """
+        Per-company entries read on demand from a frame indexed by Company_ID.
+
+        Used for lookup tables restored from a state snapshot: nothing is
+        converted up front, and an entry becomes a dict the first time it is
+        read, so merges can update it in place like a CrmIndex entry.
+
+        Args:
+            frame (pd.DataFrame): One row per company, indexed by Company_ID
+        """
+        self._frame = frame
+        self._columns = {column: frame[column] for column in frame.columns}
+        self._entries = {}
+        self._deleted = set()
+
+    def _row(self, company_id):
+        if company_id in self._deleted:
+            return None
+        try:
+            position = self._frame.index.get_loc(company_id)
+        except (KeyError, TypeError):
+            return None
+        entry = {}
+        for column, values in self._columns.items():
+            value = values.iloc[position]
+            entry[column] = value.item() if isinstance(value, np.generic) else value
+        return entry
+
+    def __getitem__(self, company_id):
+        entry = self._entries.get(company_id)
+        if entry is None:
+            entry = self._row(company_id)
+            if entry is None:
+                raise KeyError(company_id)
+            self._entries[company_id] = entry
+        return entry
+
+    def __setitem__(self, company_id, entry):
+        self._entries[company_id] = entry
+
+    def __delitem__(self, company_id):
+        self[company_id]
+        self._entries.pop(company_id)
+        self._deleted.add(company_id)
+
+    def __iter__(self):
+        for company_id in self._frame.index.tolist():
+            if company_id not in self._deleted:
+                yield company_id
+        for company_id in self._entries:
+            if company_id not in self._frame.index:
+                yield company_id
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class CrmIndex:
+    def __init__(self, contacts_df=None, opportunities_df=None):
+        """
+        Build per-company lookup tables for contacts and opportunities.
+
+        Each company maps to its latest meeting and latest Closed Won round,
+        along with the counts the query results report, so a lookup no longer
+        scans the contacts or opportunities tables.
+
+        Args:
+            contacts_df (pd.DataFrame): Contacts dataframe
+            opportunities_df (pd.DataFrame): Opportunities dataframe
+        """
+        self.contacts = {}
+        self.funding = {}
+        # Rows merged so far, including opportunities that were not Closed Won
+        self.contact_rows = 0
+        self.opportunity_rows = 0
+        if contacts_df is not None:
+            self.add_contacts(contacts_df)
+        if opportunities_df is not None:
+            self.add_opportunities(opportunities_df)
+
+    def add_contacts(self, contacts_df):
+        """
+        Merge contact rows into the per-company latest meeting table.
+
+        Args:
+            contacts_df (pd.DataFrame): Contacts rows to merge
+        """
+        self.contact_rows += len(contacts_df)
+        if contacts_df.empty:
+            return
+        latest, counts = _latest_per_company(contacts_df, 'Last_Meeting')
+        for company_id, count, name, role, meeting in zip(latest['Company_ID'].tolist(), counts, latest['Name'].tolist(),
+                                                          latest['Role'].tolist(), latest['Last_Meeting'].tolist()):
+            self._merge(self.contacts, company_id, count, 'last_meeting', meeting,
+                        {"contact_name": name, "contact_role": role})
+
+    def add_opportunities(self, opportunities_df):
+        """
+        Merge opportunity rows into the per-company latest Closed Won table.
+
+        Args:
+            opportunities_df (pd.DataFrame): Opportunities rows to merge
+        """
+        self.opportunity_rows += len(opportunities_df)
+        won = opportunities_df[opportunities_df['Stage'] == 'Closed Won']
+        if won.empty:
+            return
+        latest, counts = _latest_per_company(won, 'Date_Closed')
+        for company_id, count, funding_type, amount, closed in zip(latest['Company_ID'].tolist(), counts, latest['Type'].tolist(),
+                                                                   latest['Amount'].tolist(), latest['Date_Closed'].tolist()):
+            self._merge(self.funding, company_id, count, 'date_closed', closed,
+                        {"funding_type": funding_type, "amount": amount})
+
+    def record_meeting(self, company_id, meeting, contact_name, contact_role):
+        """
+        Merge a meeting logged against an existing contact, in O(1).
+
+        The contact is already counted, so only the company's latest meeting
+        can change.
+
+        Args:
+            company_id: Company_ID of the contact
+            meeting (pd.Timestamp): Meeting date
+            contact_name (str): Contact's name
+            contact_role (str): Contact's role
+        """
+        count = 0 if company_id in self.contacts else 1
+        self._merge(self.contacts, company_id, count, 'last_meeting', meeting,
+                    {"contact_name": contact_name, "contact_role": contact_role})
+
+    def record_closed_won(self, company_id, closed, funding_type, amount):
+        """
+        Merge an opportunity that just became Closed Won, in O(1).
+
+        Args:
+            company_id: Company_ID of the opportunity
+            closed (pd.Timestamp): Date the round closed
+            funding_type (str): Round type
+            amount (int): Round amount
+        """
+        self._merge(self.funding, company_id, 1, 'date_closed', closed,
+                    {"funding_type": funding_type, "amount": amount})
+
+    @staticmethod
+    def _merge(table, company_id, count, date_key, date, fields):
+        entry = table.get(company_id)
+        if entry is None:
+            table[company_id] = {date_key: date, "count": count, **fields}
+            return
+        entry["count"] += count
+        if _is_later(date, entry[date_key]):
+            entry[date_key] = date
+            entry.update(fields)
+
+    def to_frames(self):
+        """
+        Get both lookup tables as frames, as saved in a state snapshot.
+
+        Returns:
+            tuple: (contacts frame, funding frame), each indexed by Company_ID
+                with CONTACT_FIELDS or FUNDING_FIELDS columns
+        """
+        return (pd.DataFrame.from_dict(self.contacts, orient='index', columns=CONTACT_FIELDS),
+                pd.DataFrame.from_dict(self.funding, orient='index', columns=FUNDING_FIELDS))
+
+    @classmethod
+    def from_frames(cls, contacts_frame, funding_frame, contact_rows=0, opportunity_rows=0):
+        """
+        Restore an index from the frames to_frames() returned, without rebuilding it.
+
+        Args:
+            contacts_frame (pd.DataFrame): Latest meeting per company
+            funding_frame (pd.DataFrame): Latest Closed Won round per company
+            contact_rows (int): Contact rows the index was built from
+            opportunity_rows (int): Opportunity rows the index was built from
+
+        Returns:
+            CrmIndex: Index whose entries are read from the frames on demand
+        """
+        index = cls()
+        index.contacts = FrameLookup(contacts_frame)
+        index.funding = FrameLookup(funding_frame)
+        index.contact_rows = contact_rows
+        index.opportunity_rows = opportunity_rows
+        return index
+
+    def latest_contact(self, company_id):
+        """
+        Get the latest meeting for a company.
+
+        Args:
+            company_id: Company_ID to look up
+
+        Returns:
+            dict: last_meeting, contact_name, contact_role and count, or None
+        """
+        return self.contacts.get(company_id)
+
+    def latest_funding(self, company_id):
+        """
+        Get the latest Closed Won round for a company.
+
+        Args:
+            company_id: Company_ID to look up
+
+        Returns:
+            dict: date_closed, funding_type, amount and count, or None
+        """
+        return self.funding.get(company_id)
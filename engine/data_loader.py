@@ -1,25 +1,354 @@
 import pandas as pd
 import os
+import glob
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def load_data():
+from .crm_index import CrmIndex
+from .schema import apply_schema, primary_key, read_csv_dtypes, schema_columns
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+SNAPSHOT_DIR = os.path.join(PROJECT_DIR, '.cache', 'snapshots')
+
+# Bump when the typed schema changes so existing snapshots are rebuilt
+SCHEMA_VERSION = 1
+
+# Arrow schema metadata key holding a table snapshot's manifest
+SNAPSHOT_METADATA_KEY = b'crm_snapshot'
+
+TABLE_FILES = {
+    'companies': 'companies_1000.csv',
+    'contacts': 'contacts_1000.csv',
+    'opportunities': 'opportunities_1000.csv',
+}
+
+# Rows parsed per chunk by stream_data
+STREAM_CHUNK_ROWS = 100_000
+
+# Columns the per-company aggregates need from the streamed tables
+STREAM_COLUMNS = {
+    'contacts': ['Name', 'Role', 'Company_ID', 'Last_Meeting'],
+    'opportunities': ['Company_ID', 'Stage', 'Type', 'Amount', 'Date_Closed'],
+}
+
+def resolve_shards(path):
+    """
+    Expand a table path into the CSV files it names.
+
+    A path may be a single CSV file, a directory of *.csv shards or a glob
+    pattern. Shards are returned sorted by path, so dated shard names come
+    out oldest first and later shards win on duplicate IDs.
+
+    Args:
+        path (str): File, directory or glob pattern
+
+    Returns:
+        list: CSV paths
+    """
+    if os.path.isdir(path):
+        shards = sorted(glob.glob(os.path.join(path, '*.csv')))
+    elif any(char in path for char in '*?['):
+        shards = sorted(glob.glob(path))
+    else:
+        return [path]
+    if not shards:
+        raise FileNotFoundError(f"No CSV files match {path}")
+    return shards
+
+def table_paths(paths=None):
+    """
+    Get the path of every table, defaulting to the files in data/.
+
+    Args:
+        paths (dict): Table name to CSV path, directory or glob, for the tables to override
+
+    Returns:
+        dict: Table name to path for every table in TABLE_FILES
+    """
+    return {**{table: os.path.join(DATA_DIR, filename) for table, filename in TABLE_FILES.items()}, **(paths or {})}
+
+def _source_signature(path, validate):
+    """
+    Describe a source file so a snapshot can tell whether it is stale.
+
+    Args:
+        path (str): Source CSV path
+        validate (str): 'stat' for size and mtime, 'hash' to also hash the contents
+
+    Returns:
+        dict: Signature of the source file
+    """
+    stat = os.stat(path)
+    signature = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if validate == 'hash':
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature["sha256"] = digest.hexdigest()
+    return signature
+
+def read_table(table, path, typed=True, skip_unused=False):
+    """
+    Parse one CRM table from CSV.
+
+    Args:
+        table (str): Table name in TABLE_SCHEMAS
+        path (str): CSV path
+        typed (bool): Apply the compact schema from engine.schema
+        skip_unused (bool): Skip columns no query reads, such as contact emails
+
+    Returns:
+        pd.DataFrame: Parsed table
+    """
+    usecols = schema_columns(table, skip_unused) if skip_unused else None
+    if not typed:
+        return pd.read_csv(path, usecols=usecols)
+    df = pd.read_csv(path, usecols=usecols, dtype=read_csv_dtypes(table))
+    return apply_schema(table, df)
+
+def _snapshot_path(table, options, snapshot_dir):
+    """
+    Snapshot file of a table loaded with the given options.
+
+    The options are part of the name, so loads with different options,
+    such as load_data and stream_data, keep separate snapshots instead of
+    replacing each other's.
+    """
+    variant = f"{'typed' if options['typed'] else 'raw'}-{'used' if options['skip_unused'] else 'all'}"
+    return os.path.join(snapshot_dir, f"{table}.v{options['schema_version']}.{variant}.arrow")
+
+def _read_snapshot(table, signature, options, snapshot_dir):
+    """
+    Read a table snapshot if one exists for the given source signature and load options.
+
+    Returns:
+        pd.DataFrame: Cached table, or None when missing or stale
+    """
+    from pyarrow import feather
+    try:
+        arrow_table = feather.read_table(_snapshot_path(table, options, snapshot_dir), memory_map=True)
+    except (OSError, ValueError):
+        return None
+
+    manifest = json.loads((arrow_table.schema.metadata or {}).get(SNAPSHOT_METADATA_KEY, b'null'))
+    if not manifest or manifest.get("source") != signature or manifest.get("options") != options:
+        return None
+    return arrow_table.to_pandas()
+
+def _write_snapshot(table, df, signature, options, snapshot_dir):
+    """
+    Write a table snapshot, replacing any previous one for the same options.
+
+    The manifest (source signature and options) is kept in the Arrow schema
+    metadata, so the data and its manifest are replaced together in one rename.
+    """
+    import pyarrow as pa
+    from pyarrow import feather
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    snapshot_path = _snapshot_path(table, options, snapshot_dir)
+    arrow_table = pa.Table.from_pandas(df)
+    manifest = json.dumps({"source": signature, "options": options}).encode()
+    arrow_table = arrow_table.replace_schema_metadata({**(arrow_table.schema.metadata or {}),
+                                                       SNAPSHOT_METADATA_KEY: manifest})
+
+    # Write to a temporary file first so a crash never leaves a half-written snapshot
+    tmp_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    feather.write_feather(arrow_table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, snapshot_path)
+
+def _shards_signature(shards, validate):
+    if len(shards) == 1:
+        return _source_signature(shards[0], validate)
+    return [_source_signature(shard, validate) for shard in shards]
+
+def _load_options(typed, skip_unused):
+    return {"schema_version": SCHEMA_VERSION, "typed": typed, "skip_unused": skip_unused}
+
+def _load_table(table, path, use_cache, validate, snapshot_dir, typed, skip_unused):
+    """
+    Load one table, going through the snapshot cache when enabled.
+    """
+    shards = resolve_shards(path)
+    if not use_cache:
+        return combine_shards(table, [read_table(table, shard, typed, skip_unused) for shard in shards])
+
+    signature = _shards_signature(shards, validate)
+    options = _load_options(typed, skip_unused)
+    df = _read_snapshot(table, signature, options, snapshot_dir)
+    if df is None:
+        df = combine_shards(table, [read_table(table, shard, typed, skip_unused) for shard in shards])
+        _write_snapshot(table, df, signature, options, snapshot_dir)
+    return df
+
+def concat_tables(frames):
+    """
+    Concatenate typed frames of one table, keeping categorical columns categorical.
+
+    Categorical columns are given one shared category set first, so the
+    concatenated column stays categorical instead of falling back to text.
+
+    Args:
+        frames (list): Typed frames with the same columns
+
+    Returns:
+        pd.DataFrame: Rows of all frames in order, with a fresh RangeIndex
+    """
+    categorical = [column for column in frames[0].columns
+                   if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames)]
+    if categorical:
+        categories = {column: sorted(set().union(*(frame[column].cat.categories for frame in frames)))
+                      for column in categorical}
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories[column])
+                                  for column in categorical})
+                  for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def combine_shards(table, frames):
+    """
+    Concatenate the parsed shards of a table, keeping the last row per ID.
+
+    Args:
+        table (str): Table name in TABLE_SCHEMAS
+        frames (list): Parsed shards, oldest first
+
+    Returns:
+        pd.DataFrame: Combined table
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    df = concat_tables(frames)
+    key = primary_key(table)
+    if key in df.columns:
+        duplicated = df.duplicated(key, keep='last')
+        if duplicated.any():
+            df = df[~duplicated].reset_index(drop=True)
+    return df
+
+def load_data(use_cache=None, validate='stat', snapshot_dir=SNAPSHOT_DIR, typed=True, skip_unused=False, paths=None,
+              workers=None, pool='thread'):
     """
     Load the three CSV files into pandas DataFrames.
-    
+
+    By default the tables get the compact schema from engine.schema: ID
+    columns become integer surrogate keys (C0001 -> 1), low-cardinality
+    text columns become categoricals and date columns are parsed once to
+    datetime64.
+
+    With the snapshot cache enabled, each table is also written to an
+    uncompressed Arrow file under .cache/snapshots. Later loads memory-map
+    that file instead of parsing the CSV, until the CSV changes.
+
+    Each table path may also be a directory or glob of CSV shards. All
+    shards of all tables are parsed concurrently, then each table's shards
+    are concatenated with the last row kept for duplicate IDs.
+
+    Args:
+        use_cache (bool): Use the snapshot cache, defaults to the
+            CRM_SNAPSHOT_CACHE environment variable
+        validate (str): 'stat' to invalidate snapshots on size or mtime changes,
+            'hash' to also compare a hash of the CSV contents
+        snapshot_dir (str): Directory holding the snapshots
+        typed (bool): Apply the compact schema, False keeps raw CSV dtypes
+        skip_unused (bool): Skip columns no query reads, such as contact emails
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+        workers (int): Parser threads or processes, one per CPU by default; 1 parses one file at a time
+        pool (str): 'thread' or 'process'; processes avoid the GIL but copy each parsed shard back
+
     Returns:
         tuple: (companies_df, contacts_df, opportunities_df)
     """
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-    
-    # Load companies data
-    companies_path = os.path.join(data_dir, 'companies_1000.csv')
-    companies_df = pd.read_csv(companies_path)
-    
-    # Load contacts data
-    contacts_path = os.path.join(data_dir, 'contacts_1000.csv')
-    contacts_df = pd.read_csv(contacts_path)
-    
-    # Load opportunities data
-    opportunities_path = os.path.join(data_dir, 'opportunities_1000.csv')
-    opportunities_df = pd.read_csv(opportunities_path)
-    
-    return companies_df, contacts_df, opportunities_df 
\ No newline at end of file
+    if use_cache is None:
+        use_cache = os.environ.get('CRM_SNAPSHOT_CACHE', '') not in ('', '0')
+
+    paths = table_paths(paths)
+
+    shards = {table: resolve_shards(paths[table]) for table in TABLE_FILES}
+    options = _load_options(typed, skip_unused)
+
+    tables, signatures = {}, {}
+    if use_cache:
+        for table in TABLE_FILES:
+            signatures[table] = _shards_signature(shards[table], validate)
+            df = _read_snapshot(table, signatures[table], options, snapshot_dir)
+            if df is not None:
+                tables[table] = df
+
+    jobs = [(table, shard) for table in TABLE_FILES if table not in tables for shard in shards[table]]
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+    if len(jobs) > 1 and workers > 1:
+        executor_class = ProcessPoolExecutor if pool == 'process' else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            frames = list(executor.map(read_table, *zip(*jobs), [typed] * len(jobs), [skip_unused] * len(jobs)))
+    else:
+        frames = [read_table(table, shard, typed, skip_unused) for table, shard in jobs]
+
+    for table in TABLE_FILES:
+        if table in tables:
+            continue
+        tables[table] = combine_shards(table, [frame for (job_table, _), frame in zip(jobs, frames)
+                                               if job_table == table])
+        if use_cache:
+            _write_snapshot(table, tables[table], signatures[table], options, snapshot_dir)
+
+    return tables['companies'], tables['contacts'], tables['opportunities']
+
+def iter_table_chunks(table, path, chunk_rows=STREAM_CHUNK_ROWS, columns=None):
+    """
+    Parse a CRM table chunk by chunk.
+
+    Args:
+        table (str): Table name in TABLE_SCHEMAS
+        path (str): CSV path
+        chunk_rows (int): Rows per chunk
+        columns (list): Columns to read, all schema columns if None
+
+    Yields:
+        pd.DataFrame: Typed chunks of at most chunk_rows rows
+    """
+    with pd.read_csv(path, usecols=columns, dtype=read_csv_dtypes(table), chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield apply_schema(table, chunk)
+
+def stream_data(chunk_rows=STREAM_CHUNK_ROWS, use_cache=None, validate='stat', snapshot_dir=SNAPSHOT_DIR, paths=None):
+    """
+    Load the companies table and stream the other two into per-company aggregates.
+
+    Contacts and opportunities are parsed chunk by chunk and merged into a
+    CrmIndex (latest meeting, latest Closed Won round and counts per
+    company), so their full frames are never held and peak memory depends
+    on chunk_rows and the number of companies rather than the export size.
+    Sharded tables are streamed shard by shard; since no rows are kept,
+    duplicate IDs across shards are not removed.
+
+    Args:
+        chunk_rows (int): Rows parsed per chunk
+        use_cache (bool): Use the snapshot cache for the companies table, see load_data
+        validate (str): Snapshot validation mode, see load_data
+        snapshot_dir (str): Directory holding the snapshots
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+
+    Returns:
+        tuple: (companies_df, crm_index)
+    """
+    if use_cache is None:
+        use_cache = os.environ.get('CRM_SNAPSHOT_CACHE', '') not in ('', '0')
+
+    paths = table_paths(paths)
+
+    companies_df = _load_table('companies', paths['companies'], use_cache, validate, snapshot_dir,
+                               typed=True, skip_unused=True)
+    crm_index = CrmIndex()
+    for shard in resolve_shards(paths['contacts']):
+        for chunk in iter_table_chunks('contacts', shard, chunk_rows, STREAM_COLUMNS['contacts']):
+            crm_index.add_contacts(chunk)
+    for shard in resolve_shards(paths['opportunities']):
+        for chunk in iter_table_chunks('opportunities', shard, chunk_rows, STREAM_COLUMNS['opportunities']):
+            crm_index.add_opportunities(chunk)
+
+    return companies_df, crm_index
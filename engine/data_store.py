@@ -0,0 +1,342 @@
+import numpy as np
+import pandas as pd
+
+from .company_index import CompanyNameIndex
+from .crm_index import CrmIndex, _is_later
+from .data_loader import concat_tables
+from .query_engine import find_company
+from .schema import TABLE_SCHEMAS, parse_id, primary_key
+
+
+def _row_dict(df, position):
+    """
+    One table row as a dict of Python values.
+    """
+    row = {}
+    for column in df.columns:
+        value = df[column].iat[position]
+        row[column] = value.item() if isinstance(value, np.generic) else value
+    return row
+
+
+def _set_cell(df, position, column, value):
+    """
+    Overwrite one cell in place, adding the value to a categorical column's categories if needed.
+
+    A column read straight from a memory-mapped state snapshot is read-only,
+    and is copied once on its first write.
+    """
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        df[column] = series.cat.add_categories([value])
+    location = df.columns.get_loc(column)
+    try:
+        df.iat[position, location] = value
+    except ValueError:
+        df[column] = df[column].copy()
+        df.iat[position, location] = value
+
+
+class DataStore:
+    """
+    Storage interface the query functions read CRM data through.
+
+    A store resolves company names to company rows and answers the
+    per-company latest contact and funding lookups. Company rows support
+    item access by the companies CSV column names (Name, Stage, ...), and
+    dates may be Timestamps or YYYY-MM-DD strings.
+
+    Stores that can look records up by ID and apply writes (get_contact,
+    get_opportunity, log_meeting and close_won) set supports_writes.
+    """
+
+    # Whether the record lookups by ID and the write methods are available
+    supports_writes = False
+
+    def find_company(self, company_name):
+        """
+        Find the company row that best matches a company name.
+
+        Args:
+            company_name (str): Company name to search for
+
+        Returns:
+            Company row (pd.Series, sqlite3.Row or dict), or None
+        """
+        raise NotImplementedError
+
+    def find_mention(self, text, ignore=frozenset()):
+        """
+        Find the longest known company name mentioned in free text.
+
+        Args:
+            text (str): Free text such as a user question
+            ignore (frozenset): Normalized tokens that cannot form a mention on their own
+
+        Returns:
+            CompanyMatch: Mentioned company, or None
+        """
+        raise NotImplementedError
+
+    def latest_contact(self, company_id):
+        """
+        Get the latest meeting for a company.
+
+        Args:
+            company_id: Company_ID as held in the company row
+
+        Returns:
+            dict: last_meeting, contact_name, contact_role and count, or None
+        """
+        raise NotImplementedError
+
+    def latest_funding(self, company_id):
+        """
+        Get the latest Closed Won round for a company.
+
+        Args:
+            company_id: Company_ID as held in the company row
+
+        Returns:
+            dict: date_closed, funding_type, amount and count, or None
+        """
+        raise NotImplementedError
+
+    def sample_companies(self, count=10):
+        """
+        Get the first few company names.
+
+        Args:
+            count (int): Number of names
+
+        Returns:
+            list: Company names
+        """
+        raise NotImplementedError
+
+    def table_sizes(self):
+        """
+        Get the row count of each table.
+
+        Returns:
+            dict: Table name to row count
+        """
+        raise NotImplementedError
+
+    def append(self, companies_df=None, contacts_df=None, opportunities_df=None):
+        """
+        Add new rows to the tables and update the lookups for them in place.
+
+        Rows are added as new records, and rows already in the tables are
+        kept. When an appended row repeats an existing ID, the last row with
+        that ID is the record from then on: get_company, get_contact,
+        get_opportunity, log_meeting and close_won all act on it, as they do
+        for IDs repeated across shards. The per-company lookups still count
+        the earlier row as well.
+
+        Args:
+            companies_df (pd.DataFrame): New company rows, or None
+            contacts_df (pd.DataFrame): New contact rows, or None
+            opportunities_df (pd.DataFrame): New opportunity rows, or None
+        """
+        raise NotImplementedError
+
+    def get_company(self, company_id):
+        """
+        Get a company row by its ID.
+
+        Args:
+            company_id: Company_ID as held in contact and opportunity rows
+
+        Returns:
+            dict: Company row, or None
+        """
+        raise NotImplementedError
+
+    def get_contact(self, contact_id):
+        """
+        Get a contact row by its ID.
+
+        Args:
+            contact_id: Contact ID like P0001, or its integer key
+
+        Returns:
+            dict: Contact row, or None
+        """
+        raise NotImplementedError
+
+    def get_opportunity(self, opp_id):
+        """
+        Get an opportunity row by its ID.
+
+        Args:
+            opp_id: Opportunity ID like O0001, or its integer key
+
+        Returns:
+            dict: Opportunity row, or None
+        """
+        raise NotImplementedError
+
+    def log_meeting(self, contact_id, meeting):
+        """
+        Record a meeting with a contact, updating its company's lookups in place.
+
+        The contact's Last_Meeting and the company's Last_Contacted only ever
+        move forward, so logging the same meeting twice changes nothing.
+
+        Args:
+            contact_id: Contact ID like P0001, or its integer key
+            meeting (pd.Timestamp): Meeting date
+
+        Returns:
+            dict: Contact row after the update, or None if there is no such contact
+        """
+        raise NotImplementedError
+
+    def close_won(self, opp_id, closed):
+        """
+        Mark an opportunity Closed Won, updating its company's lookups in place.
+
+        An opportunity that is already Closed Won is left unchanged.
+
+        Args:
+            opp_id: Opportunity ID like O0001, or its integer key
+            closed (pd.Timestamp): Date the round closed
+
+        Returns:
+            dict: Opportunity row after the update, or None if there is no such opportunity
+        """
+        raise NotImplementedError
+
+
+class DataFrameStore(DataStore):
+    def __init__(self, companies_df, contacts_df, opportunities_df, name_index=None, crm_index=None):
+        """
+        Store backed by in-memory DataFrames and their lookup indexes.
+
+        The contacts and opportunities frames may be None when a prebuilt
+        crm_index already holds their aggregates, as stream_data returns.
+
+        Args:
+            companies_df (pd.DataFrame): Companies data
+            contacts_df (pd.DataFrame): Contacts data, or None with crm_index
+            opportunities_df (pd.DataFrame): Opportunities data, or None with crm_index
+            name_index (CompanyNameIndex): Prebuilt name index, built from companies_df if None
+            crm_index (CrmIndex): Prebuilt per-company lookups, built from the tables if None
+        """
+        self.companies_df = companies_df
+        self.contacts_df = contacts_df
+        self.opportunities_df = opportunities_df
+        self.name_index = name_index if name_index is not None else CompanyNameIndex(companies_df)
+        self.crm_index = crm_index if crm_index is not None else CrmIndex(contacts_df, opportunities_df)
+        # Table name to an index of its primary key, built on the first lookup by ID
+        self._keys = {}
+
+    def find_company(self, company_name):
+        return find_company(company_name, self.companies_df, self.name_index)
+
+    def find_mention(self, text, ignore=frozenset()):
+        return self.name_index.find_mention(text, ignore)
+
+    def latest_contact(self, company_id):
+        return self.crm_index.latest_contact(company_id)
+
+    def latest_funding(self, company_id):
+        return self.crm_index.latest_funding(company_id)
+
+    def sample_companies(self, count=10):
+        return self.companies_df['Name'].head(count).tolist()
+
+    @property
+    def supports_writes(self):
+        """
+        Whether the contacts and opportunities tables are loaded, not only their per-company aggregates.
+        """
+        return self.contacts_df is not None and self.opportunities_df is not None
+
+    def _position(self, table, record_id):
+        """
+        Row position of a record by ID, the last row when shards repeat it.
+        """
+        df = getattr(self, f'{table}_df')
+        if df is None:
+            raise RuntimeError(f"The {table} table is not loaded, only its per-company aggregates")
+        column = primary_key(table)
+        keys = self._keys.get(table)
+        if keys is None:
+            keys = self._keys[table] = pd.Index(df[column])
+        if pd.api.types.is_integer_dtype(df[column]):
+            record_id = parse_id(record_id, TABLE_SCHEMAS[table][column]['prefix'])
+        try:
+            position = keys.get_loc(record_id)
+        except (KeyError, TypeError):
+            return None
+        if isinstance(position, slice):
+            return position.stop - 1
+        if isinstance(position, np.ndarray):
+            return int(np.flatnonzero(position)[-1])
+        return position
+
+    def _get(self, table, record_id):
+        position = self._position(table, record_id)
+        return _row_dict(getattr(self, f'{table}_df'), position) if position is not None else None
+
+    def get_company(self, company_id):
+        return self._get('companies', company_id)
+
+    def get_contact(self, contact_id):
+        return self._get('contacts', contact_id)
+
+    def get_opportunity(self, opp_id):
+        return self._get('opportunities', opp_id)
+
+    def log_meeting(self, contact_id, meeting):
+        position = self._position('contacts', contact_id)
+        if position is None:
+            return None
+        contact = _row_dict(self.contacts_df, position)
+        if _is_later(meeting, contact['Last_Meeting']):
+            _set_cell(self.contacts_df, position, 'Last_Meeting', meeting)
+            contact['Last_Meeting'] = meeting
+            self.crm_index.record_meeting(contact['Company_ID'], meeting, contact['Name'], contact['Role'])
+            company_position = self._position('companies', contact['Company_ID'])
+            if company_position is not None and _is_later(
+                    meeting, self.companies_df['Last_Contacted'].iat[company_position]):
+                _set_cell(self.companies_df, company_position, 'Last_Contacted', meeting)
+        return contact
+
+    def close_won(self, opp_id, closed):
+        position = self._position('opportunities', opp_id)
+        if position is None:
+            return None
+        opportunity = _row_dict(self.opportunities_df, position)
+        if opportunity['Stage'] != 'Closed Won':
+            _set_cell(self.opportunities_df, position, 'Stage', 'Closed Won')
+            _set_cell(self.opportunities_df, position, 'Date_Closed', closed)
+            opportunity.update(Stage='Closed Won', Date_Closed=closed)
+            self.crm_index.record_closed_won(opportunity['Company_ID'], closed, opportunity['Type'],
+                                             opportunity['Amount'])
+        return opportunity
+
+    def append(self, companies_df=None, contacts_df=None, opportunities_df=None):
+        self._keys.clear()
+        if companies_df is not None and len(companies_df):
+            # The frame grows first so positions the name index hands out always exist
+            self.companies_df = concat_tables([self.companies_df, companies_df])
+            self.name_index.add_many(companies_df['Company_ID'].tolist(), companies_df['Name'].tolist())
+        if contacts_df is not None and len(contacts_df):
+            if self.contacts_df is not None:
+                self.contacts_df = concat_tables([self.contacts_df, contacts_df])
+            self.crm_index.add_contacts(contacts_df)
+        if opportunities_df is not None and len(opportunities_df):
+            if self.opportunities_df is not None:
+                self.opportunities_df = concat_tables([self.opportunities_df, opportunities_df])
+            self.crm_index.add_opportunities(opportunities_df)
+
+    def table_sizes(self):
+        return {
+            "companies": len(self.companies_df),
+            "contacts": len(self.contacts_df) if self.contacts_df is not None else self.crm_index.contact_rows,
+            "opportunities": (len(self.opportunities_df) if self.opportunities_df is not None
+                              else self.crm_index.opportunity_rows),
+        }
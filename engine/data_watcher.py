@@ -0,0 +1,140 @@
+import io
+import os
+
+import pandas as pd
+
+from .data_loader import concat_tables, resolve_shards, table_paths
+from .schema import apply_schema, read_csv_dtypes, schema_columns
+
+# Bytes just before the parsed end of a file, compared on every poll to tell an append from a rewrite
+FINGERPRINT_BYTES = 64
+
+
+def _fingerprint(f, offset):
+    f.seek(max(offset - FINGERPRINT_BYTES, 0))
+    return f.read(min(offset, FINGERPRINT_BYTES))
+
+
+class DataWatcher:
+    def __init__(self, paths=None, skip_unused=True, columns=None):
+        """
+        Detect rows appended to the CRM CSV files and parse only those rows.
+
+        For every file the watcher keeps the offset up to which rows were
+        already loaded. A poll reads the bytes past that offset, up to the
+        last complete line, and parses them with the table's header and
+        schema. A file that shrank, was replaced, or whose bytes before the
+        offset changed was rewritten rather than appended to, and is
+        reported so the caller can reload in full. New shard files in a
+        sharded table are parsed whole.
+
+        Args:
+            paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+            skip_unused (bool): Parse only the columns queries read, like load_data(skip_unused=True)
+            columns (dict): Table name to the columns to parse, overriding skip_unused for those
+                tables, such as STREAM_COLUMNS with stream_data
+        """
+        self.paths = table_paths(paths)
+        self.columns = {table: schema_columns(table, skip_unused) if skip_unused else None for table in self.paths}
+        self.columns.update(columns or {})
+        self._files = {}
+        self.mark()
+
+    def mark(self):
+        """
+        Take the current end of every file as loaded, such as right after load_data.
+        """
+        files = {}
+        for table, path in self.paths.items():
+            files[table] = {}
+            for shard in resolve_shards(path):
+                with open(shard, 'rb') as f:
+                    # Whatever is in the file now was loaded, even a last row without a newline
+                    files[table][shard] = self._position(f, os.fstat(f.fileno()).st_size)
+        self._files = files
+
+    def accept_rewrite(self, sizes):
+        """
+        Take files rewritten in place, such as by journal compaction, as loaded.
+
+        A rewrite that only changed cells the caller already holds is safe
+        to skip, as long as every row the old file had was already loaded.
+
+        Args:
+            sizes (dict): Rewritten CSV path to its size before the rewrite
+
+        Returns:
+            bool: True if the files were marked as loaded, False if a file had rows that
+                were not loaded yet and the tables need a full reload
+        """
+        known = {shard: (table, position) for table, files in self._files.items()
+                 for shard, position in files.items()}
+        if any(shard not in known or known[shard][1]["offset"] != size for shard, size in sizes.items()):
+            return False
+        for shard in sizes:
+            table, _ = known[shard]
+            with open(shard, 'rb') as f:
+                self._files[table][shard] = self._position(f, os.fstat(f.fileno()).st_size)
+        return True
+
+    @staticmethod
+    def _position(f, offset):
+        f.seek(0)
+        header = f.readline()
+        offset = max(offset, len(header))
+        return {"inode": os.fstat(f.fileno()).st_ino, "offset": offset, "header": header,
+                "fingerprint": _fingerprint(f, offset)}
+
+    def _parse(self, table, header, data):
+        df = pd.read_csv(io.BytesIO(header + data), usecols=self.columns[table], dtype=read_csv_dtypes(table))
+        return apply_schema(table, df)
+
+    def poll(self):
+        """
+        Parse the rows appended since the last poll.
+
+        Returns:
+            dict: Table name to a typed frame of the new rows, for the tables that grew,
+                or None when a file was rewritten, truncated or removed and the tables
+                need a full reload (call mark() after reloading)
+        """
+        appended, files = {}, {}
+        for table, path in self.paths.items():
+            try:
+                shards = resolve_shards(path)
+            except FileNotFoundError:
+                return None
+            known = self._files.get(table, {})
+            if set(known) - set(shards):
+                return None
+
+            files[table], frames = {}, []
+            for shard in shards:
+                try:
+                    f = open(shard, 'rb')
+                except FileNotFoundError:
+                    return None
+                with f:
+                    size = os.fstat(f.fileno()).st_size
+                    position = known.get(shard)
+                    if position is None:
+                        # A new shard: everything after its header is new
+                        position = self._position(f, 0)
+                    elif (os.fstat(f.fileno()).st_ino != position["inode"] or size < position["offset"]
+                          or f.read(len(position["header"])) != position["header"]
+                          or _fingerprint(f, position["offset"]) != position["fingerprint"]):
+                        return None
+
+                    f.seek(position["offset"])
+                    tail = f.read(size - position["offset"])
+                    end = tail.rfind(b"\n") + 1
+                    if end:
+                        frames.append(self._parse(table, position["header"], tail[:end]))
+                        position = self._position(f, position["offset"] + end)
+                    files[table][shard] = position
+            frames = [frame for frame in frames if len(frame)]
+            if frames:
+                appended[table] = frames[0] if len(frames) == 1 else concat_tables(frames)
+
+        self._files = files
+        return appended
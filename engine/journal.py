@@ -0,0 +1,267 @@
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (Windows): only one process may use a journal at a time there
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import PROJECT_DIR, resolve_shards, table_paths
+from .schema import TABLE_SCHEMAS, encode_ids, parse_id, primary_key
+
+JOURNAL_PATH = os.path.join(PROJECT_DIR, 'journal', 'crm_journal.jsonl')
+
+# Journaled writes after which they are folded into the CSV files
+COMPACT_EVERY = 1000
+
+
+@contextmanager
+def _locked(f, exclusive=True):
+    """
+    Hold an advisory lock on an open journal file, where the platform has them.
+
+    Appends and compaction take it exclusively, so an entry appended by
+    another process can never land between compaction reading the journal
+    and emptying it.
+    """
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _parse_entries(data):
+    """
+    Entries in journal file contents, skipping a last line torn by a crash.
+
+    Returns:
+        tuple: (entry dicts, length of the complete lines)
+    """
+    complete = data.rfind(b"\n") + 1
+    return [json.loads(line) for line in data[:complete].splitlines() if line.strip()], complete
+
+
+def apply_entry(store, entry):
+    """
+    Apply one journal entry to a store.
+
+    Entries are idempotent: applying an entry the store already reflects,
+    such as one replayed after it was compacted into the CSV files, changes
+    nothing.
+
+    Args:
+        store (DataStore): Store to update
+        entry (dict): Journal entry, as Journal.append wrote it
+
+    Returns:
+        dict: Updated contact or opportunity row, or None if the record is not in the store
+    """
+    date = pd.Timestamp(entry['date'])
+    if entry['op'] == 'log_meeting':
+        return store.log_meeting(entry['contact_id'], date)
+    if entry['op'] == 'close_won':
+        return store.close_won(entry['opp_id'], date)
+    raise ValueError(f"Unknown journal operation: {entry['op']}")
+
+
+def _cell_updates(entries):
+    """
+    Collect the cells the journal entries change, per table and record key.
+
+    Returns:
+        dict: Table name to {(prefix, record ID): [(column, value, rule)]}, where rule
+            'later' only moves a date forward and 'open' only changes a row that is
+            not Closed Won yet
+    """
+    updates = {table: {} for table in TABLE_SCHEMAS}
+    for entry in entries:
+        if entry['op'] == 'log_meeting':
+            updates['contacts'].setdefault(('P', entry['contact_id']), []).append(('Last_Meeting', entry['date'], 'later'))
+            updates['companies'].setdefault(('C', entry['company_id']), []).append(('Last_Contacted', entry['date'], 'later'))
+        elif entry['op'] == 'close_won':
+            updates['opportunities'].setdefault(('O', entry['opp_id']), []).extend(
+                [('Date_Closed', entry['date'], 'open'), ('Stage', 'Closed Won', 'open')])
+    return {table: table_updates for table, table_updates in updates.items() if table_updates}
+
+
+def _rewrite_shard(shard, table, table_updates):
+    """
+    Apply cell updates to one CSV file, replacing it only if a cell changed.
+
+    Every column is read and written back as text, so untouched cells keep
+    their exact formatting.
+
+    Returns:
+        int: Size of the file before it was rewritten, or None if it was left alone
+    """
+    size = os.path.getsize(shard)
+    df = pd.read_csv(shard, dtype=str, keep_default_na=False)
+    column = primary_key(table)
+    keys = encode_ids(df[column], TABLE_SCHEMAS[table][column]['prefix'])
+    integer_keys = pd.api.types.is_integer_dtype(keys)
+    wanted = {(parse_id(record_id, prefix) if integer_keys else record_id): changes
+              for (prefix, record_id), changes in table_updates.items()}
+    changed = False
+    for position in np.flatnonzero(keys.isin(list(wanted)).to_numpy()):
+        won = 'Stage' in df.columns and df.at[position, 'Stage'] == 'Closed Won'
+        for target, value, rule in wanted[keys.iat[position]]:
+            current = df.at[position, target]
+            # ISO dates compare as text, and a blank date is never later
+            if current == value or (rule == 'later' and current and current >= value) or (rule == 'open' and won):
+                continue
+            df.at[position, target] = value
+            changed = True
+    if not changed:
+        return None
+
+    tmp_path = shard + '.compact.tmp'
+    df.to_csv(tmp_path, index=False)
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    if os.path.getsize(shard) != size:
+        # Someone appended while the file was being rewritten; try again at the next compaction
+        os.remove(tmp_path)
+        raise InterruptedError(f"{shard} changed during compaction")
+    os.replace(tmp_path, shard)
+    return size
+
+
+class Journal:
+    def __init__(self, path=JOURNAL_PATH, paths=None, compact_every=COMPACT_EVERY):
+        """
+        Append-only log of writes to the CRM tables, compacted into the CSV files.
+
+        Each write is one JSON line, flushed and fsynced before the write is
+        applied in memory, so it survives a crash. At startup the entries are
+        replayed onto the freshly loaded tables. compact() folds them into
+        the CSV files and empties the journal, which due() suggests once
+        compact_every entries have piled up.
+
+        Args:
+            path (str): Journal file
+            paths (dict): Table name to CSV path, directory or glob that compaction rewrites,
+                overriding the files in data/
+            compact_every (int): Entries after which due() returns True
+        """
+        self.path = path
+        self.paths = paths
+        self.compact_every = compact_every
+        self.pending = len(self.entries(repair=True))
+
+    def entries(self, repair=False):
+        """
+        Read the journaled entries.
+
+        A last line without a newline is a write torn by a crash, which was
+        never applied, and is skipped.
+
+        Args:
+            repair (bool): Also cut a torn last line off the file, so the next append starts a new line
+
+        Returns:
+            list: Entry dicts, oldest first
+        """
+        try:
+            f = open(self.path, 'rb+' if repair else 'rb')
+        except FileNotFoundError:
+            return []
+        with f, _locked(f, exclusive=repair):
+            entries, complete = _parse_entries(f.read())
+            if repair and complete < f.tell():
+                f.truncate(complete)
+                os.fsync(f.fileno())
+        return entries
+
+    def append(self, entry):
+        """
+        Durably add one entry, stamped with the time it was written.
+
+        Args:
+            entry (dict): Entry with an 'op' (log_meeting or close_won) and its fields
+
+        Returns:
+            dict: The entry as written
+        """
+        entry = {**entry, "logged_at": datetime.now().isoformat(timespec='seconds')}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        created = not os.path.exists(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f, _locked(f):
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if created and hasattr(os, 'O_DIRECTORY'):
+            # Make the new file's directory entry durable too
+            fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.pending += 1
+        return entry
+
+    def replay(self, store):
+        """
+        Apply every journaled entry to a freshly loaded store.
+
+        Args:
+            store (DataStore): Store loaded from the CSV files
+
+        Returns:
+            int: Entries replayed
+        """
+        entries = self.entries()
+        for entry in entries:
+            apply_entry(store, entry)
+        return len(entries)
+
+    def due(self):
+        """
+        Whether enough entries piled up to compact.
+        """
+        return self.pending >= self.compact_every
+
+    def compact(self):
+        """
+        Fold the journaled entries into the CSV files, then empty the journal.
+
+        Only the files holding changed records are rewritten, each to a
+        temporary file moved over the original. The journal is emptied only
+        after every file was replaced; if compaction stops part way, the
+        entries stay and replaying them again is harmless. The journal is
+        locked throughout, so appends from this or any other process wait
+        for compaction to finish instead of being emptied with it.
+
+        Returns:
+            dict: Rewritten CSV path to its size before the rewrite
+
+        Raises:
+            InterruptedError: A CSV file grew while it was being rewritten; the journal is kept
+        """
+        rewritten = {}
+        try:
+            f = open(self.path, 'rb+')
+        except FileNotFoundError:
+            self.pending = 0
+            return rewritten
+        with f, _locked(f):
+            entries, _ = _parse_entries(f.read())
+            for table, table_updates in _cell_updates(entries).items():
+                for shard in resolve_shards(table_paths(self.paths)[table]):
+                    size = _rewrite_shard(shard, table, table_updates)
+                    if size is not None:
+                        rewritten[shard] = size
+            f.truncate(0)
+            os.fsync(f.fileno())
+        self.pending = 0
+        return rewritten
@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Histogram bucket upper bounds: 1 microsecond to ~100 seconds, two buckets per doubling
+BUCKET_BOUNDS = [1e-6 * 2 ** (i / 2) for i in range(54)]
+
+# Pipeline stages, in the order a question passes through them
+STAGES = ["extract_company", "classify", "embed", "similarity", "resolve_company", "lookup", "write", "format"]
+
+
+class Histogram:
+    def __init__(self):
+        """
+        Running latency histogram with fixed log-spaced buckets.
+
+        Percentiles are estimated from bucket bounds, so they are accurate to
+        within one bucket (about 41%) and recording stays O(log buckets).
+        """
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """
+        Estimate a percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Estimated seconds, or 0.0 with no observations
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        """
+        Thread-safe registry of stage latency histograms and counters.
+
+        Args:
+            enabled (bool): Record timings; when False timers are no-ops
+        """
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """
+        Record one timing for a stage.
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        """
+        Add to a counter.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def _timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timer(self, stage):
+        """
+        Context manager timing the enclosed block as one observation of a stage.
+
+        Args:
+            stage (str): Stage name, usually one of STAGES
+        """
+        return self._timer(stage) if self.enabled else nullcontext()
+
+    def snapshot(self):
+        """
+        Get a copy of all histograms and counters.
+
+        Returns:
+            dict: {"stages": {stage: summary}, "counters": {name: value}}
+        """
+        with self._lock:
+            ordered = [stage for stage in STAGES if stage in self._histograms]
+            ordered += sorted(stage for stage in self._histograms if stage not in STAGES)
+            return {
+                "stages": {stage: self._histograms[stage].summary() for stage in ordered},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        """
+        Drop all recorded timings and counters.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Process-wide registry used by the pipeline
+METRICS = Metrics()
+
+
+def timed(stage):
+    """
+    Time a block as one observation of a stage in the process-wide registry.
+
+    Args:
+        stage (str): Stage name, usually one of STAGES
+    """
+    return METRICS.timer(stage)
+
+
+def format_startup(startup):
+    """
+    Format startup timings as one line.
+
+    Args:
+        startup (dict): Seconds per phase (data_s, model_wait_s, warm_up_s), time_to_ready_s
+            and, once a question was answered, first_query_ms
+
+    Returns:
+        str: Report line, empty if nothing was recorded
+    """
+    parts = []
+    if "time_to_ready_s" in startup:
+        phases = [f"{label} {startup[key]:.2f}s" for key, label in
+                  [("data_s", "data"), ("model_wait_s", "model wait"), ("warm_up_s", "warm-up")] if key in startup]
+        parts.append(f"ready in {startup['time_to_ready_s']:.2f}s" + (f" ({', '.join(phases)})" if phases else ""))
+    if "first_query_ms" in startup:
+        parts.append(f"first query {startup['first_query_ms']:.1f} ms")
+    return "; ".join(parts)
+
+
+def format_stats(snapshot, cache_stats=None, startup=None):
+    """
+    Format a metrics snapshot as a text table.
+
+    Args:
+        snapshot (dict): Result of Metrics.snapshot()
+        cache_stats (dict): Optional QueryCache.stats() to include
+        startup (dict): Optional startup timings to include, see format_startup
+
+    Returns:
+        str: Report text
+    """
+    lines = ["📊 **Pipeline Stats**",
+             f"   {'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)"]
+    for stage, summary in snapshot["stages"].items():
+        lines.append(f"   {stage:<16}{summary['count']:>8}{summary['mean_ms']:>10.3f}{summary['p50_ms']:>10.3f}"
+                     f"{summary['p90_ms']:>10.3f}{summary['p99_ms']:>10.3f}{summary['max_ms']:>10.3f}")
+    if not snapshot["stages"]:
+        lines.append("   (no timings recorded yet)")
+    for name, value in snapshot["counters"].items():
+        lines.append(f"   {name}: {value}")
+    if cache_stats is not None:
+        lines.append(f"   cache: {cache_stats['entries']} entries, {cache_stats['hits']} hits, "
+                     f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    if startup:
+        lines.append(f"   startup: {format_startup(startup)}")
+    return "\n".join(lines)
@@ -0,0 +1,151 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+_MISSING = object()
+
+
+def normalize_query(text):
+    """
+    Normalize query text for use as a cache key.
+
+    Collapses whitespace and strips the ends. Case is kept because company
+    extraction treats capitalized words differently.
+
+    Args:
+        text (str): Raw query text
+
+    Returns:
+        str: Normalized text
+    """
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def estimate_size(value):
+    """
+    Roughly estimate the memory held by a cached value, in bytes.
+
+    Args:
+        value: Dict, list, tuple or scalar value
+
+    Returns:
+        int: Estimated size
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class QueryCache:
+    def __init__(self, max_entries=10000, max_bytes=32 * 1024 * 1024, ttl=300.0):
+        """
+        Thread-safe LRU cache with a time-to-live and a memory bound.
+
+        Keys include a data version, and invalidate() drops everything, so
+        answers computed from older data are never returned.
+
+        Args:
+            max_entries (int): Most entries kept before evicting the least recently used
+            max_bytes (int): Estimated memory kept before evicting
+            ttl (float): Seconds an entry stays valid, None for no expiry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Look up a key.
+
+        Args:
+            key (tuple): Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting least recently used entries past the bounds.
+
+        Args:
+            key (tuple): Cache key
+            value: Value to cache
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self):
+        """
+        Drop every entry, for example after the loaded data changed.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Entry count, estimated bytes, hits, misses, hit rate and eviction counts
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,55 +1,126 @@
 import pandas as pd
 from datetime import datetime
 from rapidfuzz import process
+from .metrics import METRICS, timed
+from .crm_index import _latest_per_company
 
-def get_best_company_match(company_name, companies_df):
+# Columns of portfolio_report, named like the keys of the per-company query results
+REPORT_COLUMNS = [
+    "company_name", "stage", "program", "last_contacted", "industry", "total_funding", "location",
+    "funding_type", "amount", "date_closed", "total_closed_rounds",
+    "last_contact_date", "contact_name", "contact_role", "total_contacts",
+]
+
+def format_date(value):
+    """
+    Format a date for query results.
+    
+    Typed tables hold datetime64 dates while raw CSV tables hold strings,
+    so both are returned as YYYY-MM-DD strings.
+    
+    Args:
+        value: Timestamp, date string or missing value
+        
+    Returns:
+        str: Formatted date, or the value unchanged if it is not a timestamp
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+def get_best_company_match(company_name, companies_df, name_index=None):
     """
     Get the best company match using fuzzy matching.
     
     Args:
         company_name (str): Company name to search for
         companies_df (pd.DataFrame): Companies dataframe
+        name_index (CompanyNameIndex): Prebuilt name index, scans all names if None
         
     Returns:
         str: Best matching company name or None
     """
+    if name_index is not None:
+        match = name_index.match(company_name)
+        return match.name if match else None
+    
     choices = companies_df['Name'].tolist()
     match, score, _ = process.extractOne(company_name, choices)
     return match if score > 70 else None
 
-def check_status(companies_df, company_name):
+def find_company(company_name, companies_df, name_index=None):
+    """
+    Find the companies row that best matches a company name.
+    
+    Args:
+        company_name (str): Company name to search for
+        companies_df (pd.DataFrame): Companies dataframe
+        name_index (CompanyNameIndex): Prebuilt name index, scans all names if None
+        
+    Returns:
+        pd.Series: Matching company row or None
+    """
+    if name_index is not None:
+        match = name_index.match(company_name)
+        return companies_df.iloc[match.position] if match else None
+    
+    best_match = get_best_company_match(company_name, companies_df)
+    if best_match is None:
+        return None
+    return companies_df[companies_df['Name'] == best_match].iloc[0]
+
+def _resolve_company(company_name, companies_df, name_index, store=None):
+    """
+    find_company (or the store's) timed as the resolve_company stage, counting misses.
+    """
+    with timed("resolve_company"):
+        if store is not None:
+            company = store.find_company(company_name)
+        else:
+            company = find_company(company_name, companies_df, name_index)
+    if company is None:
+        METRICS.increment("company_not_found")
+    return company
+
+def check_status(companies_df, company_name, name_index=None, store=None):
     """
     Check the status of a company.
     
     Args:
         companies_df (pd.DataFrame): Companies dataframe
         company_name (str): Name of the company to check
+        name_index (CompanyNameIndex): Prebuilt name index, optional
+        store (DataStore): Store to read from instead of the dataframes, optional
         
     Returns:
         dict: Dictionary containing stage, program, and last_contacted information
     """
     # Use fuzzy matching to find the best company match
-    best_match = get_best_company_match(company_name, companies_df)
+    company = _resolve_company(company_name, companies_df, name_index, store)
     
-    if best_match is None:
+    if company is None:
         return {
             "error": f"Company '{company_name}' not found in the database. Try searching for a company from the list."
         }
     
-    # Get the company data
-    company = companies_df[companies_df['Name'] == best_match].iloc[0]
-    
+    with timed("lookup"):
+        return _status_result(company)
+
+def _status_result(company):
+    """
+    Build the check_status result for a matched company row.
+    """
     return {
         "company_name": company['Name'],
         "stage": company['Stage'],
         "program": company['Program'],
-        "last_contacted": company['Last_Contacted'],
+        "last_contacted": format_date(company['Last_Contacted']),
         "industry": company['Industry'],
         "total_funding": company['Total_Funding'],
         "location": company['Location']
     }
 
-def last_funding_event(opps_df, companies_df, company_name):
+def last_funding_event(opps_df, companies_df, company_name, name_index=None, crm_index=None, store=None):
     """
     Find the most recent closed funding round for a company.
     
@@ -57,21 +128,47 @@ def last_funding_event(opps_df, companies_df, company_name):
         opps_df (pd.DataFrame): Opportunities dataframe
         companies_df (pd.DataFrame): Companies dataframe
         company_name (str): Name of the company to check
+        name_index (CompanyNameIndex): Prebuilt name index, optional
+        crm_index (CrmIndex): Prebuilt per-company lookups, scans opps_df if None
+        store (DataStore): Store to read from instead of the dataframes, optional
         
     Returns:
         dict: Dictionary containing funding event information
     """
     # Use fuzzy matching to find the best company match
-    best_match = get_best_company_match(company_name, companies_df)
+    company = _resolve_company(company_name, companies_df, name_index, store)
     
-    if best_match is None:
+    if company is None:
         return {
             "error": f"Company '{company_name}' not found in the database. Try searching for a company from the list."
         }
     
-    company = companies_df[companies_df['Name'] == best_match].iloc[0]
+    with timed("lookup"):
+        return _funding_result(company, opps_df, store if store is not None else crm_index)
+
+def _funding_result(company, opps_df, crm_index):
+    """
+    Build the last_funding_event result for a matched company row.
+    
+    crm_index may be a CrmIndex or a DataStore, which answer the same lookups.
+    """
     company_id = company['Company_ID']
     
+    if crm_index is not None:
+        latest_funding = crm_index.latest_funding(company_id)
+        if latest_funding is None:
+            return {
+                "company_name": company['Name'],
+                "message": "No closed funding rounds found for this company."
+            }
+        return {
+            "company_name": company['Name'],
+            "funding_type": latest_funding['funding_type'],
+            "amount": latest_funding['amount'],
+            "date_closed": format_date(latest_funding['date_closed']),
+            "total_closed_rounds": latest_funding['count']
+        }
+    
     # Find closed won opportunities for this company
     company_opps = opps_df[
         (opps_df['Company_ID'] == company_id) & 
@@ -85,7 +182,7 @@ def last_funding_event(opps_df, companies_df, company_name):
         }
     
     # Sort by date and get the most recent
-    company_opps['Date_Closed'] = pd.to_datetime(company_opps['Date_Closed'])
+    company_opps = company_opps.assign(Date_Closed=pd.to_datetime(company_opps['Date_Closed']))
     latest_funding = company_opps.sort_values('Date_Closed', ascending=False).iloc[0]
     
     return {
@@ -96,7 +193,7 @@ def last_funding_event(opps_df, companies_df, company_name):
         "total_closed_rounds": len(company_opps)
     }
 
-def last_contact(contacts_df, company_name, companies_df):
+def last_contact(contacts_df, company_name, companies_df, name_index=None, crm_index=None, store=None):
     """
     Find the date of last meeting with any contact from the company.
     
@@ -104,21 +201,47 @@ def last_contact(contacts_df, company_name, companies_df):
         contacts_df (pd.DataFrame): Contacts dataframe
         company_name (str): Name of the company to check
         companies_df (pd.DataFrame): Companies dataframe
+        name_index (CompanyNameIndex): Prebuilt name index, optional
+        crm_index (CrmIndex): Prebuilt per-company lookups, scans contacts_df if None
+        store (DataStore): Store to read from instead of the dataframes, optional
         
     Returns:
         dict: Dictionary containing last contact information
     """
     # Use fuzzy matching to find the best company match
-    best_match = get_best_company_match(company_name, companies_df)
+    company = _resolve_company(company_name, companies_df, name_index, store)
     
-    if best_match is None:
+    if company is None:
         return {
             "error": f"Company '{company_name}' not found in the database. Try searching for a company from the list."
         }
     
-    company = companies_df[companies_df['Name'] == best_match].iloc[0]
+    with timed("lookup"):
+        return _contact_result(company, contacts_df, store if store is not None else crm_index)
+
+def _contact_result(company, contacts_df, crm_index):
+    """
+    Build the last_contact result for a matched company row.
+    
+    crm_index may be a CrmIndex or a DataStore, which answer the same lookups.
+    """
     company_id = company['Company_ID']
     
+    if crm_index is not None:
+        latest_contact = crm_index.latest_contact(company_id)
+        if latest_contact is None:
+            return {
+                "company_name": company['Name'],
+                "message": "No contacts found for this company."
+            }
+        return {
+            "company_name": company['Name'],
+            "last_contact_date": format_date(latest_contact['last_meeting']),
+            "contact_name": latest_contact['contact_name'],
+            "contact_role": latest_contact['contact_role'],
+            "total_contacts": latest_contact['count']
+        }
+    
     # Find contacts for this company
     company_contacts = contacts_df[contacts_df['Company_ID'] == company_id]
     
@@ -129,7 +252,7 @@ def last_contact(contacts_df, company_name, companies_df):
         }
     
     # Convert dates and find the most recent meeting
-    company_contacts['Last_Meeting'] = pd.to_datetime(company_contacts['Last_Meeting'])
+    company_contacts = company_contacts.assign(Last_Meeting=pd.to_datetime(company_contacts['Last_Meeting']))
     latest_contact = company_contacts.sort_values('Last_Meeting', ascending=False).iloc[0]
     
     return {
@@ -138,4 +261,75 @@ def last_contact(contacts_df, company_name, companies_df):
         "contact_name": latest_contact['Name'],
         "contact_role": latest_contact['Role'],
         "total_contacts": len(company_contacts)
-    } 
\ No newline at end of file
+    } 
+
+def _format_dates(series):
+    """
+    Vectorized format_date: datetime columns become YYYY-MM-DD strings.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d')
+    return series
+
+def _index_frame(entries, columns, count_column):
+    """
+    Turn CrmIndex entries (company_id -> dict) into a per-company frame.
+    """
+    frame = pd.DataFrame.from_dict(entries, orient='index', columns=[*columns, "count"])
+    frame = frame.rename_axis('Company_ID').reset_index()
+    return frame.rename(columns={"count": count_column, **columns})
+
+def _table_frame(df, date_column, columns, count_column):
+    """
+    Reduce a table to a per-company frame of its latest rows and row counts.
+    """
+    latest, counts = _latest_per_company(df, date_column)
+    frame = latest[['Company_ID', *columns]].rename(columns=columns).reset_index(drop=True)
+    frame[count_column] = counts
+    return frame
+
+def portfolio_report(companies_df, contacts_df=None, opportunities_df=None, crm_index=None):
+    """
+    Status, latest funding and last contact for every company in one table.
+
+    Computes what check_status, last_funding_event and last_contact return
+    for each company with one sort-and-deduplicate pass per table and two
+    merges, instead of a fuzzy match and table scans per company.
+
+    Args:
+        companies_df (pd.DataFrame): Companies dataframe
+        contacts_df (pd.DataFrame): Contacts dataframe, not needed with crm_index
+        opportunities_df (pd.DataFrame): Opportunities dataframe, not needed with crm_index
+        crm_index (CrmIndex): Prebuilt per-company lookups to use instead of the two tables
+
+    Returns:
+        pd.DataFrame: One row per company in companies_df order with REPORT_COLUMNS;
+            funding and contact columns are empty for companies without them
+    """
+    if crm_index is not None:
+        funding = _index_frame(crm_index.funding, {"date_closed": "date_closed", "funding_type": "funding_type",
+                                                   "amount": "amount"}, "total_closed_rounds")
+        contacts = _index_frame(crm_index.contacts, {"last_meeting": "last_contact_date", "contact_name": "contact_name",
+                                                     "contact_role": "contact_role"}, "total_contacts")
+    else:
+        won = opportunities_df[opportunities_df['Stage'] == 'Closed Won']
+        funding = _table_frame(won, 'Date_Closed', {"Date_Closed": "date_closed", "Type": "funding_type",
+                                                    "Amount": "amount"}, "total_closed_rounds")
+        contacts = _table_frame(contacts_df, 'Last_Meeting', {"Last_Meeting": "last_contact_date",
+                                                              "Name": "contact_name", "Role": "contact_role"},
+                                "total_contacts")
+
+    report = companies_df[['Company_ID', 'Name', 'Stage', 'Program', 'Last_Contacted', 'Industry',
+                           'Total_Funding', 'Location']].rename(columns={
+        'Name': 'company_name', 'Stage': 'stage', 'Program': 'program', 'Last_Contacted': 'last_contacted',
+        'Industry': 'industry', 'Total_Funding': 'total_funding', 'Location': 'location'})
+    report = (report.merge(funding, on='Company_ID', how='left', validate='many_to_one')
+                    .merge(contacts, on='Company_ID', how='left', validate='many_to_one'))
+
+    report['last_contacted'] = _format_dates(report['last_contacted'])
+    for column in ('date_closed', 'last_contact_date'):
+        report[column] = _format_dates(pd.to_datetime(report[column]))
+    for column in ('total_closed_rounds', 'total_contacts'):
+        report[column] = report[column].fillna(0).astype('int64')
+    report['amount'] = report['amount'].astype('Int64')
+    return report[REPORT_COLUMNS]
@@ -0,0 +1,159 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Column kinds:
+#   id       - string ID like C0001, stored as an integer surrogate key
+#   str      - free text
+#   category - low-cardinality text
+#   int      - integer amount
+#   date     - YYYY-MM-DD date, parsed once to datetime64
+# Columns marked unused are not read by any query and can be skipped at load time.
+# Columns marked primary identify a row; when shards repeat an ID the last one wins.
+TABLE_SCHEMAS = {
+    'companies': {
+        'Company_ID': {'kind': 'id', 'prefix': 'C', 'primary': True},
+        'Name': {'kind': 'str'},
+        'Industry': {'kind': 'category'},
+        'Stage': {'kind': 'category'},
+        'Last_Contacted': {'kind': 'date'},
+        'Program': {'kind': 'category'},
+        'Total_Funding': {'kind': 'int'},
+        'Location': {'kind': 'str'},
+    },
+    'contacts': {
+        'Contact_ID': {'kind': 'id', 'prefix': 'P', 'primary': True},
+        'Name': {'kind': 'str'},
+        'Role': {'kind': 'category'},
+        'Email': {'kind': 'str', 'unused': True},
+        'Company_ID': {'kind': 'id', 'prefix': 'C'},
+        'Last_Meeting': {'kind': 'date'},
+    },
+    'opportunities': {
+        'Opp_ID': {'kind': 'id', 'prefix': 'O', 'primary': True},
+        'Company_ID': {'kind': 'id', 'prefix': 'C'},
+        'Stage': {'kind': 'category'},
+        'Type': {'kind': 'category'},
+        'Amount': {'kind': 'int'},
+        'Date_Closed': {'kind': 'date'},
+    },
+}
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def schema_columns(table, skip_unused=False):
+    """
+    Get the columns to read for a table.
+
+    Args:
+        table (str): Table name in TABLE_SCHEMAS
+        skip_unused (bool): Leave out columns no query reads
+
+    Returns:
+        list: Column names
+    """
+    return [column for column, spec in TABLE_SCHEMAS[table].items()
+            if not (skip_unused and spec.get('unused'))]
+
+
+def primary_key(table):
+    """
+    Get the column identifying a row of a table.
+    """
+    return next(column for column, spec in TABLE_SCHEMAS[table].items() if spec.get('primary'))
+
+
+def read_csv_dtypes(table):
+    """
+    Get the dtypes to pass to pd.read_csv so the parser builds compact columns directly.
+
+    ID and date columns are read as text and converted by apply_schema.
+    """
+    dtypes = {}
+    for column, spec in TABLE_SCHEMAS[table].items():
+        if spec['kind'] == 'category':
+            dtypes[column] = 'category'
+        elif spec['kind'] in ('id', 'str', 'date'):
+            dtypes[column] = 'str'
+    return dtypes
+
+
+def parse_id(value, prefix):
+    """
+    Convert a string ID like C0001 to its integer surrogate key.
+
+    Args:
+        value: String ID, or an integer key which is returned unchanged
+        prefix (str): Expected ID prefix
+
+    Returns:
+        int: Surrogate key, or None if value is not a valid ID
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    match = re.fullmatch(rf'{re.escape(prefix)}(\d+)', str(value).strip(), re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def format_id(key, prefix, width=4):
+    """
+    Convert an integer surrogate key back to its string ID.
+
+    Args:
+        key (int): Surrogate key
+        prefix (str): ID prefix
+        width (int): Zero-padded width of the numeric part
+
+    Returns:
+        str: String ID like C0001
+    """
+    return f'{prefix}{int(key):0{width}d}'
+
+
+def encode_ids(series, prefix):
+    """
+    Convert a column of string IDs to integer surrogate keys.
+
+    Columns holding IDs that do not follow the prefix-plus-digits pattern
+    are kept as categoricals instead.
+
+    Args:
+        series (pd.Series): String IDs
+        prefix (str): Expected ID prefix
+
+    Returns:
+        pd.Series: int32 (or int64) keys, or a categorical column
+    """
+    if series.empty:
+        return series.astype('int32')
+    digits = series.str.slice(len(prefix))
+    if not (series.str.startswith(prefix).all() and digits.str.fullmatch(r'\d+').all()):
+        return series.astype('category')
+    keys = digits.astype('int64')
+    return keys.astype('int32') if keys.max() <= np.iinfo(np.int32).max else keys
+
+
+def apply_schema(table, df):
+    """
+    Convert a freshly read table to its compact typed form.
+
+    Args:
+        table (str): Table name in TABLE_SCHEMAS
+        df (pd.DataFrame): Table as read from CSV
+
+    Returns:
+        pd.DataFrame: Table with surrogate keys, categoricals and datetime64 dates
+    """
+    converted = {}
+    for column, spec in TABLE_SCHEMAS[table].items():
+        if column not in df.columns:
+            continue
+        if spec['kind'] == 'id' and not pd.api.types.is_integer_dtype(df[column]):
+            converted[column] = encode_ids(df[column], spec['prefix'])
+        elif spec['kind'] == 'category' and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            converted[column] = df[column].astype('category')
+        elif spec['kind'] == 'date' and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            converted[column] = pd.to_datetime(df[column], format=DATE_FORMAT, errors='coerce')
+    return df.assign(**converted) if converted else df
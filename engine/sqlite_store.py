@@ -0,0 +1,346 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from .company_index import CompanyMatch, normalize_name, name_ngrams
+from .data_loader import _shards_signature, _source_signature, resolve_shards, table_paths
+from .data_store import DataStore
+from .schema import DATE_FORMAT, TABLE_SCHEMAS, encode_ids, primary_key, schema_columns
+
+# Bump when the table layout changes so stores built by older code are rejected
+STORE_VERSION = 1
+
+IMPORT_CHUNK_ROWS = 100_000
+
+_COLUMN_TYPES = {'id': 'INTEGER', 'str': 'TEXT', 'category': 'TEXT', 'int': 'INTEGER', 'date': 'TEXT'}
+
+_INDEXES = [
+    "CREATE INDEX idx_companies_name ON companies (Name_Normalized)",
+    "CREATE INDEX idx_companies_id ON companies (Company_ID)",
+    "CREATE INDEX idx_companies_stage ON companies (Stage)",
+    "CREATE INDEX idx_companies_last_contacted ON companies (Last_Contacted)",
+    "CREATE INDEX idx_contacts_company_meeting ON contacts (Company_ID, Last_Meeting)",
+    "CREATE INDEX idx_opportunities_company_stage_closed ON opportunities (Company_ID, Stage, Date_Closed)",
+    "CREATE INDEX idx_opportunities_stage ON opportunities (Stage)",
+]
+
+
+def _create_table(conn, table):
+    columns = [f"{column} {_COLUMN_TYPES[TABLE_SCHEMAS[table][column]['kind']]}"
+               for column in schema_columns(table, skip_unused=True)]
+    if table == 'companies':
+        columns.append("Name_Normalized TEXT")
+    conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+
+
+def _sql_rows(table, chunk):
+    """
+    Convert a chunk read from CSV to rows ready for executemany.
+
+    IDs become integer keys where they follow the prefix-plus-digits pattern,
+    dates are checked and rewritten as YYYY-MM-DD, and missing values become NULL.
+    """
+    converted = {}
+    for column in chunk.columns:
+        spec = TABLE_SCHEMAS[table][column]
+        if spec['kind'] == 'id':
+            keys = encode_ids(chunk[column], spec['prefix'])
+            converted[column] = keys.astype(str) if isinstance(keys.dtype, pd.CategoricalDtype) else keys
+        elif spec['kind'] == 'date':
+            converted[column] = pd.to_datetime(chunk[column], format=DATE_FORMAT, errors='coerce').dt.strftime(DATE_FORMAT)
+        elif spec['kind'] == 'int':
+            converted[column] = pd.to_numeric(chunk[column]).astype('Int64')
+    if table == 'companies':
+        converted['Name_Normalized'] = chunk['Name'].map(normalize_name, na_action='ignore')
+    chunk = chunk.assign(**converted).astype(object)
+    return chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def import_csvs(db_path, paths=None, chunk_rows=IMPORT_CHUNK_ROWS):
+    """
+    Build a SQLite store from the CRM CSV files.
+
+    Tables are streamed in chunks, so memory use does not grow with the
+    CSV size. The store is written to a temporary file and moved into place
+    once complete. Sharded tables are imported shard by shard, keeping the
+    last row for IDs that appear in several shards.
+
+    Args:
+        db_path (str): SQLite file to create or replace
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+        chunk_rows (int): Rows read and inserted per chunk
+
+    Returns:
+        str: db_path
+    """
+    paths = table_paths(paths)
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Durability is irrelevant until the file is moved into place
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TABLE store_meta (key TEXT PRIMARY KEY, value TEXT)")
+        max_tokens = 0
+        for table in TABLE_SCHEMAS:
+            _create_table(conn, table)
+            columns = schema_columns(table, skip_unused=True)
+            if table == 'companies':
+                columns = columns + ['Name_Normalized']
+            insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            shards = resolve_shards(paths[table])
+            for shard in shards:
+                for chunk in pd.read_csv(shard, usecols=schema_columns(table, skip_unused=True), dtype=str,
+                                         chunksize=chunk_rows):
+                    chunk = chunk[schema_columns(table, skip_unused=True)]
+                    if table == 'companies':
+                        tokens = chunk['Name'].map(normalize_name, na_action='ignore').str.count(' ').max()
+                        max_tokens = max(max_tokens, int(tokens) + 1 if pd.notna(tokens) else 0)
+                    conn.executemany(insert, _sql_rows(table, chunk))
+            if len(shards) > 1:
+                key = primary_key(table)
+                conn.execute(f"DELETE FROM {table} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {table} GROUP BY {key})")
+
+        for statement in _INDEXES:
+            conn.execute(statement)
+        try:
+            conn.execute("CREATE VIRTUAL TABLE company_names USING fts5("
+                         "Name_Normalized, content='companies', tokenize='trigram')")
+            conn.execute("INSERT INTO company_names (company_names) VALUES ('rebuild')")
+            has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or the trigram tokenizer; candidates fall back to a scan
+            has_fts = False
+
+        meta = {
+            "store_version": STORE_VERSION,
+            "max_tokens": max_tokens,
+            "fts": has_fts,
+            "sources": {table: _shards_signature(resolve_shards(path), 'stat') for table, path in paths.items()},
+        }
+        conn.executemany("INSERT INTO store_meta VALUES (?, ?)", [(key, json.dumps(value)) for key, value in meta.items()])
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+class SQLiteStore(DataStore):
+    def __init__(self, db_path, max_candidates=64, score_cutoff=70, max_postings=20000):
+        """
+        Store backed by a SQLite file written by import_csvs.
+
+        Lookups go through indexes on Company_ID, Stage and the date columns,
+        and fuzzy company matching takes its candidates from an FTS5 trigram
+        table, so nothing is held in memory beyond SQLite's page cache and
+        several processes can share one file.
+
+        Args:
+            db_path (str): SQLite file written by import_csvs
+            max_candidates (int): Number of candidates passed to the fuzzy scorer
+            score_cutoff (int): Matches must score above this to be returned
+            max_postings (int): Rough cap on the documents one candidate search ranks;
+                the rarest trigrams of a query are searched first until the cap is reached
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No SQLite store at {db_path}")
+        self.db_path = db_path
+        self.max_candidates = max_candidates
+        self.score_cutoff = score_cutoff
+        self.max_postings = max_postings
+        self._gram_counts = {}
+        self._connect()
+
+        meta = {key: json.loads(value) for key, value in self._query("SELECT key, value FROM store_meta")}
+        if meta.get("store_version") != STORE_VERSION:
+            raise ValueError(f"{db_path} was built by an incompatible version, rebuild it with import_csvs")
+        self.max_tokens = meta["max_tokens"]
+        self.has_fts = meta["fts"]
+        self.sources = meta["sources"]
+        self._create_temp_tables()
+
+    def _connect(self):
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+    def _create_temp_tables(self):
+        if self.has_fts:
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.company_name_grams "
+                               "USING fts5vocab(main, company_names, 'row')")
+
+    def reopen(self):
+        """
+        Open a new connection, for a forked process.
+
+        A SQLite connection must not be used on both sides of a fork; the
+        inherited one is left alone, not closed, since the parent still uses it.
+        """
+        self._connect()
+        self._create_temp_tables()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_one(self, sql, params=()):
+        rows = self._query(sql, params)
+        return rows[0] if rows else None
+
+    def close(self):
+        self._conn.close()
+
+    def is_stale(self):
+        """
+        Check whether any source CSV changed since the store was built.
+        """
+        for source in self.sources.values():
+            for shard in source if isinstance(source, list) else [source]:
+                try:
+                    if _source_signature(shard["path"], 'stat') != shard:
+                        return True
+                except OSError:
+                    return True
+        return False
+
+    def _candidates(self, normalized_query):
+        """
+        Get (rowid, normalized name, name) rows of the names sharing the most trigrams with a query.
+        """
+        if not self.has_fts:
+            return self._query("SELECT rowid, Name_Normalized, Name FROM companies ORDER BY rowid")
+        # The FTS table holds the names unpadded, so grams at a name boundary are not in it
+        grams = self._rare_grams([gram for gram in name_ngrams(normalized_query, 3) if gram.strip() == gram])
+        if not grams:
+            return self._scan_candidates(normalized_query)
+        match = " OR ".join(f'"{gram}"' for gram in grams)
+        rows = self._query("SELECT rowid FROM company_names WHERE company_names MATCH ? ORDER BY rank LIMIT ?",
+                           (match, self.max_candidates))
+        rowids = sorted(row[0] for row in rows)
+        if not rowids:
+            return self._scan_candidates(normalized_query)
+        return self._query(f"SELECT rowid, Name_Normalized, Name FROM companies WHERE rowid IN "
+                           f"({', '.join('?' * len(rowids))}) ORDER BY rowid", rowids)
+
+    def _scan_candidates(self, normalized_query):
+        """
+        Rank candidates by shared padded trigrams, as CompanyNameIndex does, for queries the FTS table cannot serve.
+
+        Short queries like "li" only have trigrams that touch a name
+        boundary. Every name sharing such a trigram contains its text
+        without the padding, so a LIKE filter on those cores finds them all.
+        """
+        query_grams = name_ngrams(normalized_query, 3)
+        cores = sorted({gram.strip() for gram in query_grams if gram.strip()})
+        if not cores:
+            return []
+        rows = self._query(f"SELECT rowid, Name_Normalized, Name FROM companies WHERE "
+                           f"{' OR '.join(['Name_Normalized LIKE ?'] * len(cores))} ORDER BY rowid",
+                           [f"%{core}%" for core in cores])
+        overlaps = [len(query_grams & name_ngrams(row[1], 3)) for row in rows]
+        hits = [i for i, overlap in enumerate(overlaps) if overlap]
+        # Stable sort so ties keep the earliest rows, like CompanyNameIndex
+        top = sorted(sorted(hits, key=lambda i: -overlaps[i])[:self.max_candidates])
+        return [rows[i] for i in top]
+
+    def _rare_grams(self, grams):
+        """
+        Pick the rarest trigrams of a query, up to max_postings matching documents.
+
+        Ranking every document that shares a very common trigram (like "and")
+        dominates search time on large tables, while rare trigrams carry most
+        of the signal. Document counts are cached per trigram.
+        """
+        missing = [gram for gram in grams if gram not in self._gram_counts]
+        if missing:
+            found = dict(self._query(f"SELECT term, doc FROM temp.company_name_grams WHERE term IN "
+                                     f"({', '.join('?' * len(missing))})", missing))
+            self._gram_counts.update({gram: found.get(gram, 0) for gram in missing})
+
+        chosen, postings = [], 0
+        for gram in sorted((gram for gram in grams if self._gram_counts[gram]), key=lambda gram: (self._gram_counts[gram], gram)):
+            if chosen and postings + self._gram_counts[gram] > self.max_postings:
+                break
+            chosen.append(gram)
+            postings += self._gram_counts[gram]
+        return chosen
+
+    def find_company(self, company_name):
+        normalized_query = normalize_name(company_name)
+        if not normalized_query:
+            return None
+
+        # Duplicate names resolve to the first company, like the DataFrame store
+        company = self._query_one("SELECT * FROM companies WHERE Name_Normalized = ? ORDER BY rowid LIMIT 1",
+                                  (normalized_query,))
+        if company is not None:
+            return company
+
+        candidates = self._candidates(normalized_query)
+        if not candidates:
+            return None
+        # Scored on the original names, as CompanyNameIndex does
+        best = process.extractOne(company_name, [row[2] for row in candidates], scorer=fuzz.WRatio,
+                                  score_cutoff=self.score_cutoff)
+        if best is None or best[1] <= self.score_cutoff:
+            return None
+        return self._query_one("SELECT * FROM companies WHERE rowid = ?", (candidates[best[2]][0],))
+
+    def find_mention(self, text, ignore=frozenset()):
+        tokens = normalize_name(text).split()
+        spans = {}
+        for start in range(len(tokens)):
+            for length in range(1, min(self.max_tokens, len(tokens) - start) + 1):
+                span = tokens[start:start + length]
+                if not all(token in ignore for token in span):
+                    spans.setdefault(" ".join(span), (length, -start))
+        if not spans:
+            return None
+
+        # One indexed IN lookup covers every candidate span
+        rows = self._query(f"SELECT Name_Normalized, MIN(rowid), Company_ID, Name FROM companies "
+                           f"WHERE Name_Normalized IN ({', '.join('?' * len(spans))}) GROUP BY Name_Normalized",
+                           list(spans))
+        if not rows:
+            return None
+        # Longest mention wins, then the earliest
+        best = max(rows, key=lambda row: spans[row[0]])
+        return CompanyMatch(best[2], best[3], 100.0, best[1] - 1)
+
+    def latest_contact(self, company_id):
+        latest = self._query_one(
+            "SELECT Name, Role, Last_Meeting FROM contacts WHERE Company_ID = ? "
+            "ORDER BY Last_Meeting IS NULL, Last_Meeting DESC, rowid LIMIT 1", (company_id,))
+        if latest is None:
+            return None
+        count = self._query_one("SELECT COUNT(*) FROM contacts WHERE Company_ID = ?", (company_id,))[0]
+        return {"last_meeting": latest['Last_Meeting'], "count": count,
+                "contact_name": latest['Name'], "contact_role": latest['Role']}
+
+    def latest_funding(self, company_id):
+        latest = self._query_one(
+            "SELECT Type, Amount, Date_Closed FROM opportunities WHERE Company_ID = ? AND Stage = 'Closed Won' "
+            "ORDER BY Date_Closed IS NULL, Date_Closed DESC, rowid LIMIT 1", (company_id,))
+        if latest is None:
+            return None
+        count = self._query_one("SELECT COUNT(*) FROM opportunities WHERE Company_ID = ? AND Stage = 'Closed Won'",
+                                (company_id,))[0]
+        return {"date_closed": latest['Date_Closed'], "count": count,
+                "funding_type": latest['Type'], "amount": latest['Amount']}
+
+    def sample_companies(self, count=10):
+        return [row[0] for row in self._query("SELECT Name FROM companies ORDER BY rowid LIMIT ?", (count,))]
+
+    def table_sizes(self):
+        return {table: self._query_one(f"SELECT COUNT(*) FROM {table}")[0] for table in TABLE_SCHEMAS}
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .company_index import CompanyNameIndex
+from .crm_index import CrmIndex
+from .data_loader import (PROJECT_DIR, SCHEMA_VERSION, STREAM_CHUNK_ROWS, _shards_signature, load_data, resolve_shards,
+                          stream_data, table_paths)
+
+# Bump when the file layout or a saved structure changes so older snapshots are rebuilt
+STATE_VERSION = 1
+
+STATE_PATH = os.path.join(PROJECT_DIR, '.cache', 'state', 'crm_state.bin')
+
+_MAGIC = b"CRMSTATE"
+_FOOTER = struct.Struct("<Q8s")
+# Sections start on 64-byte boundaries so memory-mapped arrays are aligned
+_ALIGNMENT = 64
+
+ServingState = namedtuple("ServingState", [
+    "companies_df", "contacts_df", "opportunities_df", "name_index", "crm_index", "template_embeddings", "sources"
+])
+
+
+def templates_digest(templates):
+    """
+    Hash the intent templates a template matrix was computed from.
+
+    Args:
+        templates (list): Template strings, in matrix row order
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha1("\n".join(templates).encode('utf-8')).hexdigest()
+
+
+def source_signatures(paths=None, validate='stat'):
+    """
+    Describe the source CSVs so a snapshot can tell whether it is stale.
+
+    Args:
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+        validate (str): 'stat' or 'hash', see load_data
+
+    Returns:
+        dict: Table name to signature
+    """
+    return {table: _shards_signature(resolve_shards(path), validate) for table, path in table_paths(paths).items()}
+
+
+def build_state(paths=None, template_embeddings=None, stream=False, chunk_rows=STREAM_CHUNK_ROWS, validate='stat'):
+    """
+    Load the CSVs and build every structure a pipeline serves from.
+
+    Args:
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+        template_embeddings (np.ndarray): Template matrix to include, such as IntentParser.template_embeddings
+        stream (bool): Stream contacts and opportunities into the CrmIndex instead of keeping their frames
+        chunk_rows (int): Rows parsed per chunk when streaming
+        validate (str): 'stat' or 'hash', recorded so load_state can check the sources the same way
+
+    Returns:
+        ServingState: Tables, indexes, template matrix and source signatures
+    """
+    # Signed before reading, so a CSV changing during the load makes the snapshot stale
+    sources = {"validate": validate, "tables": source_signatures(paths, validate)}
+    if stream:
+        companies_df, crm_index = stream_data(chunk_rows, use_cache=False, paths=paths)
+        contacts_df = opportunities_df = None
+    else:
+        companies_df, contacts_df, opportunities_df = load_data(use_cache=False, skip_unused=True, paths=paths)
+        crm_index = CrmIndex(contacts_df, opportunities_df)
+    return ServingState(companies_df, contacts_df, opportunities_df, CompanyNameIndex(companies_df), crm_index,
+                        template_embeddings, sources)
+
+
+def _arrow_section(df):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def save_state(path, state, model_name=None, templates=None):
+    """
+    Write a serving state to one snapshot file, replacing any previous one.
+
+    The file holds the typed tables and the per-company lookups as Arrow
+    IPC sections, the name index postings and the template matrix as raw
+    arrays, and a JSON footer describing them, so load_state can
+    memory-map every section in place.
+
+    Args:
+        path (str): Snapshot file to write
+        state (ServingState): State to save, as build_state returns
+        model_name (str): Model the template matrix comes from
+        templates (list): Templates the template matrix was computed from
+    """
+    name_index = state.name_index
+    grams, offsets, positions = name_index.posting_arrays()
+    contacts_frame, funding_frame = state.crm_index.to_frames()
+    sections = {
+        "companies": state.companies_df,
+        "contacts": state.contacts_df,
+        "opportunities": state.opportunities_df,
+        "crm_contacts": contacts_frame.rename_axis('Company_ID').reset_index(),
+        "crm_funding": funding_frame.rename_axis('Company_ID').reset_index(),
+        "names": pd.DataFrame({"company_id": name_index.company_ids, "name": name_index.names,
+                               "normalized": name_index.normalized}),
+        "gram_offsets": offsets,
+        "gram_positions": positions,
+        "template_embeddings": state.template_embeddings,
+    }
+    header = {
+        "state_version": STATE_VERSION,
+        "schema_version": SCHEMA_VERSION,
+        "sources": state.sources,
+        "stream": state.contacts_df is None,
+        "crm_rows": {"contacts": state.crm_index.contact_rows, "opportunities": state.crm_index.opportunity_rows},
+        "name_index": {"ngram": name_index.ngram, "max_candidates": name_index.max_candidates,
+                       "score_cutoff": name_index.score_cutoff, "max_tokens": name_index.max_tokens, "grams": grams},
+        "model_name": model_name,
+        "templates": templates_digest(templates) if templates is not None else None,
+        "sections": {},
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC)
+        for name, value in sections.items():
+            if value is None:
+                continue
+            f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+            offset = f.tell()
+            if isinstance(value, np.ndarray):
+                value = np.ascontiguousarray(value)
+                f.write(memoryview(value).cast('B'))
+                header["sections"][name] = {"kind": "array", "offset": offset, "length": value.nbytes,
+                                            "dtype": value.dtype.str, "shape": list(value.shape)}
+            else:
+                buffer = _arrow_section(value)
+                f.write(buffer)
+                header["sections"][name] = {"kind": "arrow", "offset": offset, "length": buffer.size}
+        footer = json.dumps(header).encode('utf-8')
+        f.write(footer)
+        f.write(_FOOTER.pack(len(footer), _MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    # Readers that already mapped the old file keep their pages
+    os.replace(tmp_path, path)
+
+
+def _read_header(mapped):
+    if mapped.size() < len(_MAGIC) + _FOOTER.size:
+        return None
+    mapped.seek(mapped.size() - _FOOTER.size)
+    footer_length, magic = _FOOTER.unpack(mapped.read(_FOOTER.size))
+    if magic != _MAGIC:
+        return None
+    mapped.seek(mapped.size() - _FOOTER.size - footer_length)
+    return json.loads(mapped.read(footer_length))
+
+
+def load_state(path=STATE_PATH, paths=None, stream=False, model_name=None, templates=None):
+    """
+    Memory-map a serving state snapshot.
+
+    Arrow sections and arrays are read in place from the mapped file, so
+    several workers loading the same snapshot share its pages, and only
+    the pieces a lookup needs as Python objects (company names, and
+    per-company entries as they are first read) are converted.
+
+    Args:
+        path (str): Snapshot file
+        paths (dict): Table name to CSV path, directory or glob the snapshot must have been built from
+        stream (bool): Whether a streamed state (no contacts or opportunities frames) is wanted
+        model_name (str): Model the caller encodes with; the template matrix is dropped if it differs
+        templates (list): Templates the caller uses; the template matrix is dropped if they differ
+
+    Returns:
+        ServingState: Restored state, or None when the snapshot is missing, from another version,
+            built differently or older than the CSVs
+    """
+    import pyarrow as pa
+
+    try:
+        mapped = pa.memory_map(path)
+    except (OSError, pa.ArrowException):
+        return None
+    try:
+        header = _read_header(mapped)
+    except ValueError:
+        return None
+    if (header is None or header.get("state_version") != STATE_VERSION
+            or header.get("schema_version") != SCHEMA_VERSION or header.get("stream") != stream):
+        return None
+    sources = header["sources"]
+    try:
+        if source_signatures(paths, sources["validate"]) != sources["tables"]:
+            return None
+    except FileNotFoundError:
+        return None
+
+    mapped.seek(0)
+    buffer = mapped.read_buffer(mapped.size())
+    specs = header["sections"]
+
+    def section(name, to_pandas=True):
+        spec = specs.get(name)
+        if spec is None:
+            return None
+        data = buffer.slice(spec["offset"], spec["length"])
+        if spec["kind"] == "array":
+            return np.frombuffer(data, dtype=np.dtype(spec["dtype"])).reshape(spec["shape"])
+        table = pa.ipc.open_file(data).read_all()
+        return table.to_pandas() if to_pandas else table
+
+    # Straight to lists, skipping the pandas conversion
+    names = section("names", to_pandas=False)
+    settings = header["name_index"]
+    name_index = CompanyNameIndex.from_arrays(
+        names.column("company_id").to_pylist(), names.column("name").to_pylist(),
+        names.column("normalized").to_pylist(), settings["grams"], section("gram_offsets"),
+        section("gram_positions"), settings["ngram"], settings["max_candidates"], settings["score_cutoff"],
+        settings["max_tokens"])
+    crm_index = CrmIndex.from_frames(section("crm_contacts").set_index('Company_ID'),
+                                     section("crm_funding").set_index('Company_ID'),
+                                     header["crm_rows"]["contacts"], header["crm_rows"]["opportunities"])
+
+    template_embeddings = None
+    if (model_name is None or header.get("model_name") == model_name) and \
+            (templates is None or header.get("templates") == templates_digest(templates)):
+        template_embeddings = section("template_embeddings")
+
+    return ServingState(section("companies"), section("contacts"), section("opportunities"), name_index, crm_index,
+                        template_embeddings, sources)
+
+
+def prepare_state(path=STATE_PATH, parser=None, paths=None, stream=False, chunk_rows=STREAM_CHUNK_ROWS,
+                  validate='stat', rebuild=False):
+    """
+    Restore the serving state from its snapshot, building and saving it first if needed.
+
+    The snapshot is rebuilt when it is missing or stale. With a parser,
+    the restored template matrix is handed to it, and if the parser's
+    model or templates changed the matrix is recomputed and saved again.
+
+    Args:
+        path (str): Snapshot file
+        parser (IntentParser): Parser whose template matrix to restore or save, or None
+        paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+        stream (bool): Stream contacts and opportunities instead of keeping their frames
+        chunk_rows (int): Rows parsed per chunk when streaming
+        validate (str): 'stat' or 'hash', see load_data
+        rebuild (bool): Rebuild even if the snapshot is current
+
+    Returns:
+        tuple: (ServingState, True if it was restored from the snapshot)
+    """
+    model_name = parser.model_name if parser is not None else None
+    templates = parser.templates if parser is not None else None
+    state = None if rebuild else load_state(path, paths, stream, model_name, templates)
+    restored = state is not None
+    if state is None:
+        state = build_state(paths, stream=stream, chunk_rows=chunk_rows, validate=validate)
+
+    if parser is not None:
+        if state.template_embeddings is not None:
+            parser.set_template_embeddings(state.template_embeddings)
+        else:
+            state = state._replace(template_embeddings=parser.template_embeddings)
+            restored = False
+    if not restored:
+        save_state(path, state, model_name, templates)
+    return state, restored
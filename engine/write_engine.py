@@ -0,0 +1,138 @@
+import pandas as pd
+
+from .metrics import timed
+from .query_engine import format_date
+from .schema import DATE_FORMAT, format_id, parse_id
+
+READ_ONLY_ERROR = "This data store is read-only. Writes need the contacts and opportunities tables loaded in memory."
+
+
+def parse_date(value=None):
+    """
+    Parse the date a write applies to.
+
+    Args:
+        value (str): YYYY-MM-DD, 'today' or 'yesterday'; today if None
+
+    Returns:
+        pd.Timestamp: Date at midnight, or None if value is not a date
+    """
+    today = pd.Timestamp.today().normalize()
+    if value is None or value == 'today':
+        return today
+    if value == 'yesterday':
+        return today - pd.Timedelta(days=1)
+    try:
+        return pd.Timestamp(pd.to_datetime(value, format=DATE_FORMAT))
+    except ValueError:
+        return None
+
+
+def _record_id(value, prefix):
+    """
+    String ID to journal a record under, from its ID or surrogate key.
+    """
+    key = parse_id(value, prefix)
+    return format_id(key, prefix) if key is not None else str(value)
+
+
+def _company_name(store, company_id):
+    company = store.get_company(company_id)
+    return company['Name'] if company is not None else _record_id(company_id, 'C')
+
+
+def log_meeting(store, contact_id, date=None, journal=None):
+    """
+    Record a meeting with a contact.
+
+    The write is journaled before it is applied, then the contact, its
+    company's Last_Contacted and the per-company latest meeting are updated
+    in place, so last_contact and check_status show it right away.
+
+    Args:
+        store (DataStore): Store to update
+        contact_id (str): Contact ID like P0001
+        date (str): Meeting date, see parse_date; today if None
+        journal (Journal): Journal to record the write in, or None to only update memory
+
+    Returns:
+        dict: Dictionary with the contact, its company and the logged meeting date
+    """
+    meeting = parse_date(date)
+    if meeting is None:
+        return {"error": f"'{date}' is not a date. Use YYYY-MM-DD, 'today' or 'yesterday'."}
+    if parse_id(contact_id, 'P') is None:
+        return {"error": f"'{contact_id}' is not a contact ID. Contact IDs look like P0001."}
+    if not store.supports_writes:
+        return {"error": READ_ONLY_ERROR}
+    with timed("lookup"):
+        contact = store.get_contact(contact_id)
+    if contact is None:
+        return {"error": f"Contact '{contact_id}' not found in the database."}
+
+    with timed("write"):
+        if journal is not None:
+            journal.append({"op": "log_meeting", "contact_id": _record_id(contact_id, 'P'),
+                            "company_id": _record_id(contact['Company_ID'], 'C'),
+                            "date": meeting.strftime(DATE_FORMAT)})
+        contact = store.log_meeting(contact_id, meeting)
+    return {
+        "contact_id": _record_id(contact_id, 'P'),
+        "contact_name": contact['Name'],
+        "contact_role": contact['Role'],
+        "company_name": _company_name(store, contact['Company_ID']),
+        "meeting_date": meeting.strftime(DATE_FORMAT),
+        "last_meeting": format_date(contact['Last_Meeting'])
+    }
+
+
+def mark_closed_won(store, opp_id, date=None, journal=None, reopen=False):
+    """
+    Mark an opportunity Closed Won.
+
+    The write is journaled before it is applied, then the opportunity and
+    the per-company latest Closed Won round are updated in place, so
+    last_funding_event shows it right away. A Lost opportunity is only
+    changed with reopen.
+
+    Args:
+        store (DataStore): Store to update
+        opp_id (str): Opportunity ID like O0001
+        date (str): Date the round closed, see parse_date; today if None
+        journal (Journal): Journal to record the write in, or None to only update memory
+        reopen (bool): Mark the opportunity Closed Won even if it is Lost
+
+    Returns:
+        dict: Dictionary with the opportunity, its company and the closed round
+    """
+    closed = parse_date(date)
+    if closed is None:
+        return {"error": f"'{date}' is not a date. Use YYYY-MM-DD, 'today' or 'yesterday'."}
+    if parse_id(opp_id, 'O') is None:
+        return {"error": f"'{opp_id}' is not an opportunity ID. Opportunity IDs look like O0001."}
+    if not store.supports_writes:
+        return {"error": READ_ONLY_ERROR}
+    with timed("lookup"):
+        opportunity = store.get_opportunity(opp_id)
+    if opportunity is None:
+        return {"error": f"Opportunity '{opp_id}' not found in the database."}
+    if opportunity['Stage'] == 'Closed Won':
+        return {"error": f"Opportunity '{_record_id(opp_id, 'O')}' is already Closed Won "
+                         f"(closed {format_date(opportunity['Date_Closed'])})."}
+    if opportunity['Stage'] == 'Lost' and not reopen:
+        return {"error": f"Opportunity '{_record_id(opp_id, 'O')}' is Lost. To mark it Closed Won anyway, "
+                         f"say \"Reopen {_record_id(opp_id, 'O')} as Closed Won\"."}
+
+    with timed("write"):
+        if journal is not None:
+            journal.append({"op": "close_won", "opp_id": _record_id(opp_id, 'O'),
+                            "company_id": _record_id(opportunity['Company_ID'], 'C'),
+                            "date": closed.strftime(DATE_FORMAT)})
+        opportunity = store.close_won(opp_id, closed)
+    return {
+        "opp_id": _record_id(opp_id, 'O'),
+        "company_name": _company_name(store, opportunity['Company_ID']),
+        "funding_type": opportunity['Type'],
+        "amount": opportunity['Amount'],
+        "date_closed": format_date(opportunity['Date_Closed'])
+    }
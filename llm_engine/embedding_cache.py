@@ -0,0 +1,87 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+EMBEDDING_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'embeddings')
+
+
+def text_hash(text):
+    """
+    Hash a text for use as an embedding cache key.
+
+    Args:
+        text (str): Text that was encoded
+
+    Returns:
+        str: Hex digest of the text
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, cache_dir=EMBEDDING_CACHE_DIR):
+        """
+        On-disk cache of text embeddings for one model.
+
+        Embeddings are stored in a single .npz file per model, keyed by a hash
+        of each text, so only new or edited texts need to be encoded again.
+
+        Args:
+            model_name (str): Model the embeddings come from
+            cache_dir (str): Directory holding the cache files
+        """
+        self.model_name = model_name
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.path = os.path.join(cache_dir, f'{safe_name}.npz')
+        self._vectors = None
+        self.last_encoded = 0
+
+    def _load(self):
+        if self._vectors is not None:
+            return self._vectors
+        self._vectors = {}
+        try:
+            with np.load(self.path) as cached:
+                for key, vector in zip(cached['hashes'].tolist(), cached['embeddings']):
+                    self._vectors[key] = vector
+        except (OSError, ValueError, KeyError):
+            pass
+        return self._vectors
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        hashes = list(self._vectors)
+        embeddings = np.stack([self._vectors[key] for key in hashes])
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path, hashes=np.array(hashes), embeddings=embeddings)
+        os.replace(tmp_path, self.path)
+
+    def encode(self, texts, encode_fn):
+        """
+        Get embeddings for texts, encoding only the ones not cached yet.
+
+        Args:
+            texts (list): Texts to embed
+            encode_fn (callable): Encodes a list of texts to a 2-D array
+
+        Returns:
+            np.ndarray: One embedding row per text
+        """
+        vectors = self._load()
+        keys = [text_hash(text) for text in texts]
+        missing = [i for i, key in enumerate(keys) if key not in vectors]
+
+        if missing:
+            encoded = encode_fn([texts[i] for i in missing])
+            for i, vector in zip(missing, encoded):
+                vectors[keys[i]] = np.asarray(vector)
+            try:
+                self._save()
+            except OSError:
+                # A read-only cache directory only costs the re-encode next time
+                pass
+
+        self.last_encoded = len(missing)
+        return np.stack([vectors[key] for key in keys])
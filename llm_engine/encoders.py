@@ -0,0 +1,228 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# Quantized export shipped in the sentence-transformers model repositories
+DEFAULT_ONNX_FILE = 'onnx/model_quint8_avx2.onnx'
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+class Encoder:
+    """
+    Interface for the text encoders IntentParser matches templates with.
+
+    An encoder turns texts into one embedding row each; the parser
+    normalizes and compares them by cosine similarity. name identifies
+    the encoder and its settings, and keys the embedding cache and the
+    template matrix in state snapshots, so switching encoders never reuses
+    another encoder's template embeddings.
+    """
+
+    name = None
+
+    def load(self):
+        """
+        Load the model if it is not loaded yet. Nothing is loaded at construction.
+        """
+        raise NotImplementedError
+
+    def encode(self, texts, batch_size=32):
+        """
+        Encode texts.
+
+        Args:
+            texts (list): Texts to encode
+            batch_size (int): Texts run through the model at once
+
+        Returns:
+            np.ndarray: float32 array with one embedding row per text
+        """
+        raise NotImplementedError
+
+
+class SentenceTransformerEncoder(Encoder):
+    def __init__(self, model_name=DEFAULT_MODEL):
+        """
+        Sentence transformer model run in full precision with torch.
+
+        Args:
+            model_name (str): Sentence transformer model to load
+        """
+        self.model_name = model_name
+        self.name = model_name
+        self._model = None
+
+    def load(self):
+        if self._model is None:
+            # Imported here because sentence_transformers pulls in torch
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+
+    def encode(self, texts, batch_size=32):
+        self.load()
+        return np.asarray(self._model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+class OnnxEncoder(Encoder):
+    def __init__(self, model_name=DEFAULT_MODEL, file_name=DEFAULT_ONNX_FILE, model_dir=None, max_length=256,
+                 threads=None):
+        """
+        Sentence transformer exported to ONNX, int8-quantized by default, run with onnxruntime.
+
+        Needs onnxruntime, tokenizers and, unless model_dir is given,
+        huggingface_hub, but not torch. Token embeddings are mean-pooled
+        over the attention mask, as the sentence transformer does.
+
+        Args:
+            model_name (str): Model repository, under sentence-transformers/ unless it names its owner
+            file_name (str): ONNX file in the repository; onnx/model.onnx is the unquantized export
+            model_dir (str): Local copy of the repository to load from instead of downloading
+            max_length (int): Tokens kept per text
+            threads (int): onnxruntime threads per inference, one per core if None
+        """
+        self.model_name = model_name
+        self.file_name = file_name
+        self.model_dir = model_dir
+        self.max_length = max_length
+        self.threads = threads
+        self.name = f"{model_name}:{file_name}"
+        self._session = None
+        self._tokenizer = None
+
+    def _path(self, file_name):
+        if self.model_dir is not None:
+            return os.path.join(self.model_dir, file_name)
+        from huggingface_hub import hf_hub_download
+        repo_id = self.model_name if '/' in self.model_name else f"sentence-transformers/{self.model_name}"
+        return hf_hub_download(repo_id, file_name)
+
+    def load(self):
+        if self._session is not None:
+            return
+        import onnxruntime
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_file(self._path('tokenizer.json'))
+        tokenizer.enable_truncation(self.max_length)
+        tokenizer.enable_padding()
+        self._tokenizer = tokenizer
+        options = onnxruntime.SessionOptions()
+        if self.threads is not None:
+            options.intra_op_num_threads = self.threads
+        self._session = onnxruntime.InferenceSession(self._path(self.file_name), options,
+                                                     providers=['CPUExecutionProvider'])
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+
+    def reopen(self, threads=None):
+        """
+        Drop the inference session so the next encode starts a new one, for a forked process.
+
+        An onnxruntime session's thread pool does not survive a fork.
+
+        Args:
+            threads (int): onnxruntime threads for the new session, unchanged if None
+        """
+        if threads is not None:
+            self.threads = threads
+        self._session = None
+
+    def encode(self, texts, batch_size=32):
+        self.load()
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self._tokenizer.encode_batch(list(texts[start:start + batch_size]))
+            mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                "attention_mask": mask,
+                "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+            }
+            tokens = self._session.run(None, {key: value for key, value in feeds.items()
+                                              if key in self._input_names})[0]
+            weights = mask[:, :, None].astype(np.float32)
+            embeddings.append((tokens * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9))
+        if not embeddings:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(embeddings).astype(np.float32, copy=False)
+
+
+class HashingEncoder(Encoder):
+    def __init__(self, dimensions=1024, char_ngrams=(3, 4)):
+        """
+        Hashed bag of words, word pairs and character n-grams, with no model to load.
+
+        Every feature is hashed to one of dimensions buckets with a random
+        sign, so nothing but numpy is needed and encoding takes microseconds.
+        It only sees shared wording, not meaning, so it is meant for tests
+        and hosts that cannot run a model.
+
+        Args:
+            dimensions (int): Embedding size
+            char_ngrams (tuple): Smallest and largest character n-gram, taken within each word
+        """
+        self.dimensions = dimensions
+        self.char_ngrams = char_ngrams
+        self.name = f"hashing-{dimensions}-{char_ngrams[0]}-{char_ngrams[1]}"
+
+    def load(self):
+        pass
+
+    def features(self, text):
+        """
+        Words, adjacent word pairs and character n-grams of a text, lowercased.
+
+        Args:
+            text (str): Text to split
+
+        Returns:
+            list: Feature strings, repeated as often as they occur
+        """
+        words = _WORDS.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                features.extend(f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def encode(self, texts, batch_size=32):
+        embeddings = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                # crc32 rather than hash(), which is salted per process
+                code = zlib.crc32(feature.encode('utf-8'))
+                embeddings[row, code % self.dimensions] += 1.0 if code & 0x80000000 else -1.0
+        return embeddings
+
+
+ENCODERS = {
+    "sentence-transformers": SentenceTransformerEncoder,
+    "onnx": OnnxEncoder,
+    "hashing": HashingEncoder,
+}
+
+
+def make_encoder(backend=None, model_name=DEFAULT_MODEL):
+    """
+    Create an encoder by backend name.
+
+    Args:
+        backend (str): One of ENCODERS, defaults to the CRM_ENCODER environment
+            variable, then sentence-transformers
+        model_name (str): Model for the sentence-transformers and onnx backends
+
+    Returns:
+        Encoder: New, unloaded encoder
+    """
+    if backend is None:
+        backend = os.environ.get('CRM_ENCODER') or 'sentence-transformers'
+    if backend not in ENCODERS:
+        raise ValueError(f"Unknown encoder backend: {backend}, expected one of {', '.join(ENCODERS)}")
+    if backend == 'hashing':
+        return HashingEncoder()
+    return ENCODERS[backend](model_name)
@@ -1,30 +1,234 @@
+import logging
 import re
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
 import numpy as np
-from .template_mapper import get_all_templates, get_intent_for_template
+from engine.metrics import METRICS, timed
+from .template_mapper import WRITE_INTENTS, get_all_templates, get_template_intents
+from .lexical_classifier import LexicalIntentClassifier
+from .embedding_cache import EmbeddingCache, EMBEDDING_CACHE_DIR
+from .encoders import DEFAULT_MODEL, make_encoder
+from .template_index import TemplateIndex
+
+logger = logging.getLogger(__name__)
+
+# Nearest templates find_top_intents ranks intents from
+TOP_INTENT_CANDIDATES = 256
+
+# Common patterns for company names, tried in order when no known name is found
+_COMPANY_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'of\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
+    r'with\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
+    r'for\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
+    r'([A-Z][a-zA-Z\s&\-\'\.]+?)\'s',
+    r'([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:status|funding|contact)',
+    r'(?:what|when|how|show|tell)\s+(?:is|was|did|does)\s+(?:the\s+)?(?:status|funding|contact)\s+(?:of\s+)?([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
+    r'(?:when\s+)?(?:did|was)\s+([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:last|most\s+recent)',
+    r'([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:last|most\s+recent)',
+]]
+
+_NAME_JUNK = re.compile(r'[^\w\s&\-\'\.]')
+
+# Contact and opportunity IDs, and the dates write intents take
+_RECORD_ID = re.compile(r'\b([PO]\d+)\b', re.IGNORECASE)
+_DATE = re.compile(r'\b(\d{4}-\d{2}-\d{2}|today|yesterday)\b', re.IGNORECASE)
+
+# A command verb opening the question, after an optional "please" or "can you"
+_IMPERATIVE = re.compile(r'^\W*(?:please\s+)?(?:(?:can|could|would)\s+you\s+(?:please\s+)?)?'
+                         r'(?:log|record|add|note|mark|set|update|close|move|reopen)\b', re.IGNORECASE)
+
+# Wording that asks to mark a Lost opportunity Closed Won anyway
+_REOPEN = re.compile(r'\bre-?open\b|\bfrom lost\b', re.IGNORECASE)
+_FROM_LOST = re.compile(r'\bfrom lost\b', re.IGNORECASE)
+
+# The write intent each record ID prefix can be the subject of
+_RECORD_WRITE_INTENTS = {"P": "log_meeting", "O": "mark_closed_won"}
+
+# Words a write command must name its change with
+_MEETING_WORDS = re.compile(r'\b(?:meeting|meet|met|call|called)\b', re.IGNORECASE)
+_WON_WORDS = re.compile(r'\b(?:won|win|close|closed)\b', re.IGNORECASE)
+
+# Wording that says a round was not won, which is never taken as Closed Won
+_NOT_WON = re.compile(r"\b(?:not|no|never|cancel\w*|lose|losing|lost|dead)\b|n't\b", re.IGNORECASE)
+
+# Words that never continue a capitalized company name, and never form a company mention alone
+STOPWORDS = frozenset([
+    'the', 'and', 'or', 'for', 'with', 'of', 'in', 'on', 'at', 'to', 'from', 'by', 'about', 'like', 'as',
+    'is', 'was', 'are', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall'
+])
+
+def _l2_normalize(vectors):
+    """
+    Scale each row to unit length, leaving all-zero rows at zero.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
 
 class IntentParser:
-    def __init__(self):
+    def __init__(self, model_name=DEFAULT_MODEL, cache_dir=EMBEDDING_CACHE_DIR, use_cache=True, lazy=True,
+                 precision='float32', company_index=None, lexical=True, encoder=None):
         """
-        Initialize the intent parser with sentence transformer model.
+        Initialize the intent parser with a text encoder.
+        
+        The encoder is the sentence transformer model_name unless another
+        backend is chosen, by name or with the CRM_ENCODER environment
+        variable; see encoders.ENCODERS. The model and template embeddings
+        are loaded on first use, so constructing a parser does not import
+        sentence_transformers or torch. Call load() or load_in_background()
+        to load them ahead of time.
+        
+        With lexical enabled, a TF-IDF classifier over the templates answers
+        questions it is confident about first, and the model only encodes
+        the rest. The intent_stage.lexical and intent_stage.transformer
+        counters record which one answered.
+        
+        Args:
+            model_name (str): Model the sentence-transformers and onnx backends load
+            cache_dir (str): Directory for cached template embeddings
+            use_cache (bool): Reuse template embeddings cached on disk
+            lazy (bool): Defer loading the model until it is first needed
+            precision (str): 'float32' or 'float16' storage for the template matrix
+            company_index (CompanyNameIndex): Known company names to look for in questions,
+                or any DataStore, which offers the same find_mention
+            lexical (bool): Try the lexical classifier before the model
+            encoder (Encoder): Encoder to use, or the name of a backend to create one with
         """
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        if encoder is None or isinstance(encoder, str):
+            encoder = make_encoder(encoder, model_name)
+        self.encoder = encoder
+        # Keys the cached and snapshotted template embeddings, so they follow the encoder
+        self.model_name = encoder.name
+        self.precision = np.dtype(precision)
         self.templates = get_all_templates()
-        self.template_embeddings = None
-        self._compute_template_embeddings()
+        self.template_intents = get_template_intents()
+        self.template_index = TemplateIndex(self.templates, self.template_intents)
+        self.intents = self.template_index.intents
+        self._template_intent_ids = self.template_index.intent_ids
+        self._intent_numbers = {intent: number for number, intent in enumerate(self.intents)}
+        self.embedding_cache = EmbeddingCache(self.model_name, cache_dir) if use_cache else None
+        self.company_index = company_index
+        self.lexical = LexicalIntentClassifier(self.templates, self.template_intents) if lexical else None
+        self._model = None
+        self._template_embeddings = None
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self.load()
+    
+    @property
+    def model(self):
+        """
+        The encoder, loaded on first access.
+        """
+        self.load()
+        return self._model
+    
+    @property
+    def template_embeddings(self):
+        """
+        L2-normalized template embeddings, one contiguous row per template.
+        
+        Computed on first access. Cosine similarity against them is a plain
+        dot product with a normalized query vector.
+        """
+        self.load()
+        return self._template_embeddings
+    
+    def load(self):
+        """
+        Load the model and template embeddings if they are not loaded yet.
+        
+        Safe to call from several threads; callers wait for a load already
+        in progress instead of starting another one.
+        """
+        if self._model is not None and self._template_embeddings is not None:
+            return
+        with self._load_lock:
+            if self._model is None:
+                self.encoder.load()
+                self._model = self.encoder
+            if self._template_embeddings is None:
+                self._compute_template_embeddings()
+    
+    def set_template_embeddings(self, embeddings):
+        """
+        Use a precomputed template matrix instead of encoding the templates.
+        
+        For a matrix restored from a state snapshot; load() then only loads
+        the model.
+        
+        Args:
+            embeddings (np.ndarray): L2-normalized embeddings, one row per template
+        """
+        if len(embeddings) != len(self.templates):
+            raise ValueError(f"Expected {len(self.templates)} template embeddings, got {len(embeddings)}")
+        embeddings = np.asarray(embeddings, dtype=self.precision)
+        self.template_index.build(embeddings)
+        self._template_embeddings = embeddings
+    
+    def load_in_background(self):
+        """
+        Start loading the model and template embeddings on a background thread.
+        
+        Errors are not raised on the background thread; the next load() call
+        retries and raises them in the caller.
+        
+        Returns:
+            threading.Thread: The loader thread
+        """
+        def _load():
+            try:
+                self.load()
+            except Exception:
+                pass
+        
+        thread = threading.Thread(target=_load, name="intent-model-loader", daemon=True)
+        thread.start()
+        return thread
+    
+    def warm_up(self, user_input="What is the status of Acme Corp?"):
+        """
+        Load, then run one throwaway encode and template match.
+        
+        The first encode initializes the tokenizer and model kernels, which
+        would otherwise be paid by the first real question. Nothing is
+        recorded in the stage metrics.
+        
+        Args:
+            user_input (str): Question to encode
+        """
+        self.load()
+        self.template_index.search(_l2_normalize(self._model.encode([user_input])))
+        if self.lexical is not None:
+            self.lexical.classify(user_input)
     
     def _compute_template_embeddings(self):
         """
         Pre-compute embeddings for all templates.
+        
+        With the embedding cache enabled, only templates that are new or
+        changed since the last run are encoded.
         """
-        print(f"Loading {len(self.templates)} templates...")
-        print(f"First few templates: {self.templates[:5]}")
-        self.template_embeddings = self.model.encode(self.templates)
+        logger.info("Loading %d templates...", len(self.templates))
+        if self.embedding_cache is None:
+            embeddings = self._model.encode(self.templates)
+        else:
+            embeddings = self.embedding_cache.encode(self.templates, self._model.encode)
+            logger.info("Encoded %d new templates, %d from cache", self.embedding_cache.last_encoded,
+                        len(self.templates) - self.embedding_cache.last_encoded)
+        
+        embeddings = np.ascontiguousarray(_l2_normalize(embeddings), dtype=self.precision)
+        # Indexed before it is published, so a caller seeing the matrix can search it
+        self.template_index.build(embeddings)
+        self._template_embeddings = embeddings
     
     def extract_company_name(self, user_input):
         """
-        Extract company name from user input using simple pattern matching.
+        Extract company name from user input.
+        
+        Known company names are looked up first with the company index's
+        gazetteer pass; the regex patterns only run when no known name is
+        mentioned, for example with no data loaded or a misspelled name.
         
         Args:
             user_input (str): User's input text
@@ -32,24 +236,17 @@ class IntentParser:
         Returns:
             str: Extracted company name or None
         """
-        # Common patterns for company names
-        patterns = [
-            r'of\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
-            r'with\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
-            r'for\s+([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
-            r'([A-Z][a-zA-Z\s&\-\'\.]+?)\'s',
-            r'([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:status|funding|contact)',
-            r'(?:what|when|how|show|tell)\s+(?:is|was|did|does)\s+(?:the\s+)?(?:status|funding|contact)\s+(?:of\s+)?([A-Z][a-zA-Z\s&\-\'\.]+?)(?:\?|$|\s|,)',
-            r'(?:when\s+)?(?:did|was)\s+([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:last|most\s+recent)',
-            r'([A-Z][a-zA-Z\s&\-\'\.]+?)\s+(?:last|most\s+recent)',
-        ]
+        if self.company_index is not None:
+            mention = self.company_index.find_mention(user_input, ignore=STOPWORDS)
+            if mention is not None:
+                return mention.name
         
-        for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _COMPANY_PATTERNS:
+            match = pattern.search(user_input)
             if match:
                 company_name = match.group(1).strip()
                 # Clean up the company name
-                company_name = re.sub(r'[^\w\s&\-\'\.]', '', company_name).strip()
+                company_name = _NAME_JUNK.sub('', company_name).strip()
                 if len(company_name) > 2:  # Minimum length check
                     return company_name
         
@@ -61,7 +258,7 @@ class IntentParser:
                 # Look for multi-word company names
                 company_parts = [word]
                 for j in range(i + 1, min(i + 4, len(words))):
-                    if words[j][0].isupper() and not words[j].lower() in ['the', 'and', 'or', 'for', 'with', 'of', 'in', 'on', 'at', 'to', 'from', 'by', 'about', 'like', 'as', 'is', 'was', 'are', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall']:
+                    if words[j][0].isupper() and not words[j].lower() in STOPWORDS:
                         company_parts.append(words[j])
                     else:
                         break
@@ -74,43 +271,275 @@ class IntentParser:
         
         return None
     
-    def find_best_match(self, user_input, threshold=0.3):
+    def extract_record(self, user_input):
+        """
+        Extract the contact or opportunity ID and the date a write question names.
+        
+        Args:
+            user_input (str): User's input text
+            
+        Returns:
+            tuple: (record ID like P0001 or O0001, date text such as 2025-07-01 or
+                'yesterday'), either None when not given
+        """
+        record = _RECORD_ID.search(user_input)
+        date = _DATE.search(user_input)
+        return (record.group(1).upper() if record else None,
+                date.group(1).lower() if date else None)
+    
+    def write_intents_for(self, user_input):
+        """
+        Write intents an input may be matched to.
+        
+        Only a command naming one kind of record qualifies: it opens with a
+        verb such as log, mark or close, and its IDs decide the intent, a
+        contact ID (P0001) log_meeting and an opportunity ID (O0001)
+        mark_closed_won. The change must be named as well, a meeting or call
+        for log_meeting and a won or closed round for mark_closed_won, and
+        a round described as lost, not won or cancelled is never marked
+        Closed Won; "from lost" in a reopen command is the one exception.
+        Questions such as "Was O0002 won?" or "Has Acme closed a round?" are
+        only ever matched to read intents.
+        
+        Args:
+            user_input (str): User's input text
+            
+        Returns:
+            frozenset: Write intents that may be picked, empty for a read
+        """
+        if _IMPERATIVE.match(user_input) is None:
+            return frozenset()
+        prefixes = {record_id[0].upper() for record_id in _RECORD_ID.findall(user_input)}
+        if len(prefixes) != 1:
+            return frozenset()
+        intent = _RECORD_WRITE_INTENTS[prefixes.pop()]
+        if intent == "log_meeting" and not _MEETING_WORDS.search(user_input):
+            return frozenset()
+        if intent == "mark_closed_won" and (not _WON_WORDS.search(user_input)
+                                            or _NOT_WON.search(_FROM_LOST.sub(' ', user_input))):
+            return frozenset()
+        return frozenset([intent])
+    
+    def _excluded_intents(self, user_input):
+        """
+        Write intents an input must not be matched to, see write_intents_for.
+        """
+        return frozenset(WRITE_INTENTS) - self.write_intents_for(user_input)
+    
+    def find_best_match(self, user_input, threshold=0.3, company_name=None):
         """
         Find the best matching template for user input.
         
+        The lexical classifier answers first when it is enabled and
+        confident; otherwise the input is encoded with the model. Write
+        intents are skipped unless write_intents_for allows them, and only
+        the model can pick one.
+        
         Args:
             user_input (str): User's input text
             threshold (float): Similarity threshold for matching
+            company_name (str): Company name found in the input, masked for the lexical classifier
             
         Returns:
             tuple: (best_template, similarity_score, intent)
         """
+        excluded = self._excluded_intents(user_input)
+        match = self._match_lexical(user_input, company_name, excluded)
+        if match is not None:
+            return match
+        METRICS.increment("intent_stage.transformer")
+        
         # Encode user input
-        user_embedding = self.model.encode([user_input])
+        user_embedding = self._encode([user_input])
         
-        # Calculate similarities
-        similarities = cosine_similarity(user_embedding, self.template_embeddings)[0]
+        best_template, best_similarity, best_intent, best_idx = self._match_embeddings(
+            user_embedding, threshold, [excluded])[0]
         
-        # Find best match
-        best_idx = np.argmax(similarities)
-        best_similarity = similarities[best_idx]
-        best_template = self.templates[best_idx]
-        best_intent = get_intent_for_template(best_template)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Intent matched: %s with confidence: %.3f", best_intent, best_similarity)
+            logger.debug("Best template: %s", self.templates[best_idx])
+            logger.debug("Best index: %d", best_idx)
         
-        # Debug logging
-        print(f"Intent matched: {best_intent} with confidence: {best_similarity:.3f}")
-        print(f"Best template: {best_template}")
-        print(f"Best index: {best_idx}")
+        return best_template, best_similarity, best_intent
+    
+    def find_best_matches(self, user_inputs, threshold=0.3, batch_size=64, company_names=None):
+        """
+        Find the best matching template for several inputs at once.
         
-        if best_similarity >= threshold:
-            return best_template, best_similarity, best_intent
-        else:
-            return None, best_similarity, None
+        Inputs the lexical classifier is not confident about are encoded
+        together in one batched model call.
+        
+        Args:
+            user_inputs (list): User input texts
+            threshold (float): Similarity threshold for matching
+            batch_size (int): Batch size passed to the model
+            company_names (list): Company name found in each input, or None
+            
+        Returns:
+            list: (best_template, similarity_score, intent) per input
+        """
+        if company_names is None:
+            company_names = [None] * len(user_inputs)
+        excluded = [self._excluded_intents(user_input) for user_input in user_inputs]
+        matches = [self._match_lexical(user_input, company_name, intents)
+                   for user_input, company_name, intents in zip(user_inputs, company_names, excluded)]
+        pending = [i for i, match in enumerate(matches) if match is None]
+        if pending:
+            METRICS.increment("intent_stage.transformer", len(pending))
+            user_embeddings = self._encode([user_inputs[i] for i in pending], batch_size=batch_size)
+            for i, match in zip(pending, self._match_embeddings(user_embeddings, threshold,
+                                                                [excluded[i] for i in pending])):
+                matches[i] = match[:3]
+        return matches
+    
+    def _match_lexical(self, user_input, company_name=None, excluded=frozenset()):
+        """
+        Classify an input with the lexical classifier, timed as the classify stage.
+        
+        The intents in excluded are never picked. A write intent is left
+        for the model to confirm, since shared wording alone is not enough
+        to change data.
+        
+        Returns:
+            tuple: (best_template, similarity_score, intent), or None when the
+                classifier is disabled, not confident or picked a write intent
+        """
+        if self.lexical is None:
+            return None
+        with timed("classify"):
+            best_template, similarity, intent, margin = self.lexical.classify(user_input, company_name, excluded)
+        if intent in WRITE_INTENTS or not self.lexical.is_confident(similarity, margin):
+            return None
+        METRICS.increment("intent_stage.lexical")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Intent matched lexically: %s with confidence: %.3f, margin: %.3f",
+                         intent, similarity, margin)
+            logger.debug("Best template: %s", best_template)
+        return best_template, similarity, intent
+    
+    def _encode(self, texts, **kwargs):
+        """
+        Encode texts with the model, timed as the embed stage.
+        """
+        model = self.model  # loads outside the timed block
+        with timed("embed"):
+            return model.encode(texts, **kwargs)
+    
+    def score_embeddings(self, user_embeddings):
+        """
+        Cosine similarity of encoded inputs against every template.
+        
+        Args:
+            user_embeddings (np.ndarray): One embedding row per input
+            
+        Returns:
+            np.ndarray: float32 array of shape (inputs, templates)
+        """
+        queries = _l2_normalize(np.atleast_2d(np.asarray(user_embeddings, dtype=np.float32)))
+        # One matrix product scores the whole batch
+        return queries @ self.template_embeddings.T.astype(np.float32, copy=False)
+    
+    def _match_embeddings(self, user_embeddings, threshold, excluded=None):
+        """
+        Find the nearest template of each encoded input with the template index.
+        
+        excluded holds the intents each input must not be matched to; an
+        input nearest a template of one of them gets its nearest allowed
+        template among the TOP_INTENT_CANDIDATES nearest.
+        
+        Returns:
+            list: (best_template, similarity_score, intent, best_idx) per input,
+                with template and intent set to None below the threshold
+        """
+        if excluded is None:
+            excluded = [frozenset()] * len(user_embeddings)
+        # Load first so a one-off model load is not timed as similarity
+        self.load()
+        with timed("similarity"):
+            queries = _l2_normalize(np.atleast_2d(np.asarray(user_embeddings, dtype=np.float32)))
+            positions, similarities = self.template_index.search(queries)
+            best_positions, best_similarities = positions[:, 0], similarities[:, 0]
+            
+            # Inputs nearest a template of an excluded intent look further
+            rows = [row for row, position in enumerate(best_positions.tolist())
+                    if self.template_index.intent_of(position) in excluded[row]]
+            if rows:
+                candidates, candidate_similarities = self.template_index.search(queries[rows], TOP_INTENT_CANDIDATES)
+                for row, row_candidates, row_similarities in zip(rows, candidates, candidate_similarities):
+                    excluded_ids = [self._intent_numbers[intent] for intent in excluded[row]]
+                    first = int((~np.isin(self._template_intent_ids[row_candidates], excluded_ids)).argmax())
+                    best_positions[row] = row_candidates[first]
+                    best_similarities[row] = row_similarities[first]
+            
+            matches = []
+            for best_idx, best_similarity in zip(best_positions.tolist(), best_similarities):
+                if best_similarity >= threshold:
+                    matches.append((self.templates[best_idx], best_similarity,
+                                    self.template_index.intent_of(best_idx), best_idx))
+                else:
+                    matches.append((None, best_similarity, None, best_idx))
+        return matches
+    
+    def find_top_intents(self, user_input, k=3):
+        """
+        Rank intents for one input by their best template score.
+        
+        Args:
+            user_input (str): User's input text
+            k (int): Number of intents to return
+            
+        Returns:
+            list: Dicts with intent, score, template and margin over the next intent
+        """
+        return self.find_top_intents_many([user_input], k)[0]
+    
+    def find_top_intents_many(self, user_inputs, k=3):
+        """
+        Rank intents for several inputs, encoded and scored in one batch.
+        
+        Intents are ranked by their best template among the
+        TOP_INTENT_CANDIDATES nearest ones, which covers every template of
+        a small catalog; intents with none of them are left out.
+        
+        Args:
+            user_inputs (list): User input texts
+            k (int): Number of intents to return per input
+            
+        Returns:
+            list: One ranked list per input, see find_top_intents
+        """
+        if not user_inputs:
+            return []
+        queries = _l2_normalize(np.atleast_2d(self._encode(list(user_inputs))))
+        self.load()
+        positions, similarities = self.template_index.search(queries, TOP_INTENT_CANDIDATES)
+        
+        rankings = []
+        for row_positions, row_similarities in zip(positions, similarities):
+            # Candidates come best first, so an intent's first candidate is its best template
+            _, first = np.unique(self._template_intent_ids[row_positions], return_index=True)
+            best = np.sort(first)
+            ranked = []
+            for rank, candidate in enumerate(best[:k]):
+                score = float(row_similarities[candidate])
+                next_score = float(row_similarities[best[rank + 1]]) if rank + 1 < len(best) else None
+                ranked.append({
+                    "intent": self.template_index.intent_of(row_positions[candidate]),
+                    "score": score,
+                    "template": self.templates[row_positions[candidate]],
+                    "margin": score - next_score if next_score is not None else None
+                })
+            rankings.append(ranked)
+        return rankings
     
     def parse_intent(self, user_input):
         """
         Parse user input to extract intent and company name.
         
+        The contact or opportunity ID and date that write intents act on are
+        extracted too, as record_id and date, and reopen says whether the
+        input asks to reopen a Lost opportunity.
+        
         Args:
             user_input (str): User's input text
             
@@ -118,16 +547,50 @@ class IntentParser:
             dict: Dictionary with intent and company information
         """
         # Extract company name
-        company_name = self.extract_company_name(user_input)
+        with timed("extract_company"):
+            company_name = self.extract_company_name(user_input)
+        
+        record_id, date = self.extract_record(user_input)
         
         # Find best matching intent
-        best_template, similarity, intent = self.find_best_match(user_input)
+        best_template, similarity, intent = self.find_best_match(user_input, company_name=company_name)
         
         result = {
             "intent": intent,
             "company": company_name,
             "confidence": similarity,
-            "matched_template": best_template
+            "matched_template": best_template,
+            "record_id": record_id,
+            "date": date,
+            "reopen": _REOPEN.search(user_input) is not None
         }
         
-        return result 
\ No newline at end of file
+        return result
+    
+    def parse_intents(self, user_inputs):
+        """
+        Parse several user inputs, encoding them in a single batch.
+        
+        Args:
+            user_inputs (list): User input texts
+            
+        Returns:
+            list: One parse_intent style dictionary per input
+        """
+        with timed("extract_company"):
+            companies = [self.extract_company_name(user_input) for user_input in user_inputs]
+        matches = self.find_best_matches(user_inputs, company_names=companies)
+        records = [self.extract_record(user_input) for user_input in user_inputs]
+        return [
+            {
+                "intent": intent,
+                "company": company_name,
+                "confidence": similarity,
+                "matched_template": best_template,
+                "record_id": record_id,
+                "date": date,
+                "reopen": _REOPEN.search(user_input) is not None
+            }
+            for user_input, company_name, (best_template, similarity, intent), (record_id, date)
+            in zip(user_inputs, companies, matches, records)
+        ]
@@ -0,0 +1,155 @@
+import re
+
+import numpy as np
+
+COMPANY_PLACEHOLDER = "[company]"
+
+# Record ID prefix to the placeholder write templates use for the ID
+RECORD_PLACEHOLDERS = {"P": "[contact]", "O": "[opportunity]"}
+
+_TOKENS = re.compile(r"\[(?:company|contact|opportunity)\]|[a-z0-9]+")
+_RECORD_IDS = re.compile(r"\b([PO])\d+\b", re.IGNORECASE)
+
+
+def lexical_features(text):
+    """
+    Split text into the word unigrams, word bigrams and character 4-grams the classifier scores.
+
+    Placeholders such as [company] are kept as one token, so "status of
+    [company]" yields the bigram "of [company]". Character 4-grams are taken within
+    each word, padded with < and >, so "contacted" still shares most of its
+    grams with "contact".
+
+    Args:
+        text (str): Template or question text
+
+    Returns:
+        list: Feature strings, with repeats
+    """
+    words = _TOKENS.findall(text.lower().replace("'s", " "))
+    features = list(words)
+    features += [f"{first} {second}" for first, second in zip(words, words[1:])]
+    for word in words:
+        if word.startswith("["):
+            continue
+        padded = f"<{word}>"
+        features += [padded[i:i + 4] for i in range(max(len(padded) - 3, 1))]
+    return features
+
+
+def mask_company(text, company_name):
+    """
+    Replace a company name in a question with the [company] placeholder.
+
+    Args:
+        text (str): Question text
+        company_name (str): Company name found in the question, or None
+
+    Returns:
+        str: Question with the name masked, or unchanged if it is not found
+    """
+    if not company_name:
+        return text
+    return re.sub(re.escape(company_name), COMPANY_PLACEHOLDER, text, flags=re.IGNORECASE)
+
+
+def mask_records(text):
+    """
+    Replace contact and opportunity IDs in a question with their placeholders.
+
+    Args:
+        text (str): Question text
+
+    Returns:
+        str: Question with IDs like P0001 and O0001 masked as [contact] and [opportunity]
+    """
+    return _RECORD_IDS.sub(lambda match: RECORD_PLACEHOLDERS[match.group(1).upper()], text)
+
+
+class LexicalIntentClassifier:
+    def __init__(self, templates, template_intents, min_score=0.35, min_margin=0.12):
+        """
+        TF-IDF nearest-template intent classifier over the intent templates.
+
+        Scores a question against every template with the cosine similarity
+        of TF-IDF weighted word and character n-grams, and ranks intents by
+        their best template. This takes tens of microseconds, so it answers
+        questions with obvious wording ("funding", "contacted", "status")
+        and leaves the rest to the sentence transformer. Features not seen
+        in any template, such as the words of a company name, are ignored.
+
+        Args:
+            templates (list): Template strings with a [company], [contact] or [opportunity] placeholder
+            template_intents (list): Intent of each template
+            min_score (float): Lowest best-template similarity to accept
+            min_margin (float): Lowest lead of the best intent over the runner-up to accept
+        """
+        self.templates = list(templates)
+        self.template_intents = list(template_intents)
+        self.intents = list(dict.fromkeys(self.template_intents))
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        template_features = [lexical_features(template) for template in self.templates]
+        self.vocabulary = {}
+        for features in template_features:
+            for feature in features:
+                self.vocabulary.setdefault(feature, len(self.vocabulary))
+
+        counts = np.zeros((len(self.templates), len(self.vocabulary)), dtype=np.float32)
+        for row, features in enumerate(template_features):
+            for feature in features:
+                counts[row, self.vocabulary[feature]] += 1
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(self.templates)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        weights = np.log1p(counts) * self.idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        # Transposed so a question's features select contiguous rows
+        self._template_weights_t = np.ascontiguousarray((weights / np.maximum(norms, 1e-12)).T)
+        self._intent_templates = [
+            np.array([i for i, intent in enumerate(self.template_intents) if intent == name])
+            for name in self.intents
+        ]
+
+    def classify(self, user_input, company_name=None, exclude=()):
+        """
+        Score a question against the templates.
+
+        Args:
+            user_input (str): User's input text
+            company_name (str): Company name found in the question, masked before scoring
+                along with any contact or opportunity IDs
+            exclude (collection): Intents never to pick, nor to count as the runner-up
+
+        Returns:
+            tuple: (best_template, similarity_score, intent, margin), where margin is
+                the best intent's lead over the runner-up
+        """
+        features = {}
+        for feature in lexical_features(mask_records(mask_company(user_input, company_name))):
+            column = self.vocabulary.get(feature)
+            if column is not None:
+                features[column] = features.get(column, 0) + 1
+        if not features:
+            return None, 0.0, None, 0.0
+
+        columns = np.fromiter(features.keys(), dtype=np.intp, count=len(features))
+        query = np.log1p(np.fromiter(features.values(), dtype=np.float32, count=len(features))) * self.idf[columns]
+        query /= np.linalg.norm(query)
+        similarities = query @ self._template_weights_t[columns]
+
+        intent_scores = np.array([similarities[rows].max() if intent not in exclude else -np.inf
+                                  for intent, rows in zip(self.intents, self._intent_templates)])
+        order = np.argsort(-intent_scores)
+        best_intent = order[0]
+        margin = intent_scores[best_intent] - intent_scores[order[1]] if len(order) > 1 else intent_scores[best_intent]
+        rows = self._intent_templates[best_intent]
+        best_idx = rows[np.argmax(similarities[rows])]
+        return self.templates[best_idx], float(similarities[best_idx]), self.intents[best_intent], float(margin)
+
+    def is_confident(self, similarity, margin):
+        """
+        Whether a classify() result is sure enough to skip the sentence transformer.
+        """
+        return similarity >= self.min_score and margin >= self.min_margin
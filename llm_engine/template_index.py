@@ -0,0 +1,178 @@
+import numpy as np
+
+# Catalogs smaller than this are searched exactly; one matrix product beats probing lists
+IVF_MIN_TEMPLATES = 2048
+
+# Templates per inverted list, so the rows scanned per query stay flat as the catalog grows
+LIST_SIZE = 64
+
+# Inverted lists scanned per query
+PROBES = 8
+
+KMEANS_ITERATIONS = 10
+
+# Templates per list sampled to train the centroids; every template is assigned afterwards
+TRAINING_SAMPLE = 16
+
+
+def _spherical_kmeans(vectors, clusters, iterations=KMEANS_ITERATIONS, seed=0):
+    """
+    Cluster unit vectors by cosine similarity.
+
+    The centroids are trained on a sample of TRAINING_SAMPLE vectors per
+    cluster, then every vector is assigned to its nearest centroid.
+
+    Returns:
+        tuple: (unit-length centroids, cluster of each vector)
+    """
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), clusters * TRAINING_SAMPLE), replace=False)]
+    centroids = sample[:clusters].copy()
+    for _ in range(iterations):
+        assignment = (sample @ centroids.T).argmax(axis=1)
+        counts = np.bincount(assignment, minlength=clusters)
+        filled = counts > 0
+        # Sum each cluster's members as one contiguous run of the sorted sample
+        starts = (np.cumsum(counts) - counts)[filled]
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(sample[np.argsort(assignment, kind='stable')], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # An empty cluster keeps its previous centroid
+        filled = norms[:, 0] > 0
+        centroids[filled] = sums[filled] / norms[filled]
+    return centroids, (vectors @ centroids.T).argmax(axis=1)
+
+
+class TemplateIndex:
+    def __init__(self, templates, template_intents, probes=PROBES, list_size=LIST_SIZE,
+                 min_ivf_templates=IVF_MIN_TEMPLATES):
+        """
+        Nearest-template search over the template embeddings, with integer intent lookups.
+
+        Each template's intent is kept as an integer in intent_ids, so
+        turning a matched template into its intent is one array read. Small
+        catalogs are searched exactly. From min_ivf_templates templates on,
+        build() clusters the embeddings into inverted lists of about
+        list_size templates (IVF), and search() only scans the probes lists
+        whose centroids are nearest the query. The rows scanned per query
+        then stay about the same however large the catalog grows.
+
+        Args:
+            templates (list): Template texts
+            template_intents (list): Intent of each template
+            probes (int): Inverted lists scanned per query
+            list_size (int): Templates per inverted list, on average
+            min_ivf_templates (int): Smallest catalog that gets inverted lists
+        """
+        if len(templates) != len(template_intents):
+            raise ValueError(f"Expected {len(templates)} template intents, got {len(template_intents)}")
+        self.templates = list(templates)
+        self.intents = list(dict.fromkeys(template_intents))
+        intent_numbers = {intent: number for number, intent in enumerate(self.intents)}
+        self.intent_ids = np.array([intent_numbers[intent] for intent in template_intents], dtype=np.intp)
+        self._template_positions = {}
+        for position, template in enumerate(self.templates):
+            self._template_positions.setdefault(template, position)
+        self.probes = probes
+        self.list_size = list_size
+        self.min_ivf_templates = min_ivf_templates
+        self.embeddings = None
+        self.centroids = None
+        self._order = None
+        self._offsets = None
+        self._list_embeddings = None
+
+    def intent_for(self, template):
+        """
+        Intent of a template text, or None if it is not in the index.
+        """
+        position = self._template_positions.get(template)
+        return self.intents[self.intent_ids[position]] if position is not None else None
+
+    def intent_of(self, position):
+        """
+        Intent of the template at a position.
+        """
+        return self.intents[self.intent_ids[position]]
+
+    def build(self, embeddings):
+        """
+        Index the template embeddings, clustering them if the catalog is large.
+
+        Args:
+            embeddings (np.ndarray): L2-normalized embeddings, one row per template
+        """
+        if len(embeddings) != len(self.templates):
+            raise ValueError(f"Expected {len(self.templates)} template embeddings, got {len(embeddings)}")
+        self.embeddings = embeddings
+        if len(embeddings) < self.min_ivf_templates:
+            self.centroids = self._order = self._offsets = self._list_embeddings = None
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        clusters = max(1, len(vectors) // self.list_size)
+        self.centroids, assignment = _spherical_kmeans(vectors, clusters)
+        # Each list's templates are stored contiguously, so probing a list reads one slice
+        self._order = np.argsort(assignment, kind='stable')
+        self._offsets = np.searchsorted(assignment[self._order], np.arange(clusters + 1))
+        self._list_embeddings = np.ascontiguousarray(vectors[self._order])
+
+    @property
+    def is_ivf(self):
+        """
+        Whether searches probe inverted lists rather than scanning every template.
+        """
+        return self.centroids is not None
+
+    def search(self, queries, k=1):
+        """
+        Find the templates nearest each query by cosine similarity.
+
+        When the probed lists hold fewer than k templates, further lists
+        are probed, nearest first, until they hold k.
+
+        Args:
+            queries (np.ndarray): L2-normalized query embeddings, one row per query
+            k (int): Templates to return per query, at most the number of templates
+
+        Returns:
+            tuple: (positions, similarities), each of shape (queries, min(k, templates)), best first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self.templates))
+        if not self.is_ivf:
+            return self._top_k(queries @ self.embeddings.T.astype(np.float32, copy=False), k)
+
+        positions = np.empty((len(queries), k), dtype=np.intp)
+        similarities = np.empty((len(queries), k), dtype=np.float32)
+        probes = min(self.probes, len(self.centroids))
+        centroid_scores = queries @ self.centroids.T
+        nearest_lists = np.argpartition(-centroid_scores, probes - 1, axis=1)[:, :probes]
+        sizes = np.diff(self._offsets)
+        for row, (query, lists) in enumerate(zip(queries, nearest_lists)):
+            if sizes[lists].sum() < k:
+                # Too few templates in the nearest lists, so keep probing in order of centroid score
+                ranked = np.argsort(-centroid_scores[row], kind='stable')
+                lists = ranked[:np.searchsorted(np.cumsum(sizes[ranked]), k) + 1]
+            rows = np.concatenate([np.arange(self._offsets[i], self._offsets[i + 1]) for i in lists])
+            top_rows, top_scores = self._top_k((self._list_embeddings[rows] @ query)[None, :], k)
+            positions[row] = self._order[rows[top_rows[0]]]
+            similarities[row] = top_scores[0]
+        return positions, similarities
+
+    @staticmethod
+    def _top_k(scores, k):
+        """
+        Best k columns of each row of a score matrix, best first; k is at most the column count.
+        """
+        if k == 0:
+            return np.empty((len(scores), 0), dtype=np.intp), np.empty((len(scores), 0), dtype=np.float32)
+        if k == 1:
+            # argmax keeps the first of tied templates
+            top = scores.argmax(axis=1)[:, None]
+        elif k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (len(scores), k))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1).astype(np.float32)
@@ -61,7 +61,12 @@ TEMPLATES = {
         "Show me [company]'s investment history",
         "When did [company] last receive funding?",
         "What's [company]'s funding timeline?",
-        "Tell me about [company]'s capital raises"
+        "Tell me about [company]'s capital raises",
+        "When did [company] close its last round?",
+        "Has [company] closed a round?",
+        "Did [company] close a round?",
+        "Was [company] funded?",
+        "Has [company] raised money yet?"
     ],
     "last_contact": [
         "When was [company] last contacted?",
@@ -93,10 +98,42 @@ TEMPLATES = {
         "When did we last connect with [company]?",
         "What's [company]'s contact timeline?",
         "Tell me about [company]'s recent contacts",
-        "When was [company] last touched base with?"
+        "When was [company] last touched base with?",
+        "Did we meet [company] recently?",
+        "Have we met with [company]?",
+        "Did we talk to [company] yesterday?",
+        "Has anyone met [company] yet?"
+    ],
+    "log_meeting": [
+        "Log a meeting with [contact]",
+        "Log meeting with [contact]",
+        "Record a meeting with [contact]",
+        "Add a meeting with [contact]",
+        "Note a meeting with [contact]",
+        "Log a call with [contact]",
+        "Record that we met [contact]",
+        "Update the last meeting for [contact]",
+        "Mark [contact] as met"
+    ],
+    "mark_closed_won": [
+        "Mark [opportunity] as Closed Won",
+        "Mark [opportunity] closed won",
+        "Set [opportunity] to Closed Won",
+        "Update [opportunity] to Closed Won",
+        "Close [opportunity] as won",
+        "Close the round [opportunity]",
+        "Record [opportunity] as won",
+        "Mark the round [opportunity] as won",
+        "Move [opportunity] to Closed Won",
+        "Mark deal [opportunity] won",
+        "Reopen [opportunity] as Closed Won"
     ]
 }
 
+# Intents that change data. They are only picked for questions worded as a
+# command, such as "Log a meeting with P0001", never for questions asking about a record.
+WRITE_INTENTS = ["log_meeting", "mark_closed_won"]
+
 def get_all_templates():
     """
     Get all intent templates flattened into a list.
@@ -109,17 +146,39 @@ def get_all_templates():
         all_templates.extend(templates)
     return all_templates
 
+def get_template_intents():
+    """
+    Get the intent of every template, aligned with get_all_templates().
+    
+    Returns:
+        list: Intent name per template
+    """
+    template_intents = []
+    for intent, templates in TEMPLATES.items():
+        template_intents.extend([intent] * len(templates))
+    return template_intents
+
+# Template text to intent, built on the first get_intent_for_template call
+_intent_by_template = None
+
 def get_intent_for_template(template):
     """
     Get the intent for a given template.
     
+    A dictionary built on the first call answers every lookup in constant
+    time; a template listed under several intents belongs to the first.
+    
     Args:
         template (str): Template string
         
     Returns:
         str: Intent name
     """
-    for intent, templates in TEMPLATES.items():
-        if template in templates:
-            return intent
-    return None 
\ No newline at end of file
+    global _intent_by_template
+    if _intent_by_template is None:
+        intent_by_template = {}
+        for intent, templates in TEMPLATES.items():
+            for text in templates:
+                intent_by_template.setdefault(text, intent)
+        _intent_by_template = intent_by_template
+    return _intent_by_template.get(template)
@@ -4,35 +4,256 @@ CRM Chat Assistant - Main Entry Point
 
 This script loads CRM data from CSV files and starts an interactive
 CLI interface for querying the data using natural language.
+
+Usage:
+    python main.py
+    python main.py --batch questions.jsonl --out answers.jsonl
+    python main.py --batch questions.jsonl --out answers.jsonl --workers 8
+    python main.py --serve --port 8765
+    python main.py --sqlite crm.db
+    python main.py --stream
+    python main.py --report portfolio.csv
+    python main.py --state
+    python main.py --watch
+    python main.py --enable-writes
+    python main.py --compact-journal
 """
 
 import sys
 import os
+import argparse
+import logging
+import time
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(__file__))
 
-from engine.data_loader import load_data
+from engine.data_loader import load_data, stream_data, STREAM_CHUNK_ROWS
+from engine.data_store import DataFrameStore
+from engine.journal import JOURNAL_PATH, Journal
+from engine.query_engine import portfolio_report
+from engine.metrics import METRICS, format_startup
+from engine.sqlite_store import SQLiteStore, import_csvs
+from engine.state_snapshot import STATE_PATH, prepare_state
+from llm_engine.encoders import ENCODERS
+from llm_engine.intent_parser import IntentParser
 from ui.chat_cli import ChatCLI
+from ui.query_pipeline import QueryPipeline
+from ui.batch_runner import run_batch, format_throughput
+from ui.server import serve
+from ui.report_runner import REPORT_FORMATS, write_report
+from ui.live_reload import LiveReloader
+
+def parse_args():
+    """
+    Parse command line arguments.
+    """
+    arg_parser = argparse.ArgumentParser(description="CRM Chat Assistant")
+    arg_parser.add_argument('--batch', metavar='IN_JSONL',
+                            help="Answer the questions in a JSONL file instead of starting the chat")
+    arg_parser.add_argument('--out', metavar='OUT_JSONL',
+                            help="Where --batch writes its JSONL results")
+    arg_parser.add_argument('--chunk-size', type=int, default=256,
+                            help="Questions encoded per batch in --batch mode")
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Worker processes for --batch, forked to share the loaded data (0 for one per CPU)")
+    arg_parser.add_argument('--serve', action='store_true',
+                            help="Serve questions over a local HTTP/JSON API instead of starting the chat")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="Interface for --serve")
+    arg_parser.add_argument('--port', type=int, default=8765, help="Port for --serve")
+    arg_parser.add_argument('--batch-window-ms', type=float, default=5,
+                            help="How long --serve waits to coalesce questions into one batch")
+    arg_parser.add_argument('--max-queue', type=int, default=1024,
+                            help="Questions --serve lets wait before answering 503")
+    arg_parser.add_argument('--report', metavar='OUT',
+                            help="Write status, latest funding and last contact for every company to OUT ('-' for stdout)")
+    arg_parser.add_argument('--report-format', choices=REPORT_FORMATS,
+                            help="Format for --report, inferred from the OUT extension by default (CSV)")
+    arg_parser.add_argument('--sqlite', metavar='DB_PATH',
+                            help="Query a SQLite store instead of in-memory tables, importing the CSVs if it is missing")
+    arg_parser.add_argument('--import-sqlite', action='store_true',
+                            help="Rebuild the --sqlite store from the CSV files before starting")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="Stream contacts and opportunities into per-company aggregates instead of loading them whole")
+    arg_parser.add_argument('--stream-chunk-rows', type=int, default=STREAM_CHUNK_ROWS,
+                            help="Rows parsed per chunk with --stream")
+    arg_parser.add_argument('--state', metavar='STATE_PATH', nargs='?', const=STATE_PATH,
+                            help="Restore tables, indexes and template embeddings from one memory-mapped snapshot, "
+                                 "building it first if it is missing or stale")
+    arg_parser.add_argument('--rebuild-state', action='store_true',
+                            help="Rebuild the --state snapshot even if it is current")
+    arg_parser.add_argument('--watch', metavar='SECONDS', type=float, nargs='?', const=2.0,
+                            help="Poll the CSV files every SECONDS (2 by default) and apply appended rows without a restart")
+    arg_parser.add_argument('--enable-writes', action='store_true',
+                            help="Let the chat log meetings and mark rounds Closed Won, recording them in --journal")
+    arg_parser.add_argument('--journal', metavar='JOURNAL_PATH', default=JOURNAL_PATH,
+                            help="Append-only journal that logged meetings and Closed Won rounds are recorded in")
+    arg_parser.add_argument('--compact-journal', action='store_true',
+                            help="Fold the journaled writes into the CSV files, empty the journal and exit")
+    arg_parser.add_argument('--encoder', choices=list(ENCODERS),
+                            help="Text encoder for intent matching; CRM_ENCODER or sentence-transformers by default")
+    arg_parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                            help="Logging level; DEBUG shows the matched template for every question")
+    arg_parser.add_argument('--no-metrics', action='store_true',
+                            help="Do not record per-stage timings")
+    args = arg_parser.parse_args()
+    if args.batch and args.serve:
+        arg_parser.error("--batch and --serve cannot be combined")
+    if args.batch and not args.out:
+        arg_parser.error("--batch requires --out")
+    if args.workers != 1 and not args.batch:
+        arg_parser.error("--workers requires --batch")
+    if args.workers < 0:
+        arg_parser.error("--workers must be 0 or more")
+    if args.import_sqlite and not args.sqlite:
+        arg_parser.error("--import-sqlite requires --sqlite")
+    if args.stream and args.sqlite:
+        arg_parser.error("--stream and --sqlite cannot be combined")
+    if args.rebuild_state and not args.state:
+        arg_parser.error("--rebuild-state requires --state")
+    if args.state and args.sqlite:
+        arg_parser.error("--state and --sqlite cannot be combined")
+    if args.watch is not None and (args.sqlite or args.batch or args.report):
+        arg_parser.error("--watch cannot be combined with --sqlite, --batch or --report")
+    if args.report and (args.batch or args.serve or args.sqlite):
+        arg_parser.error("--report cannot be combined with --batch, --serve or --sqlite")
+    if args.enable_writes and (args.batch or args.serve or args.report or args.sqlite or args.stream):
+        arg_parser.error("--enable-writes cannot be combined with --batch, --serve, --report, --sqlite or --stream")
+    if args.compact_journal and (args.batch or args.serve or args.report):
+        arg_parser.error("--compact-journal cannot be combined with --batch, --serve or --report")
+    return args
+
+def run_report(args):
+    """
+    Write the whole-portfolio report. No intent model is needed, so none is loaded.
+    
+    Journaled writes are replayed onto the loaded tables first; with
+    --stream there are no tables to replay them onto, so they are reported
+    as left out. Progress goes to stderr so the report can be streamed to stdout.
+    """
+    print("📊 Loading data from CSV files...", file=sys.stderr)
+    journal = Journal(args.journal)
+    if args.stream:
+        companies_df, crm_index = stream_data(args.stream_chunk_rows)
+        if journal.pending:
+            print(f"⚠️  {journal.pending} journaled writes are not in the report with --stream; "
+                  f"run with --compact-journal to fold them into the CSV files", file=sys.stderr)
+        report = portfolio_report(companies_df, crm_index=crm_index)
+    else:
+        companies_df, contacts_df, opportunities_df = load_data(skip_unused=True)
+        if journal.pending:
+            store = DataFrameStore(companies_df, contacts_df, opportunities_df)
+            journal.replay(store)
+            companies_df, contacts_df, opportunities_df = store.companies_df, store.contacts_df, store.opportunities_df
+            print(f"📝 Replayed {journal.pending} journaled writes", file=sys.stderr)
+        report = portfolio_report(companies_df, contacts_df, opportunities_df)
+    rows = write_report(report, args.report, args.report_format)
+    print(f"💾 Wrote {rows} companies to {args.report}", file=sys.stderr)
 
 def main():
     """
     Main function that loads data and starts the CLI interface.
     """
+    started_at = time.perf_counter()
+    args = parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    METRICS.enabled = not args.no_metrics
+    
+    if args.compact_journal:
+        journal = Journal(args.journal)
+        pending = journal.pending
+        rewritten = journal.compact()
+        print(f"🗜️  Compacted {pending} journaled writes into {len(rewritten)} CSV files")
+        return
+    
+    if args.report:
+        try:
+            run_report(args)
+        except FileNotFoundError as e:
+            print("❌ Error: Could not find data files. Make sure the CSV files are in the 'data' directory.",
+                  file=sys.stderr)
+            print(f"   Details: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
     print("🚀 Starting CRM Chat Assistant...")
     print("📊 Loading data from CSV files...")
     
     try:
-        # Load the data
-        companies_df, contacts_df, opportunities_df = load_data()
+        # Load the model on a background thread while the CSVs are parsed
+        parser = IntentParser(encoder=args.encoder)
+        parser.load_in_background()
+        
+        # Load the data; with --enable-writes, the journaled writes are replayed onto it
+        journal = Journal(args.journal)
+        writes_journal = journal if args.enable_writes else None
+        data_start = time.perf_counter()
+        if args.sqlite:
+            if args.import_sqlite or not os.path.exists(args.sqlite):
+                print(f"🗄️  Importing CSV files into {args.sqlite}...")
+                import_csvs(args.sqlite)
+            store = SQLiteStore(args.sqlite)
+            if store.is_stale():
+                print(f"⚠️  The CSV files changed since {args.sqlite} was built; run with --import-sqlite to refresh it")
+            pipeline = QueryPipeline(None, None, None, parser, store=store)
+        elif args.state:
+            state, restored = prepare_state(args.state, parser, stream=args.stream, chunk_rows=args.stream_chunk_rows,
+                                            rebuild=args.rebuild_state)
+            print(f"⚡ Restored serving state from {args.state}" if restored else f"💾 Saved serving state to {args.state}")
+            store = DataFrameStore(state.companies_df, state.contacts_df, state.opportunities_df,
+                                   state.name_index, state.crm_index)
+            pipeline = QueryPipeline(state.companies_df, state.contacts_df, state.opportunities_df, parser, store=store,
+                                     journal=writes_journal)
+        elif args.stream:
+            companies_df, crm_index = stream_data(args.stream_chunk_rows)
+            store = DataFrameStore(companies_df, None, None, crm_index=crm_index)
+            pipeline = QueryPipeline(companies_df, None, None, parser, store=store)
+        else:
+            companies_df, contacts_df, opportunities_df = load_data(skip_unused=True)
+            pipeline = QueryPipeline(companies_df, contacts_df, opportunities_df, parser, journal=writes_journal)
+        data_seconds = time.perf_counter() - data_start
+        # Created straight after loading: rows already in the files count as loaded
+        reloader = LiveReloader(pipeline, args.watch, stream=args.stream) if args.watch is not None else None
         
-        print(f"✅ Loaded {len(companies_df)} companies")
-        print(f"✅ Loaded {len(contacts_df)} contacts")
-        print(f"✅ Loaded {len(opportunities_df)} opportunities")
+        if pipeline.journal is None and journal.pending:
+            print(f"⚠️  {journal.pending} journaled writes are only shown with --enable-writes; "
+                  f"run with --compact-journal to fold them into the CSV files")
+        elif journal.pending:
+            print(f"📝 Replayed {journal.pending} journaled writes")
+        if pipeline.journal is not None:
+            print(f"✍️  Writes enabled, journaled to {args.journal}")
+        
+        sizes = pipeline.store.table_sizes()
+        print(f"✅ Loaded {sizes['companies']} companies")
+        print(f"✅ Loaded {sizes['contacts']} contacts")
+        print(f"✅ Loaded {sizes['opportunities']} opportunities")
         print("🎯 Initializing intent parser...")
+        model_start = time.perf_counter()
+        parser.load()
+        model_wait_seconds = time.perf_counter() - model_start
+        # Pay for the first encode and fuzzy match now rather than on the first question
+        pipeline.warm_up()
+        pipeline.mark_ready(started_at, data_s=data_seconds, model_wait_s=model_wait_seconds)
+        print(f"✅ Startup: {format_startup(pipeline.startup)}")
+        if reloader is not None:
+            reloader.start()
+            print(f"👀 Watching the CSV files for appended rows every {args.watch:g}s")
+        
+        if args.batch:
+            print(f"📥 Answering questions from {args.batch}...")
+            stats = run_batch(pipeline, args.batch, args.out, args.chunk_size,
+                              workers=args.workers or os.cpu_count() or 1)
+            print(format_throughput(stats))
+            print(f"💾 Results written to {args.out}")
+            return
+        
+        if args.serve:
+            serve(pipeline, args.host, args.port,
+                  batch_window_ms=args.batch_window_ms, max_queue=args.max_queue)
+            return
         
         # Create and run the CLI interface
-        cli = ChatCLI(companies_df, contacts_df, opportunities_df)
+        cli = ChatCLI(pipeline.companies_df, pipeline.contacts_df, pipeline.opportunities_df, parser, pipeline)
         cli.run()
         
     except FileNotFoundError as e:
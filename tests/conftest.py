@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.data_loader import load_data
+
+
+@pytest.fixture(scope="session")
+def crm_tables():
+    """
+    The companies, contacts and opportunities tables in data/, loaded once.
+
+    Tests that change data take copies, so every test sees the CSV contents.
+    """
+    return load_data(skip_unused=True, use_cache=False)
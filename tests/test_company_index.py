@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from engine.company_index import CompanyNameIndex, normalize_name
+from engine.query_engine import get_best_company_match
+
+
+def perturb(name, rng):
+    """
+    Misspell a name the way users do: drop or swap a character, or cut the end off.
+    """
+    i = rng.randrange(len(name))
+    edit = rng.randrange(3)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+    return name[:max(3, len(name) - rng.randrange(1, 4))]
+
+
+@pytest.fixture(scope="module")
+def companies_df(crm_tables):
+    return crm_tables[0]
+
+
+@pytest.fixture(scope="module")
+def name_index(companies_df):
+    return CompanyNameIndex(companies_df)
+
+
+def test_hyphenated_name(name_index):
+    assert name_index.match("Jones-Danie").name == "Jones-Daniels"
+
+
+def test_matches_full_scan_on_misspelled_names(companies_df, name_index):
+    rng = random.Random(0)
+    names = companies_df['Name'].tolist()
+    exact = set(name_index.normalized)
+    mismatches = []
+    for k in range(4000):
+        query = perturb(names[k % len(names)], rng)
+        if normalize_name(query) in exact:
+            # Resolved by the exact lookup, which ignores case and punctuation unlike the full scan
+            continue
+        match = name_index.match(query)
+        expected = get_best_company_match(query, companies_df)
+        if (match.name if match else None) != expected:
+            mismatches.append((query, expected, match))
+    assert mismatches == []
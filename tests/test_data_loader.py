@@ -0,0 +1,47 @@
+import os
+import shutil
+
+from engine.data_loader import TABLE_FILES, load_data, stream_data, table_paths
+
+
+def _snapshots(snapshot_dir):
+    return {name: os.stat(os.path.join(snapshot_dir, name)).st_mtime_ns for name in os.listdir(snapshot_dir)}
+
+
+def test_snapshot_round_trip(crm_tables, tmp_path):
+    snapshot_dir = str(tmp_path / 'snapshots')
+    load_data(use_cache=True, snapshot_dir=snapshot_dir, skip_unused=True)
+    for cached, parsed in zip(load_data(use_cache=True, snapshot_dir=snapshot_dir, skip_unused=True), crm_tables):
+        assert cached.equals(parsed)
+
+
+def test_load_options_keep_separate_snapshots(tmp_path):
+    snapshot_dir = str(tmp_path / 'snapshots')
+    load_data(use_cache=True, snapshot_dir=snapshot_dir)
+    stream_data(use_cache=True, snapshot_dir=snapshot_dir)
+    written = _snapshots(snapshot_dir)
+    # Two companies snapshots, one per set of options
+    assert sum(name.startswith('companies.') for name in written) == 2
+
+    companies_df, _, _ = load_data(use_cache=True, snapshot_dir=snapshot_dir)
+    streamed_df, _ = stream_data(use_cache=True, snapshot_dir=snapshot_dir)
+    assert _snapshots(snapshot_dir) == written
+    assert companies_df.equals(load_data(use_cache=False)[0])
+    assert streamed_df.equals(load_data(use_cache=False, skip_unused=True)[0])
+
+
+def test_snapshot_rebuilt_when_source_changes(tmp_path):
+    snapshot_dir = str(tmp_path / 'snapshots')
+    paths = {}
+    for table, path in table_paths().items():
+        paths[table] = str(tmp_path / TABLE_FILES[table])
+        shutil.copy(path, paths[table])
+    companies_df, _, _ = load_data(use_cache=True, snapshot_dir=snapshot_dir, paths=paths)
+
+    with open(paths['companies']) as f:
+        lines = f.readlines()
+    with open(paths['companies'], 'w') as f:
+        f.writelines(lines[:-1])
+    reloaded_df, _, _ = load_data(use_cache=True, snapshot_dir=snapshot_dir, paths=paths)
+    assert len(reloaded_df) == len(companies_df) - 1
+    assert len(load_data(use_cache=True, snapshot_dir=snapshot_dir, paths=paths)[0]) == len(companies_df) - 1
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from engine.data_store import DataFrameStore
+
+
+def test_appended_row_repeating_an_id_is_the_record(crm_tables):
+    companies_df, contacts_df, opportunities_df = (df.copy() for df in crm_tables)
+    store = DataFrameStore(companies_df, contacts_df, opportunities_df)
+    contact_id = contacts_df['Contact_ID'].iat[0]
+    contacts = len(contacts_df)
+    newer = contacts_df.iloc[[0]].assign(Role='Advisor')
+    store.append(contacts_df=newer)
+
+    assert len(store.contacts_df) == contacts + 1
+    # The earlier row is kept as it was
+    assert store.contacts_df['Role'].iat[0] == crm_tables[1]['Role'].iat[0]
+    assert store.get_contact(contact_id)['Role'] == 'Advisor'
+
+    meeting = pd.Timestamp('2030-01-01')
+    assert store.log_meeting(contact_id, meeting)['Role'] == 'Advisor'
+    assert store.contacts_df['Last_Meeting'].iat[-1] == meeting
+    assert store.contacts_df['Last_Meeting'].iat[0] != meeting
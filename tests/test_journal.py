@@ -0,0 +1,56 @@
+import shutil
+import threading
+
+import pandas as pd
+import pytest
+
+from engine import journal as journal_module
+from engine.data_loader import TABLE_FILES, table_paths
+from engine.journal import Journal
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """
+    Copies of the CSV files in data/, for compaction to rewrite.
+    """
+    copies = {}
+    for table, path in table_paths().items():
+        copies[table] = str(tmp_path / TABLE_FILES[table])
+        shutil.copy(path, copies[table])
+    return copies
+
+
+def _meeting(contact_id, company_id, date):
+    return {"op": "log_meeting", "contact_id": contact_id, "company_id": company_id, "date": date}
+
+
+@pytest.mark.skipif(journal_module.fcntl is None, reason="needs advisory file locks")
+def test_append_during_compaction_is_kept(paths, tmp_path, monkeypatch):
+    path = str(tmp_path / 'journal.jsonl')
+    contacts = pd.read_csv(paths['contacts'], nrows=2)
+    first, second = contacts.to_dict('records')
+    compacting = Journal(path, paths)
+    compacting.append(_meeting(first['Contact_ID'], first['Company_ID'], '2030-01-01'))
+
+    # Another writer appends while the CSV files are being rewritten
+    appended = threading.Event()
+    writer = threading.Thread(target=lambda: (
+        Journal(path, paths).append(_meeting(second['Contact_ID'], second['Company_ID'], '2030-01-02')),
+        appended.set()))
+    rewrite_shard = journal_module._rewrite_shard
+
+    def slow_rewrite(*args):
+        if not writer.is_alive():
+            writer.start()
+            assert not appended.wait(0.2), "append did not wait for compaction"
+        return rewrite_shard(*args)
+
+    monkeypatch.setattr(journal_module, '_rewrite_shard', slow_rewrite)
+    compacting.compact()
+    writer.join(5)
+
+    assert appended.is_set()
+    assert [entry['contact_id'] for entry in Journal(path, paths).entries()] == [second['Contact_ID']]
+    rewritten = pd.read_csv(paths['contacts'], dtype=str)
+    assert rewritten.loc[rewritten['Contact_ID'] == first['Contact_ID'], 'Last_Meeting'].item() == '2030-01-01'
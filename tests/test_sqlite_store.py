@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from engine.data_store import DataFrameStore
+from engine.sqlite_store import SQLiteStore, import_csvs
+from test_company_index import perturb
+
+
+@pytest.fixture(scope="module")
+def stores(crm_tables, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("sqlite") / "crm.db")
+    import_csvs(path)
+    return DataFrameStore(*crm_tables), SQLiteStore(path)
+
+
+def _name(company):
+    return company['Name'] if company is not None else None
+
+
+def test_hyphenated_name(stores):
+    _, sqlite_store = stores
+    assert _name(sqlite_store.find_company("Jones-Danie")) == "Jones-Daniels"
+
+
+def test_matches_dataframe_store_on_misspelled_hyphenated_names(stores, crm_tables):
+    dataframe_store, sqlite_store = stores
+    rng = random.Random(0)
+    names = [name for name in crm_tables[0]['Name'] if '-' in name]
+    mismatches = []
+    for name in names:
+        query = perturb(name, rng)
+        expected = _name(dataframe_store.find_company(query))
+        if _name(sqlite_store.find_company(query)) != expected:
+            mismatches.append((query, expected))
+    assert mismatches == []
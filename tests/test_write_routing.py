@@ -0,0 +1,72 @@
+import pytest
+
+from engine.journal import Journal
+from llm_engine.intent_parser import IntentParser
+from ui.chat_cli import ChatCLI
+from ui.query_pipeline import QueryPipeline, WRITE_INTENTS
+
+# Commands that name a record but must never write to it
+NOT_WRITES = [
+    "Close O0009 as lost",
+    "Record O0008 as lost",
+    "Mark O0009 as not won",
+    "Please mark O0009 as lost on 2025-01-01",
+    "Mark O0009 as Lost",
+    "Reopen O0009 as lost",
+    "Mark P0002 as inactive",
+    "Log a meeting with O0009",
+    "Mark O0009 as won with P0002",
+    "Was O0002 won?",
+    "Did we meet P0003 today?",
+]
+
+WRITES = [
+    ("Mark O0002 as Closed Won", "mark_closed_won"),
+    ("Close O0002 as won", "mark_closed_won"),
+    ("Reopen O0001 from Lost as Closed Won", "mark_closed_won"),
+    ("Log a meeting with P0003 yesterday", "log_meeting"),
+    ("Can you log a call with P0003?", "log_meeting"),
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return IntentParser(encoder='hashing', use_cache=False)
+
+
+@pytest.fixture
+def pipeline(crm_tables, parser, tmp_path):
+    companies_df, contacts_df, opportunities_df = (df.copy() for df in crm_tables)
+    return QueryPipeline(companies_df, contacts_df, opportunities_df, parser,
+                         journal=Journal(str(tmp_path / 'journal.jsonl')))
+
+
+@pytest.mark.parametrize("question", NOT_WRITES)
+def test_not_routed_to_a_write(parser, question):
+    assert not parser.write_intents_for(question)
+    assert parser.parse_intent(question)["intent"] not in WRITE_INTENTS
+    assert parser.parse_intents([question])[0]["intent"] not in WRITE_INTENTS
+
+
+@pytest.mark.parametrize("question", NOT_WRITES)
+def test_not_journaled(pipeline, question):
+    cli = ChatCLI(pipeline.companies_df, pipeline.contacts_df, pipeline.opportunities_df, pipeline.parser, pipeline)
+    cli.process_query(question)
+    assert pipeline.journal.entries() == []
+
+
+def test_command_journaled(pipeline):
+    cli = ChatCLI(pipeline.companies_df, pipeline.contacts_df, pipeline.opportunities_df, pipeline.parser, pipeline)
+    cli.process_query("Mark O0002 as Closed Won")
+    assert [(entry["op"], entry["opp_id"]) for entry in pipeline.journal.entries()] == [("close_won", "O0002")]
+
+
+@pytest.mark.parametrize("question, intent", WRITES)
+def test_commands_routed_to_their_write(parser, question, intent):
+    assert parser.write_intents_for(question) == {intent}
+    assert parser.parse_intent(question)["intent"] == intent
+
+
+@pytest.mark.parametrize("question, intent", WRITES)
+def test_lexical_stage_never_picks_a_write(parser, question, intent):
+    assert parser._match_lexical(question, excluded=frozenset()) is None
@@ -0,0 +1,258 @@
+import sys
+import os
+import gc
+import json
+import time
+import logging
+import multiprocessing
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from ui.query_pipeline import INTENTS, WRITE_INTENTS
+
+# Fields checked, in order, for the question text and ID of each input line
+QUESTION_FIELDS = ("query", "question", "text", "title")
+ID_FIELDS = ("id", "request_id")
+
+STAGES = ("parse", "resolve", "query", "write")
+
+logger = logging.getLogger(__name__)
+
+# Pipeline the pool workers answer with. Set before the workers are forked,
+# so they inherit the loaded tables, indexes and model instead of unpickling them.
+_worker_pipeline = None
+
+def read_questions(lines):
+    """
+    Read questions from JSON lines.
+
+    Each line is either a JSON string or an object with one of
+    QUESTION_FIELDS, optionally with one of ID_FIELDS.
+
+    Args:
+        lines (iterable): Lines of a JSONL file
+
+    Yields:
+        tuple: (question_id, question)
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            yield line_number, record
+            continue
+        question = next((record[field] for field in QUESTION_FIELDS if record.get(field)), None)
+        if question is None:
+            raise ValueError(f"Line {line_number} has none of the fields {', '.join(QUESTION_FIELDS)}")
+        question_id = next((record[field] for field in ID_FIELDS if field in record), line_number)
+        yield question_id, question
+
+def to_json_value(value):
+    """
+    Convert numpy and pandas scalars for json.dumps.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def answer_batch(pipeline, questions, timings=None):
+    """
+    Answer a batch of questions with structured results.
+
+    Args:
+        pipeline (QueryPipeline): Loaded query pipeline
+        questions (list): Question texts
+        timings (dict): Stage name to seconds, updated in place if given
+
+    Returns:
+        list: One record per question with the parse, the resolved company,
+            a status and the query result dictionary. Write intents are not
+            applied; their status is read_only.
+    """
+    timings = timings if timings is not None else dict.fromkeys(STAGES, 0.0)
+
+    start = time.perf_counter()
+    parsed_batch = pipeline.parse_many(questions)
+    timings["parse"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = [
+        pipeline.resolve_company(parsed["company"]) if parsed["intent"] in INTENTS and parsed["company"] else None
+        for parsed in parsed_batch
+    ]
+    timings["resolve"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = []
+    for question, parsed, company in zip(questions, parsed_batch, resolved):
+        result = None
+        if not parsed["intent"]:
+            status = "intent_not_recognized"
+        elif parsed["intent"] in WRITE_INTENTS:
+            status = "read_only"
+        elif not parsed["company"]:
+            status = "company_missing"
+        else:
+            result = pipeline.execute(parsed["intent"], company or parsed["company"])
+            status = "not_found" if "error" in result else "ok"
+        records.append({
+            "query": question,
+            "intent": parsed["intent"],
+            "company": parsed["company"],
+            "resolved_company": company,
+            "confidence": float(parsed["confidence"]),
+            "matched_template": parsed["matched_template"],
+            "status": status,
+            "result": result
+        })
+    timings["query"] += time.perf_counter() - start
+    return records
+
+def answer_lines(pipeline, chunk, timings):
+    """
+    Answer a chunk of questions as JSONL output lines.
+
+    Args:
+        pipeline (QueryPipeline): Loaded query pipeline
+        chunk (list): (question_id, question) tuples
+        timings (dict): Stage name to seconds, updated in place
+
+    Returns:
+        str: One JSON line per question
+    """
+    records = answer_batch(pipeline, [question for _, question in chunk], timings)
+    start = time.perf_counter()
+    lines = "".join(json.dumps({"id": question_id, **record}, default=to_json_value) + "\n"
+                    for (question_id, _), record in zip(chunk, records))
+    timings["write"] += time.perf_counter() - start
+    return lines
+
+def _init_worker():
+    # Connections such as SQLite's cannot be shared with the parent process
+    reopen = getattr(_worker_pipeline.store, "reopen", None)
+    if reopen is not None:
+        reopen()
+    # One thread per worker process: the pool supplies the parallelism,
+    # and the model's own thread pool would oversubscribe the cores
+    reopen_encoder = getattr(getattr(_worker_pipeline.parser, "encoder", None), "reopen", None)
+    if reopen_encoder is not None:
+        reopen_encoder(threads=1)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(1)
+
+def _answer_chunk(chunk):
+    timings = dict.fromkeys(STAGES, 0.0)
+    return answer_lines(_worker_pipeline, chunk, timings), timings
+
+def can_fork():
+    """
+    Whether worker processes can be forked on this platform.
+    """
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def _answer_in_pool(pipeline, chunks, workers):
+    """
+    Answer chunks of questions on forked worker processes, yielding results in input order.
+
+    The workers share the loaded pipeline with this process copy-on-write.
+    The garbage collector is frozen first so the workers' collections do
+    not write to, and so copy, the pages holding the inherited objects.
+    At most two chunks per worker are in flight, so a large input file is
+    not read into memory ahead of the workers.
+
+    Yields:
+        tuple: (JSONL output lines, stage timings) per chunk
+    """
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+    gc.collect()
+    gc.freeze()
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers, initializer=_init_worker) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_answer_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+    finally:
+        gc.unfreeze()
+        _worker_pipeline = None
+
+def run_batch(pipeline, in_path, out_path, chunk_size=256, workers=1):
+    """
+    Stream questions from a JSONL file through the pipeline in chunks.
+
+    With several workers, chunks are answered on a pool of forked processes
+    sharing the loaded data, and written in input order. Writes are never
+    applied in batch mode, so the workers only read the shared data.
+
+    Args:
+        pipeline (QueryPipeline): Loaded query pipeline
+        in_path (str): Input JSONL path
+        out_path (str): Output JSONL path, '-' for stdout
+        chunk_size (int): Questions parsed per batched encode
+        workers (int): Worker processes; 1 answers in this process
+
+    Returns:
+        dict: Question count, worker count, wall seconds and seconds spent
+            per stage, summed over the workers
+    """
+    if workers > 1 and not can_fork():
+        logger.warning("Worker processes need fork, which this platform lacks; answering in one process")
+        workers = 1
+    timings = dict.fromkeys(STAGES, 0.0)
+    count = 0
+    started_at = time.perf_counter()
+
+    out_context = nullcontext(sys.stdout) if out_path == '-' else open(out_path, 'w')
+    with open(in_path) as fin, out_context as fout:
+        questions = read_questions(fin)
+        chunks = iter(lambda: list(islice(questions, chunk_size)), [])
+        if workers > 1:
+            results = _answer_in_pool(pipeline, chunks, workers)
+        else:
+            results = ((answer_lines(pipeline, chunk, timings), None) for chunk in chunks)
+        for lines, chunk_timings in results:
+            start = time.perf_counter()
+            fout.write(lines)
+            timings["write"] += time.perf_counter() - start
+            for stage, seconds in (chunk_timings or {}).items():
+                timings[stage] += seconds
+            count += lines.count("\n")
+
+    return {"questions": count, "workers": workers, "wall_s": time.perf_counter() - started_at, "stages": timings}
+
+def format_throughput(stats):
+    """
+    Format a per-stage throughput report for run_batch stats.
+
+    Args:
+        stats (dict): Stats returned by run_batch
+
+    Returns:
+        str: Report text
+    """
+    count = stats["questions"]
+    wall = stats["wall_s"]
+    rate = count / wall if wall > 0 else float('inf')
+    lines = [f"📈 Processed {count} questions in {wall:.2f}s ({rate:.1f} q/s) with {stats['workers']} worker(s)"]
+    if stats["workers"] > 1:
+        lines.append("   Stage times are summed over the workers")
+    for stage, seconds in stats["stages"].items():
+        rate = count / seconds if seconds > 0 else float('inf')
+        lines.append(f"   {stage:<8} {seconds:8.3f}s  {rate:10.1f} q/s")
+    return "\n".join(lines)
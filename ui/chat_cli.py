@@ -1,12 +1,13 @@
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from llm_engine.intent_parser import IntentParser
-from engine.query_engine import check_status, last_funding_event, last_contact
+from ui.query_pipeline import QueryPipeline, INTENTS, WRITE_INTENTS
+from engine.metrics import timed, format_stats
 
 class ChatCLI:
-    def __init__(self, companies_df, contacts_df, opportunities_df):
+    def __init__(self, companies_df, contacts_df, opportunities_df, parser=None, pipeline=None):
         """
         Initialize the CLI interface with data and intent parser.
         
@@ -14,11 +15,16 @@ class ChatCLI:
             companies_df (pd.DataFrame): Companies data
             contacts_df (pd.DataFrame): Contacts data
             opportunities_df (pd.DataFrame): Opportunities data
+            parser (IntentParser): Intent parser to use, a new one is created if None
+            pipeline (QueryPipeline): Pipeline to answer with, built from the data if None
         """
         self.companies_df = companies_df
         self.contacts_df = contacts_df
         self.opportunities_df = opportunities_df
-        self.parser = IntentParser()
+        if pipeline is None:
+            pipeline = QueryPipeline(companies_df, contacts_df, opportunities_df, parser)
+        self.pipeline = pipeline
+        self.parser = self.pipeline.parser
     
     def format_status_response(self, result):
         """
@@ -100,6 +106,84 @@ class ChatCLI:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
     
+    def format_meeting_response(self, result):
+        """
+        Format logged meeting response for display.
+        
+        Args:
+            result (dict): Logged meeting result
+            
+        Returns:
+            str: Formatted response
+        """
+        if "error" in result:
+            return f"❌ {result['error']}"
+        
+        return f"""
+📝 **Meeting Logged**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+👤 **Contact**: {result['contact_name']} ({result['contact_id']})
+🎯 **Contact Role**: {result['contact_role']}
+🏢 **Company**: {result['company_name']}
+📅 **Meeting Date**: {result['meeting_date']}
+📅 **Last Meeting**: {result['last_meeting']}
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+    
+    def format_closed_won_response(self, result):
+        """
+        Format Closed Won response for display.
+        
+        Args:
+            result (dict): Closed Won result
+            
+        Returns:
+            str: Formatted response
+        """
+        if "error" in result:
+            return f"❌ {result['error']}"
+        
+        return f"""
+🎉 **Opportunity Closed Won**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+🆔 **Opportunity**: {result['opp_id']}
+🏢 **Company**: {result['company_name']}
+📊 **Funding Type**: {result['funding_type']}
+💵 **Amount**: ${result['amount']:,}
+📅 **Date Closed**: {result['date_closed']}
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+    
+    def process_write(self, parsed):
+        """
+        Apply a write intent and return a formatted response.
+        
+        Args:
+            parsed (dict): Parsed question with a write intent
+            
+        Returns:
+            str: Formatted response
+        """
+        if not parsed["record_id"]:
+            example = ('"Log a meeting with P0001 on 2025-07-01"' if parsed["intent"] == "log_meeting"
+                       else '"Mark O0001 as Closed Won"')
+            return f"""
+❓ **Record ID Missing**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+I understood you want to: {parsed['intent']}
+But I couldn't find the contact or opportunity ID to update.
+
+Please include the ID in your request.
+Example: {example}
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+        
+        result = self.pipeline.write(parsed["intent"], parsed["record_id"], parsed["date"], parsed["reopen"])
+        with timed("format"):
+            if parsed["intent"] == "log_meeting":
+                return self.format_meeting_response(result)
+            return self.format_closed_won_response(result)
+    
     def process_query(self, user_input):
         """
         Process user query and return formatted response.
@@ -111,7 +195,7 @@ class ChatCLI:
             str: Formatted response
         """
         # Parse intent
-        parsed = self.parser.parse_intent(user_input)
+        parsed = self.pipeline.parse(user_input)
         
         if not parsed["intent"]:
             return f"""
@@ -124,9 +208,14 @@ Try asking about:
 • Company status: "What is the status of [Company Name]?"
 • Funding events: "When did [Company Name] last raise funding?"
 • Contact history: "When was [Company Name] last contacted?"
+• Logging a meeting: "Log a meeting with [Contact ID]"
+• Closing a round: "Mark [Opportunity ID] as Closed Won"
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
         
+        if parsed["intent"] in WRITE_INTENTS:
+            return self.process_write(parsed)
+        
         if not parsed["company"]:
             return f"""
 ❓ **Company Name Missing**
@@ -139,33 +228,33 @@ Example: "What is the status of Bowman-Campbell?"
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
         
-        # Route to appropriate query function
-        if parsed["intent"] == "check_status":
-            result = check_status(self.companies_df, parsed["company"])
-            if "error" in result:
-                # Show some sample companies to help the user
-                sample_companies = self.companies_df['Name'].head(10).tolist()
-                return f"{result['error']}\n\n📋 **Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies])
-            return self.format_status_response(result)
-        
-        elif parsed["intent"] == "last_funding":
-            result = last_funding_event(self.opportunities_df, self.companies_df, parsed["company"])
-            if "error" in result:
-                # Show some sample companies to help the user
-                sample_companies = self.companies_df['Name'].head(10).tolist()
-                return f"{result['error']}\n\n📋 **Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies])
-            return self.format_funding_response(result)
-        
-        elif parsed["intent"] == "last_contact":
-            result = last_contact(self.contacts_df, parsed["company"], self.companies_df)
-            if "error" in result:
-                # Show some sample companies to help the user
-                sample_companies = self.companies_df['Name'].head(10).tolist()
-                return f"{result['error']}\n\n📋 **Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies])
-            return self.format_contact_response(result)
-        
-        else:
+        if parsed["intent"] not in INTENTS:
             return f"❌ Unknown intent: {parsed['intent']}"
+        
+        # Route to appropriate query function
+        result = self.pipeline.execute(parsed["intent"], parsed["company"])
+        if "error" in result:
+            # Show some sample companies to help the user
+            sample_companies = self.pipeline.sample_companies()
+            return f"{result['error']}\n\n📋 **Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies])
+        
+        with timed("format"):
+            if parsed["intent"] == "check_status":
+                return self.format_status_response(result)
+            elif parsed["intent"] == "last_funding":
+                return self.format_funding_response(result)
+            else:
+                return self.format_contact_response(result)
+    
+    def format_stats_response(self):
+        """
+        Format stage latencies, counters and cache statistics for display.
+        
+        Returns:
+            str: Formatted response
+        """
+        stats = self.pipeline.stats()
+        return format_stats(stats, stats["cache"], stats["startup"])
     
     def run(self):
         """
@@ -180,8 +269,10 @@ Example questions:
 • "What is the status of Bowman-Campbell?"
 • "When did King and Sons last raise funding?"
 • "When was Spears LLC last contacted?"
+• "Log a meeting with P0001 yesterday"
+• "Mark O0002 as Closed Won on 2025-07-01"
 
-Type 'quit' or 'exit' to leave.
+Type ':stats' for per-stage timings, 'quit' or 'exit' to leave.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """)
         
@@ -196,8 +287,14 @@ Type 'quit' or 'exit' to leave.
                 if not user_input:
                     continue
                 
+                if user_input == ':stats':
+                    print(f"\n{self.format_stats_response()}")
+                    continue
+                
                 # Process the query
+                start = time.perf_counter()
                 response = self.process_query(user_input)
+                self.pipeline.record_first_query(time.perf_counter() - start)
                 print(f"\n{response}")
                 
             except KeyboardInterrupt:
@@ -0,0 +1,120 @@
+import sys
+import os
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from engine.data_loader import STREAM_COLUMNS, load_data, stream_data
+from engine.data_store import DataFrameStore
+from engine.data_watcher import DataWatcher
+from engine.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+class LiveReloader:
+    def __init__(self, pipeline, interval=2.0, paths=None, stream=False):
+        """
+        Poll the CRM CSV files and apply appended rows to a running pipeline.
+
+        Rows appended to the files are parsed on their own and added to the
+        loaded frames and lookups with QueryPipeline.append_data, which
+        bumps the data version so cached answers are dropped. When a file
+        was rewritten instead of appended to, the data is loaded again in
+        full. Create the reloader right after the pipeline's data is loaded:
+        the files' current ends are taken as already loaded. Files the
+        pipeline's journal compaction rewrites are not reloaded, since the
+        pipeline already holds the compacted writes.
+
+        Args:
+            pipeline (QueryPipeline): Pipeline serving the loaded data
+            interval (float): Seconds between polls
+            paths (dict): Table name to CSV path, directory or glob, overriding the files in data/
+            stream (bool): The pipeline was loaded with stream_data and holds no contacts
+                or opportunities frames
+        """
+        self.pipeline = pipeline
+        self.interval = interval
+        self.paths = paths
+        self.stream = stream
+        self.watcher = DataWatcher(paths, columns=STREAM_COLUMNS if stream else None)
+        # Guards the watcher's file positions against a compaction on another thread
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        pipeline.compaction_listeners.append(self.compacted)
+
+    def poll(self):
+        """
+        Apply whatever was appended since the last poll.
+
+        Returns:
+            dict: Table name to rows appended, or None after a full reload
+        """
+        with self._lock:
+            appended = self.watcher.poll()
+        if appended is None:
+            self.reload()
+            return None
+        if appended:
+            self.pipeline.append_data(appended.get('companies'), appended.get('contacts'),
+                                      appended.get('opportunities'))
+            for table, rows in appended.items():
+                METRICS.increment(f"reload.{table}_rows", len(rows))
+            logger.info("🔄 Appended %s", ", ".join(f"{len(rows)} {table}" for table, rows in appended.items()))
+        return {table: len(rows) for table, rows in appended.items()}
+
+    def reload(self):
+        """
+        Load every table again and swap it into the pipeline.
+        """
+        logger.info("🔄 The CSV files were rewritten, reloading them in full...")
+        if self.stream:
+            companies_df, crm_index = stream_data(paths=self.paths)
+            self.pipeline.update_data(companies_df, None, None,
+                                      store=DataFrameStore(companies_df, None, None, crm_index=crm_index))
+        else:
+            self.pipeline.update_data(*load_data(skip_unused=True, paths=self.paths))
+        with self._lock:
+            self.watcher.mark()
+        METRICS.increment("reload.full")
+
+    def compacted(self, rewritten):
+        """
+        Compaction listener: keep watching the rewritten files without a reload.
+
+        Args:
+            rewritten (dict): Rewritten CSV path to its size before the rewrite
+        """
+        with self._lock:
+            accepted = self.watcher.accept_rewrite(rewritten)
+        if not accepted:
+            # Rows appended before the rewrite were never polled
+            self.reload()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # A file caught mid-rewrite parses badly; the next poll sees it settled
+                logger.warning("⚠️  Live reload failed: %s", e)
+
+    def start(self):
+        """
+        Start polling on a background thread.
+
+        Returns:
+            threading.Thread: The polling thread
+        """
+        self._thread = threading.Thread(target=self._run, name="crm-live-reload", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """
+        Stop polling and wait for a poll in progress to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
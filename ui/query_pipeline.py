@@ -0,0 +1,303 @@
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from llm_engine.intent_parser import IntentParser
+from llm_engine.template_mapper import WRITE_INTENTS
+from engine.query_engine import check_status, last_funding_event, last_contact
+from engine.write_engine import log_meeting, mark_closed_won
+from engine.data_store import DataFrameStore
+from engine.query_cache import QueryCache, normalize_query
+from engine.metrics import METRICS
+
+INTENTS = ["check_status", "last_funding", "last_contact"]
+
+class QueryPipeline:
+    def __init__(self, companies_df, contacts_df, opportunities_df, parser=None, cache=None, store=None, journal=None):
+        """
+        Hold the loaded CRM data, its lookup indexes and the intent parser.
+
+        This is the part of answering a question that every front end shares:
+        parse the question, then run the query function for its intent.
+        Parses and query results are cached per data version.
+        
+        With a journal, the write intents are enabled: writes are journaled,
+        then applied to the loaded data in place. Journaled writes are
+        replayed whenever data is loaded, and compacted into the CSV files
+        once the journal says it is due.
+
+        Args:
+            companies_df (pd.DataFrame): Companies data
+            contacts_df (pd.DataFrame): Contacts data
+            opportunities_df (pd.DataFrame): Opportunities data
+            parser (IntentParser): Intent parser to use, a new one is created if None
+            cache (QueryCache): Cache for parses and results, a new one is created if None
+            store (DataStore): Store to query instead of the dataframes, which may then be None
+            journal (Journal): Journal to record writes in, or None to keep the data read-only
+        """
+        self.parser = parser if parser is not None else IntentParser()
+        self.cache = cache if cache is not None else QueryCache()
+        self.journal = journal
+        self.data_version = 0
+        self.startup = {}
+        # Called with the rewritten CSV paths and their sizes before the rewrite after every compaction
+        self.compaction_listeners = []
+        # Serializes writes, compaction and data swaps, so no write lands in data being replaced
+        self._write_lock = threading.RLock()
+        self._set_data(companies_df, contacts_df, opportunities_df, store)
+
+    def _set_data(self, companies_df, contacts_df, opportunities_df, store=None):
+        self.companies_df = companies_df
+        self.contacts_df = contacts_df
+        self.opportunities_df = opportunities_df
+        if store is None:
+            store = DataFrameStore(companies_df, contacts_df, opportunities_df)
+        self.store = store
+        self.name_index = getattr(store, 'name_index', None)
+        self.crm_index = getattr(store, 'crm_index', None)
+        # Let the parser spot the loaded company names in questions
+        self.parser.company_index = store
+        if self.journal is not None:
+            self.journal.replay(store)
+
+    def update_data(self, companies_df, contacts_df, opportunities_df, store=None):
+        """
+        Swap in newly loaded data, rebuilding the indexes.
+
+        Bumps data_version and clears the cache so no answer computed from
+        the old data is served.
+
+        Args:
+            companies_df (pd.DataFrame): Companies data
+            contacts_df (pd.DataFrame): Contacts data
+            opportunities_df (pd.DataFrame): Opportunities data
+            store (DataStore): Store to query instead of the dataframes, built from them if None
+        """
+        with self._write_lock:
+            self._set_data(companies_df, contacts_df, opportunities_df, store)
+            self.data_changed()
+
+    def append_data(self, companies_df=None, contacts_df=None, opportunities_df=None):
+        """
+        Add newly appended rows to the loaded data, updating the indexes in place.
+
+        Only the new rows are indexed, instead of rebuilding the indexes from
+        every row as update_data does. Bumps data_version like update_data.
+
+        Args:
+            companies_df (pd.DataFrame): New company rows, or None
+            contacts_df (pd.DataFrame): New contact rows, or None
+            opportunities_df (pd.DataFrame): New opportunity rows, or None
+        """
+        with self._write_lock:
+            self.store.append(companies_df, contacts_df, opportunities_df)
+            self.companies_df = self.store.companies_df
+            self.contacts_df = self.store.contacts_df
+            self.opportunities_df = self.store.opportunities_df
+            self.data_changed()
+
+    def data_changed(self):
+        """
+        Record that the loaded data changed, invalidating cached answers.
+        """
+        self.data_version += 1
+        self.cache.invalidate()
+
+    def parse(self, user_input):
+        """
+        Parse one question into intent and company.
+
+        Args:
+            user_input (str): User's input text
+
+        Returns:
+            dict: Parsed intent, company, confidence and matched template
+        """
+        key = ("parse", normalize_query(user_input), self.data_version)
+        parsed = self.cache.get(key)
+        if parsed is None:
+            parsed = self.parser.parse_intent(user_input)
+            self.cache.put(key, parsed)
+        self._count_parses([parsed])
+        return dict(parsed)
+
+    def parse_many(self, user_inputs):
+        """
+        Parse several questions with one batched encode.
+
+        Args:
+            user_inputs (list): User input texts
+
+        Returns:
+            list: One parsed dictionary per question
+        """
+        keys = [("parse", normalize_query(user_input), self.data_version) for user_input in user_inputs]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, parsed in enumerate(results) if parsed is None]
+        if missing:
+            parsed_batch = self.parser.parse_intents([user_inputs[i] for i in missing])
+            for i, parsed in zip(missing, parsed_batch):
+                self.cache.put(keys[i], parsed)
+                results[i] = parsed
+        self._count_parses(results)
+        return [dict(parsed) for parsed in results]
+
+    def _count_parses(self, parses):
+        METRICS.increment("questions", len(parses))
+        unrecognized = sum(1 for parsed in parses if not parsed["intent"])
+        if unrecognized:
+            METRICS.increment("intent_not_recognized", unrecognized)
+
+    def resolve_company(self, company_name):
+        """
+        Resolve a company name to the canonical name in the companies table.
+
+        Args:
+            company_name (str): Company name as extracted from the question
+
+        Returns:
+            str: Matching company name or None
+        """
+        company = self.store.find_company(company_name)
+        return company['Name'] if company is not None else None
+
+    def execute(self, intent, company_name):
+        """
+        Run the query function for an intent.
+
+        Args:
+            intent (str): One of INTENTS
+            company_name (str): Company name to look up
+
+        Returns:
+            dict: Result dictionary from the query function
+        """
+        METRICS.increment(f"intent.{intent}")
+        key = ("query", intent, company_name, self.data_version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._run_query(intent, company_name)
+            self.cache.put(key, result)
+        return dict(result)
+
+    def _run_query(self, intent, company_name):
+        if intent == "check_status":
+            return check_status(self.companies_df, company_name, store=self.store)
+        elif intent == "last_funding":
+            return last_funding_event(self.opportunities_df, self.companies_df, company_name, store=self.store)
+        elif intent == "last_contact":
+            return last_contact(self.contacts_df, company_name, self.companies_df, store=self.store)
+        raise ValueError(f"Unknown intent: {intent}")
+
+    def write(self, intent, record_id, date=None, reopen=False):
+        """
+        Run the write function for a write intent.
+        
+        Bumps data_version after a successful write so no cached answer
+        computed before it is served, and compacts the journal when it is due.
+        
+        Args:
+            intent (str): One of WRITE_INTENTS
+            record_id (str): Contact ID for log_meeting, opportunity ID for mark_closed_won
+            date (str): YYYY-MM-DD, 'today' or 'yesterday'; today if None
+            reopen (bool): Let mark_closed_won change a Lost opportunity
+        
+        Returns:
+            dict: Result dictionary from the write function
+        """
+        if self.journal is None:
+            return {"error": "Writes are disabled. Start with --enable-writes, or set CRM_ENABLE_WRITES=1 "
+                             "for the web app, to log meetings and mark rounds Closed Won."}
+        METRICS.increment(f"intent.{intent}")
+        with self._write_lock:
+            if intent == "log_meeting":
+                result = log_meeting(self.store, record_id, date, self.journal)
+            elif intent == "mark_closed_won":
+                result = mark_closed_won(self.store, record_id, date, self.journal, reopen)
+            else:
+                raise ValueError(f"Unknown write intent: {intent}")
+            if "error" not in result:
+                self.data_changed()
+                if self.journal.due():
+                    self.compact_journal()
+        return result
+    
+    def compact_journal(self):
+        """
+        Fold the journaled writes into the CSV files and empty the journal.
+        
+        The loaded data already holds the writes, so nothing is reloaded;
+        compaction_listeners are told which files were rewritten.
+        
+        Returns:
+            dict: Rewritten CSV path to its size before the rewrite
+        """
+        with self._write_lock:
+            rewritten = self.journal.compact()
+            for listener in self.compaction_listeners:
+                listener(rewritten)
+        METRICS.increment("journal.compactions")
+        return rewritten
+    
+    def warm_up(self):
+        """
+        Run a throwaway encode, template match and fuzzy company resolution.
+
+        Call once the data and model are loaded, before reporting ready, so
+        the first real question does not pay for initializing the model and
+        the name matcher.
+
+        Returns:
+            float: Seconds spent warming up
+        """
+        start = time.perf_counter()
+        self.parser.warm_up()
+        sample = self.store.sample_companies(1)
+        if sample:
+            # Drop a character so the fuzzy path runs, not just the exact lookup
+            self.store.find_company(sample[0][:-1])
+        self.startup["warm_up_s"] = time.perf_counter() - start
+        return self.startup["warm_up_s"]
+
+    def mark_ready(self, started_at, **phase_seconds):
+        """
+        Record the time to ready, along with the startup phases leading to it.
+
+        Args:
+            started_at (float): time.perf_counter() when startup began
+            **phase_seconds: Seconds per startup phase, such as data_s or model_wait_s
+        """
+        self.startup.update(phase_seconds)
+        self.startup["time_to_ready_s"] = time.perf_counter() - started_at
+
+    def record_first_query(self, seconds):
+        """
+        Record how long the first question took end to end; later calls are ignored.
+
+        Args:
+            seconds (float): Time from receiving the question to the formatted answer
+        """
+        self.startup.setdefault("first_query_ms", seconds * 1000)
+
+    def stats(self):
+        """
+        Get stage latency histograms, counters, cache statistics and startup timings.
+
+        Returns:
+            dict: {"stages": ..., "counters": ..., "cache": ..., "startup": ...}
+        """
+        return {**METRICS.snapshot(), "cache": self.cache.stats(), "startup": dict(self.startup)}
+
+    def sample_companies(self, count=10):
+        """
+        Get a few company names to suggest when a lookup fails.
+
+        Args:
+            count (int): Number of names
+
+        Returns:
+            list: Company names
+        """
+        return self.store.sample_companies(count)
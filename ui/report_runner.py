@@ -0,0 +1,48 @@
+import sys
+import os
+from contextlib import nullcontext
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+REPORT_FORMATS = ("csv", "jsonl")
+
+def report_format(out_path, fmt=None):
+    """
+    Pick the report format from an explicit choice or the output file extension.
+
+    Args:
+        out_path (str): Output path, '-' for stdout
+        fmt (str): 'csv', 'jsonl' or None to infer
+
+    Returns:
+        str: One of REPORT_FORMATS, CSV unless the path ends in .jsonl or .json
+    """
+    if fmt is not None:
+        return fmt
+    return "jsonl" if out_path.lower().endswith((".jsonl", ".json")) else "csv"
+
+def write_report(report, out_path, fmt=None, chunk_rows=10000):
+    """
+    Stream a portfolio report to CSV or JSONL in chunks of rows.
+
+    Args:
+        report (pd.DataFrame): Result of portfolio_report
+        out_path (str): Output path, '-' for stdout
+        fmt (str): 'csv', 'jsonl' or None to infer from out_path
+        chunk_rows (int): Rows serialized at a time
+
+    Returns:
+        int: Rows written
+    """
+    fmt = report_format(out_path, fmt)
+    out_context = nullcontext(sys.stdout) if out_path == '-' else open(out_path, 'w', newline='')
+    with out_context as fout:
+        for start in range(0, len(report), chunk_rows):
+            chunk = report.iloc[start:start + chunk_rows]
+            if fmt == "csv":
+                chunk.to_csv(fout, index=False, header=(start == 0))
+            else:
+                fout.write(chunk.to_json(orient='records', lines=True).rstrip("\n") + "\n")
+        if fmt == "csv" and report.empty:
+            report.to_csv(fout, index=False)
+    return len(report)
@@ -0,0 +1,260 @@
+import sys
+import os
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from ui.batch_runner import answer_batch, to_json_value
+
+MAX_BODY_BYTES = 64 * 1024
+READ_TIMEOUT = 10.0
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+class ServerBusy(Exception):
+    """
+    Raised when the request queue is full.
+    """
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        """
+        Error that is answered with the given HTTP status.
+        """
+        super().__init__(message)
+        self.status = status
+
+class MicroBatcher:
+    def __init__(self, pipeline, executor, batch_window_ms=5, max_batch=64, max_queue=1024):
+        """
+        Coalesce questions that arrive close together into one pipeline batch.
+
+        The first queued question opens a batch window. Everything queued
+        before the window closes, up to max_batch, is parsed with one batched
+        encode on the executor, off the event loop.
+
+        Args:
+            pipeline (QueryPipeline): Loaded query pipeline
+            executor (concurrent.futures.Executor): Runs the CPU-bound batch work
+            batch_window_ms (float): How long to wait for more questions
+            max_batch (int): Largest batch handed to the pipeline
+            max_queue (int): Questions allowed to wait; further ones are rejected
+        """
+        self.pipeline = pipeline
+        self.executor = executor
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.questions = 0
+
+    async def submit(self, question):
+        """
+        Queue a question and wait for its answer.
+
+        Args:
+            question (str): Question text
+
+        Returns:
+            dict: Structured answer record
+
+        Raises:
+            ServerBusy: If the queue is full
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((question, future))
+        except asyncio.QueueFull:
+            raise ServerBusy()
+        return await future
+
+    async def run(self):
+        """
+        Collect and answer batches until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            questions = [question for question, _ in batch]
+            try:
+                records = await loop.run_in_executor(self.executor, answer_batch, self.pipeline, questions)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.questions += len(batch)
+            for (_, future), record in zip(batch, records):
+                # The client may have disconnected and cancelled its future
+                if not future.done():
+                    future.set_result(record)
+
+class QueryServer:
+    def __init__(self, pipeline, host='127.0.0.1', port=8765, batch_window_ms=5, max_batch=64, max_queue=1024):
+        """
+        Local HTTP/JSON service in front of a query pipeline.
+
+        Endpoints:
+            POST /query   body {"query": "..."}, returns the structured answer record
+            GET  /health  returns queue and batching counters
+            GET  /stats   returns stage latency histograms, counters, cache stats and startup timings
+
+        Args:
+            pipeline (QueryPipeline): Loaded query pipeline
+            host (str): Interface to bind, localhost by default
+            port (int): Port to listen on
+            batch_window_ms (float): Micro-batching window
+            max_batch (int): Largest batch handed to the pipeline
+            max_queue (int): Questions allowed to wait before requests get 503
+        """
+        self.pipeline = pipeline
+        self.host = host
+        self.port = port
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.batcher = None
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise HttpError(400, "Malformed request line")
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"Body is limited to {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], body
+
+    async def _respond(self, writer, status, payload, extra_headers=()):
+        body = json.dumps(payload, default=to_json_value).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                "Connection: close",
+                *extra_headers]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def _route(self, method, path, body):
+        if path == '/health':
+            if method != 'GET':
+                return 405, {"error": "Use GET"}
+            return 200, {
+                "status": "ok",
+                "queued": self.batcher.queue.qsize(),
+                "batches": self.batcher.batches,
+                "questions": self.batcher.questions,
+            }
+
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {"error": "Use GET"}
+            return 200, self.pipeline.stats()
+
+        if path == '/query':
+            if method != 'POST':
+                return 405, {"error": "Use POST"}
+            try:
+                question = json.loads(body or b'{}').get("query")
+            except (ValueError, AttributeError):
+                return 400, {"error": "Body must be a JSON object"}
+            if not isinstance(question, str) or not question.strip():
+                return 400, {"error": "Missing 'query' string"}
+            return 200, await self.batcher.submit(question.strip())
+
+        return 404, {"error": f"No route for {path}"}
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                request = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+            except asyncio.TimeoutError:
+                await self._respond(writer, 408, {"error": "Request timed out"})
+                return
+            except HttpError as e:
+                await self._respond(writer, e.status, {"error": str(e)})
+                return
+            if request is None:
+                return
+
+            try:
+                status, payload = await self._route(*request)
+                await self._respond(writer, status, payload)
+            except ServerBusy:
+                await self._respond(writer, 503, {"error": "Server busy, retry shortly"}, ["Retry-After: 1"])
+            except Exception as e:
+                await self._respond(writer, 500, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """
+        Serve requests until cancelled.
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-batch") as executor:
+            self.batcher = MicroBatcher(self.pipeline, executor, self.batch_window_ms,
+                                        self.max_batch, self.max_queue)
+            batch_task = asyncio.create_task(self.batcher.run())
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+            print(f"🌐 Serving on http://{self.host}:{self.port} (POST /query, GET /health, GET /stats)")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                batch_task.cancel()
+
+def serve(pipeline, host='127.0.0.1', port=8765, **batch_options):
+    """
+    Run the query server until interrupted.
+
+    Args:
+        pipeline (QueryPipeline): Loaded query pipeline
+        host (str): Interface to bind
+        port (int): Port to listen on
+        **batch_options: batch_window_ms, max_batch and max_queue for QueryServer
+    """
+    try:
+        asyncio.run(QueryServer(pipeline, host, port, **batch_options).serve())
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped.")
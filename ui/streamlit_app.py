@@ -10,13 +10,19 @@ interactive web UI.
 import streamlit as st
 import sys
 import os
+import time
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from engine.data_loader import load_data
+from engine.data_store import DataFrameStore
+from engine.journal import JOURNAL_PATH, Journal
+from engine.state_snapshot import prepare_state
 from llm_engine.intent_parser import IntentParser
-from engine.query_engine import check_status, last_funding_event, last_contact, get_best_company_match
+from engine.metrics import format_startup
+from ui.query_pipeline import QueryPipeline, INTENTS, WRITE_INTENTS
+from ui.live_reload import LiveReloader
 
 # Page configuration
 st.set_page_config(
@@ -30,19 +36,60 @@ st.set_page_config(
 def load_crm_data():
     """
     Load CRM data and initialize the intent parser.
-    Cached to avoid reloading on every interaction.
+    Cached to avoid reloading on every interaction, so every session
+    shares one pipeline and its query cache.
+    
+    With CRM_STATE_SNAPSHOT set to a file path, the tables, indexes and
+    template embeddings are restored from that memory-mapped snapshot, so
+    workers started on the same snapshot share its pages.
+    
+    With CRM_LIVE_RELOAD set to a number of seconds, the CSV files are
+    polled that often and appended rows are applied to the shared
+    pipeline, so the cached resource never needs clearing.
+    
+    With CRM_ENABLE_WRITES set (to anything but 0), meetings can be logged
+    and rounds marked Closed Won. They are journaled to CRM_JOURNAL, or
+    journal/crm_journal.jsonl by default, and the journal is replayed onto
+    the loaded data.
+    
+    CRM_ENCODER picks the text encoder backend, as --encoder does for main.py.
     """
     try:
-        # Load data
-        companies_df, contacts_df, opportunities_df = load_data()
-        
-        # Initialize intent parser
+        started_at = time.perf_counter()
+        # Start loading the model while the data loads
         parser = IntentParser()
+        parser.load_in_background()
         
-        return companies_df, contacts_df, opportunities_df, parser
+        # Load data, then replay the journaled writes onto it if writes are enabled
+        enable_writes = os.environ.get('CRM_ENABLE_WRITES', '') not in ('', '0')
+        journal = Journal(os.environ.get('CRM_JOURNAL', JOURNAL_PATH)) if enable_writes else None
+        state_path = os.environ.get('CRM_STATE_SNAPSHOT')
+        if state_path:
+            state, _ = prepare_state(state_path, parser)
+            store = DataFrameStore(state.companies_df, state.contacts_df, state.opportunities_df,
+                                   state.name_index, state.crm_index)
+            pipeline = QueryPipeline(state.companies_df, state.contacts_df, state.opportunities_df, parser, store=store,
+                                     journal=journal)
+        else:
+            companies_df, contacts_df, opportunities_df = load_data(skip_unused=True)
+            pipeline = QueryPipeline(companies_df, contacts_df, opportunities_df, parser, journal=journal)
+        data_seconds = time.perf_counter() - started_at
+        reload_interval = os.environ.get('CRM_LIVE_RELOAD')
+        reloader = LiveReloader(pipeline, float(reload_interval)) if reload_interval else None
+        
+        # Wait for the intent parser, then warm it up before reporting ready
+        model_start = time.perf_counter()
+        parser.load()
+        model_wait_seconds = time.perf_counter() - model_start
+        pipeline.warm_up()
+        pipeline.mark_ready(started_at, data_s=data_seconds, model_wait_s=model_wait_seconds)
+        if reloader is not None:
+            reloader.start()
+        
+        return pipeline
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None, None, None
+        return None
 
 def format_status_response(result):
     """
@@ -127,22 +174,100 @@ def format_contact_response(result):
 | **Total Contacts** | {result['total_contacts']} |
 """
 
-def process_query(user_input, companies_df, contacts_df, opportunities_df, parser):
+def format_meeting_response(result):
+    """
+    Format logged meeting response for Streamlit display.
+    
+    Args:
+        result (dict): Logged meeting result
+        
+    Returns:
+        str: Formatted markdown response
+    """
+    if "error" in result:
+        return f"❌ **Error:** {result['error']}"
+    
+    return f"""
+### 📝 Meeting Logged
+
+| **Field** | **Value** |
+|-----------|-----------|
+| **Contact** | {result['contact_name']} ({result['contact_id']}) |
+| **Contact Role** | {result['contact_role']} |
+| **Company** | {result['company_name']} |
+| **Meeting Date** | {result['meeting_date']} |
+| **Last Meeting** | {result['last_meeting']} |
+"""
+
+def format_closed_won_response(result):
+    """
+    Format Closed Won response for Streamlit display.
+    
+    Args:
+        result (dict): Closed Won result
+        
+    Returns:
+        str: Formatted markdown response
+    """
+    if "error" in result:
+        return f"❌ **Error:** {result['error']}"
+    
+    return f"""
+### 🎉 Opportunity Closed Won
+
+| **Field** | **Value** |
+|-----------|-----------|
+| **Opportunity** | {result['opp_id']} |
+| **Company** | {result['company_name']} |
+| **Funding Type** | {result['funding_type']} |
+| **Amount** | ${result['amount']:,} |
+| **Date Closed** | {result['date_closed']} |
+"""
+
+def process_write(parsed, pipeline):
+    """
+    Apply a write intent and return a formatted response.
+    
+    Args:
+        parsed (dict): Parsed question with a write intent
+        pipeline (QueryPipeline): Loaded data, indexes, parser and journal
+        
+    Returns:
+        tuple: (response_text, response_type)
+    """
+    if not parsed["record_id"]:
+        example = ('"Log a meeting with P0001 on 2025-07-01"' if parsed["intent"] == "log_meeting"
+                   else '"Mark O0001 as Closed Won"')
+        return f"""
+### ❓ Record ID Missing
+
+I understood you want to: **{parsed['intent']}**  
+But I couldn't find the contact or opportunity ID to update.
+
+**Please include the ID in your request.**  
+**Example:** *{example}*
+""", "warning"
+    
+    result = pipeline.write(parsed["intent"], parsed["record_id"], parsed["date"], parsed["reopen"])
+    if "error" in result:
+        return f"❌ **Error:** {result['error']}", "error"
+    if parsed["intent"] == "log_meeting":
+        return format_meeting_response(result), "success"
+    return format_closed_won_response(result), "success"
+
+def process_query(user_input, pipeline):
     """
     Process user query and return formatted response.
     
     Args:
         user_input (str): User's input text
-        companies_df (pd.DataFrame): Companies data
-        contacts_df (pd.DataFrame): Contacts data
-        opportunities_df (pd.DataFrame): Opportunities data
-        parser (IntentParser): Intent parser instance
+        pipeline (QueryPipeline): Loaded data, indexes, parser and query cache
         
     Returns:
         tuple: (response_text, response_type)
     """
     # Parse intent
-    parsed = parser.parse_intent(user_input)
+    parsed = pipeline.parse(user_input)
     
     if not parsed["intent"]:
         return f"""
@@ -155,8 +280,13 @@ I couldn't understand what you're asking for.
 • Company status: *"What is the status of [Company Name]?"*
 • Funding events: *"When did [Company Name] last raise funding?"*
 • Contact history: *"When was [Company Name] last contacted?"*
+• Logging a meeting: *"Log a meeting with [Contact ID]"*
+• Closing a round: *"Mark [Opportunity ID] as Closed Won"*
 """, "warning"
     
+    if parsed["intent"] in WRITE_INTENTS:
+        return process_write(parsed, pipeline)
+    
     if not parsed["company"]:
         return f"""
 ### ❓ Company Name Missing
@@ -168,33 +298,22 @@ But I couldn't identify which company you're asking about.
 **Example:** *"What is the status of Bowman-Campbell?"*
 """, "warning"
     
+    if parsed["intent"] not in INTENTS:
+        return f"❌ **Unknown intent:** {parsed['intent']}", "error"
+    
     # Route to appropriate query function
+    result = pipeline.execute(parsed["intent"], parsed["company"])
+    if "error" in result:
+        # Show some sample companies to help the user
+        sample_companies = pipeline.sample_companies()
+        return f"{result['error']}\n\n**📋 Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies]), "error"
+    
     if parsed["intent"] == "check_status":
-        result = check_status(companies_df, parsed["company"])
-        if "error" in result:
-            # Show some sample companies to help the user
-            sample_companies = companies_df['Name'].head(10).tolist()
-            return f"{result['error']}\n\n**📋 Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies]), "error"
         return format_status_response(result), "success"
-    
     elif parsed["intent"] == "last_funding":
-        result = last_funding_event(opportunities_df, companies_df, parsed["company"])
-        if "error" in result:
-            # Show some sample companies to help the user
-            sample_companies = companies_df['Name'].head(10).tolist()
-            return f"{result['error']}\n\n**📋 Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies]), "error"
         return format_funding_response(result), "success"
-    
-    elif parsed["intent"] == "last_contact":
-        result = last_contact(contacts_df, parsed["company"], companies_df)
-        if "error" in result:
-            # Show some sample companies to help the user
-            sample_companies = companies_df['Name'].head(10).tolist()
-            return f"{result['error']}\n\n**📋 Sample companies in database:**\n" + "\n".join([f"• {company}" for company in sample_companies]), "error"
-        return format_contact_response(result), "success"
-    
     else:
-        return f"❌ **Unknown intent:** {parsed['intent']}", "error"
+        return format_contact_response(result), "success"
 
 def main():
     """
@@ -206,11 +325,14 @@ def main():
     
     # Load data and parser
     with st.spinner("Loading CRM data and initializing models..."):
-        companies_df, contacts_df, opportunities_df, parser = load_crm_data()
+        pipeline = load_crm_data()
     
-    if companies_df is None:
+    if pipeline is None:
         st.error("Failed to load CRM data. Please check your data files.")
         return
+    companies_df = pipeline.companies_df
+    contacts_df = pipeline.contacts_df
+    opportunities_df = pipeline.opportunities_df
     
     # Display data summary
     col1, col2, col3 = st.columns(3)
@@ -243,21 +365,35 @@ def main():
         - "When was Bowman-Campbell last contacted?"
         - "When did we last meet with King and Sons?"
         - "Show me contact history for Spears LLC"
+        
+        **Updates:**
+        - "Log a meeting with P0001 yesterday"
+        - "Mark O0002 as Closed Won on 2025-07-01"
         """)
     
-    # Text input
-    user_query = st.text_input(
-        "Enter your question:",
-        placeholder="e.g., What is the status of Bowman-Campbell?",
-        key="user_query"
-    )
+    # Text input, in a form so that each Enter or click is one submission
+    with st.form("query_form"):
+        user_query = st.text_input(
+            "Enter your question:",
+            placeholder="e.g., What is the status of Bowman-Campbell?",
+            key="user_query"
+        )
+        submitted = st.form_submit_button("Ask")
     
-    # Process query when submitted
-    if user_query:
+    # Process query when submitted. Streamlit reruns the script on every
+    # interaction; those reruns show the last answer instead of asking again,
+    # so a write is applied once per submission, and again if it is resubmitted.
+    if submitted and user_query:
         with st.spinner("Processing your question..."):
+            start = time.perf_counter()
             response_text, response_type = process_query(
-                user_query, companies_df, contacts_df, opportunities_df, parser
+                user_query, pipeline
             )
+            pipeline.record_first_query(time.perf_counter() - start)
+        st.session_state["last_answer"] = (response_text, response_type)
+    
+    if "last_answer" in st.session_state:
+        response_text, response_type = st.session_state["last_answer"]
         
         # Display response based on type
         if response_type == "success":
@@ -283,6 +419,8 @@ def main():
         - Company status and stage
         - Funding rounds and amounts
         - Contact history and meetings
+        
+        With CRM_ENABLE_WRITES set, it can also log meetings and mark opportunities Closed Won.
         """)
         
         st.header("🔧 Technical Details")
@@ -290,9 +428,21 @@ def main():
         - **Companies loaded:** {len(companies_df)}
         - **Contacts loaded:** {len(contacts_df)}
         - **Opportunities loaded:** {len(opportunities_df)}
-        - **Intent templates:** {len(parser.templates)}
+        - **Intent templates:** {len(pipeline.parser.templates)}
+        - **Query cache hit rate:** {pipeline.cache.stats()['hit_rate']:.0%}
+        - **Data version:** {pipeline.data_version}
         """)
-        
+        startup = format_startup(pipeline.startup)
+        if startup:
+            st.markdown(f"- **Startup:** {startup}")
+
+        # Per-stage latency since startup
+        stages = pipeline.stats()["stages"]
+        if stages:
+            st.header("⏱️ Stage Latency (ms)")
+            st.table({stage: {"count": s["count"], "p50": round(s["p50_ms"], 3), "p99": round(s["p99_ms"], 3)}
+                      for stage, s in stages.items()})
+
         # Show sample companies
         st.header("📋 Sample Companies")
         sample_companies = companies_df['Name'].head(15).tolist()